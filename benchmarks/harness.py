@@ -0,0 +1,427 @@
+"""
+End to end throughput benchmarks of the scrapers against a local [MockNEOServer]
+
+    python -m benchmarks.harness --windows 200 --workers 8 --output bench.json
+    python -m benchmarks.harness --scenarios regular-jsonl tor-jsonl --error-rate 429=0.02
+
+The mock server (and the SOCKS stand-in for Tor) run in their own process, and every scenario
+runs in a fresh process so its peak RSS is its own. The report is JSON, with the commit it was
+measured on, so runs can be compared across commits.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks.mock_neo_server import MockNEOServer
+from benchmarks.socks_proxy import SocksProxy
+from data.csv.csv_store import CSVStore
+from data.jsonl.jsonl_store import JSONLStore
+from entities.scrape_request.dated_request import DatedRequest
+from entities.scrape_request.scrape_request import ScrapeRequest
+from entities.scraped_data.factory.basic_data_factory import BasicDataFactory
+from entities.scraped_data.factory.flattening_data_factory import (
+    FlatteningDataFactory,
+)
+from entities.scraped_data.factory.scrape_data_factory import ScrapeDataFactory
+from entities.scraped_data.scraped_data import ScrapedData
+from formatters.ymd_formatter import ymd_format_date
+from scraps import Scraps
+from use_cases.request_generator.historical.historical_config import HistoricalConfig
+from use_cases.request_generator.historical.historical_request_generator import (
+    HistoricalRequestGenerator,
+)
+from use_cases.request_generator.link_following.link_following_request_generator import (
+    LinkFollowingRequestGenerator,
+)
+from use_cases.scraper.metrics.scrape_metrics import ScrapeMetrics
+from use_cases.scraper.regular.regular_scraper import RegularScraper
+from use_cases.scraper.retry.retry_policy import RetryPolicy
+from use_cases.scraper.scraper import Scraper
+from use_cases.scraper.scraper_config import ScraperConfig
+from use_cases.scraper.tor.proxy_pool import ProxyPool
+from use_cases.scraper.tor.tor_scraper import TorScraper
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+FIRST_DAY = date(2000, 1, 1)
+WINDOW = timedelta(days=7)
+ITEMS_PATH = "near_earth_objects.*.*"
+PAYLOAD = {"api_key": "DEMO_KEY"}
+
+Urls = Tuple[str, str]  # mock server, SOCKS proxy
+ScenarioBuilder = Callable[[argparse.Namespace, Urls, str], Scraper]
+
+
+class RecordingMetrics(ScrapeMetrics):
+    """
+    [ScrapeMetrics] that also keeps every latency, the histogram buckets are too coarse for percentiles
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.latencies: List[float] = []
+
+    def observe_response(
+        self,
+        url: str,
+        status: int | None,
+        latency: float | None = None,
+        proxy: str | None = None,
+    ) -> None:
+        super().observe_response(url, status, latency, proxy)
+        if latency is not None:
+            self.latencies.append(latency)
+
+
+def _range(options: argparse.Namespace) -> Tuple[datetime, datetime]:
+    start = datetime.combine(FIRST_DAY, datetime.min.time())
+    return start, start + WINDOW * options.windows
+
+
+def _historical_generator(
+    options: argparse.Namespace, url: str
+) -> HistoricalRequestGenerator:
+    start, end = _range(options)
+    return HistoricalRequestGenerator(
+        HistoricalConfig(start_date=start, end_date=end, interval=WINDOW),
+        ScrapeRequest(url, PAYLOAD),
+        start_key="start_date",
+        end_key="end_date",
+        date_formatter=ymd_format_date,
+    )
+
+
+def _config(options: argparse.Namespace, **kwargs) -> ScraperConfig:
+    return ScraperConfig(
+        0,
+        0,
+        workers=options.workers,
+        retry_policy=RetryPolicy(base_delay=options.retry_delay),
+        **kwargs,
+    )
+
+
+def _basic_factory() -> BasicDataFactory:
+    return BasicDataFactory({ScrapeDataFactory, ScrapedData})
+
+
+def regular_jsonl(options: argparse.Namespace, urls: Urls, root: str) -> Scraper:
+    """
+    Whole responses written as JSON Lines
+    """
+    return RegularScraper(
+        _historical_generator(options, urls[0]),
+        _basic_factory(),
+        JSONLStore(root=root),
+        _config(options),
+    )
+
+
+def regular_csv(options: argparse.Namespace, urls: Urls, root: str) -> Scraper:
+    """
+    Every asteroid flattened into a row of a single CSV file
+    """
+    return RegularScraper(
+        _historical_generator(options, urls[0]),
+        FlatteningDataFactory(ITEMS_PATH, path_keys=["date"]),
+        CSVStore(multiple_files=False, buffered=True, root=root),
+        _config(options),
+    )
+
+
+def regular_stream(options: argparse.Namespace, urls: Urls, root: str) -> Scraper:
+    """
+    Asteroids parsed from the body as it arrives, one JSON Lines record each
+    """
+    return RegularScraper(
+        _historical_generator(options, urls[0]),
+        FlatteningDataFactory(ITEMS_PATH, path_keys=["date"]),
+        JSONLStore(root=root),
+        _config(
+            options,
+            stream_mode=ScraperConfig.STREAM_ITEMS,
+            stream_items_path=ITEMS_PATH,
+        ),
+    )
+
+
+def tor_jsonl(options: argparse.Namespace, urls: Urls, root: str) -> Scraper:
+    """
+    Whole responses written as JSON Lines, through the SOCKS stand-in with an isolation slot per worker
+    """
+    return TorScraper(
+        _historical_generator(options, urls[0]),
+        _basic_factory(),
+        JSONLStore(root=root),
+        _config(options),
+        proxy_pool=ProxyPool.from_urls([urls[1]], isolation_slots=options.workers),
+    )
+
+
+def links_jsonl(options: argparse.Namespace, urls: Urls, root: str) -> Scraper:
+    """
+    The windows come from the links.next of the responses, one request at a time
+    """
+    start, _ = _range(options)
+    return RegularScraper(
+        LinkFollowingRequestGenerator(
+            DatedRequest(
+                urls[0],
+                PAYLOAD,
+                start,
+                start + WINDOW,
+                "start_date",
+                "end_date",
+                ymd_format_date,
+            ),
+            link_paths=["links.next"],
+            max_requests=options.windows,
+        ),
+        _basic_factory(),
+        JSONLStore(root=root),
+        _config(options),
+    )
+
+
+def scraps_jsonl(options: argparse.Namespace, urls: Urls, root: str) -> Scraper:
+    """
+    The scraper [Scraps] builds, paced by a rate limiter that never waits
+    """
+    start, end = _range(options)
+    scraps = Scraps(
+        url=urls[0],
+        payload=PAYLOAD,
+        formatter=ymd_format_date,
+        interval=WINDOW,
+        start=start,
+        end=end,
+        start_key="start_date",
+        end_key="end_date",
+        tor=False,
+        workers=options.workers,
+        jsonl_store=True,
+        rate=1_000_000,
+        burst=options.workers,
+        output_root=root,
+    )
+    return scraps._create_scraper()
+
+
+SCENARIOS: Dict[str, ScenarioBuilder] = {
+    "regular-jsonl": regular_jsonl,
+    "regular-csv": regular_csv,
+    "regular-stream": regular_stream,
+    "tor-jsonl": tor_jsonl,
+    "links-jsonl": links_jsonl,
+    "scraps-jsonl": scraps_jsonl,
+}
+
+
+def percentile(values: List[float], fraction: float) -> float | None:
+    """
+    Nearest rank percentile
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def folder_size(root: str) -> int:
+    size = 0
+    for folder, _, filenames in os.walk(root):
+        for filename in filenames:
+            size += os.path.getsize(os.path.join(folder, filename))
+    return size
+
+
+def peak_rss() -> int | None:
+    """
+    Peak resident memory of the process in bytes
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def measure(name: str, options: argparse.Namespace, urls: Urls) -> Dict[str, Any]:
+    """
+    Runs the scenario and measures it, in the current process
+    """
+    root = tempfile.mkdtemp(prefix=f"scraps-bench-{name}-")
+    try:
+        scraper = SCENARIOS[name](options, urls, root)
+        metrics = RecordingMetrics()
+        scraper.config.metrics = metrics
+
+        started_at = time.perf_counter()
+        asyncio.run(scraper.scrape())
+        seconds = time.perf_counter() - started_at
+
+        statuses: Dict[str, int] = {}
+        for _, labels, value in metrics.responses.samples():
+            statuses[labels["status"]] = statuses.get(labels["status"], 0) + int(value)
+        requests = int(metrics.responses.total())
+        return {
+            "scenario": name,
+            "requests": requests,
+            "completed": int(metrics.completed.total()),
+            "retries": int(metrics.retries.total()),
+            "statuses": statuses,
+            "seconds": seconds,
+            "requests_per_second": requests / seconds if seconds else None,
+            "latency_p50": percentile(metrics.latencies, 0.50),
+            "latency_p99": percentile(metrics.latencies, 0.99),
+            "peak_rss_bytes": peak_rss(),
+            "bytes_received": int(metrics.bytes_received.total()),
+            "bytes_written": folder_size(root),
+        }
+    finally:
+        if options.keep_output:
+            print(f"Output of {name} kept in {root}", file=sys.stderr)
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+def _measure_in_process(name, options, urls, results) -> None:
+    try:
+        results.put(measure(name, options, urls))
+    except Exception as error:
+        results.put({"scenario": name, "error": repr(error)})
+
+
+def _serve(options: argparse.Namespace, ready) -> None:
+    asyncio.run(_serve_forever(options, ready))
+
+
+async def _serve_forever(options: argparse.Namespace, ready) -> None:
+    server = await MockNEOServer(
+        items_per_day=options.items_per_day,
+        item_bytes=options.item_bytes,
+        latency_median=options.latency_median,
+        latency_sigma=options.latency_sigma,
+        error_rates=options.error_rates,
+        last_date=FIRST_DAY + WINDOW * options.windows,
+        seed=options.seed,
+    ).start()
+    proxy = await SocksProxy().start()
+    ready.put((server.url, proxy.url))
+    await asyncio.Event().wait()
+
+
+def run(options: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Starts the mock server, measures every scenario in its own process and returns the report
+    """
+    context = multiprocessing.get_context("spawn")
+    ready = context.Queue()
+    server = context.Process(target=_serve, args=(options, ready), daemon=True)
+    server.start()
+    results = []
+    try:
+        urls = ready.get(timeout=30)
+        for name in options.scenarios:
+            queue = context.Queue()
+            process = context.Process(
+                target=_measure_in_process, args=(name, options, urls, queue)
+            )
+            process.start()
+            result = queue.get()
+            process.join()
+            print(json.dumps(result), file=sys.stderr)
+            results.append(result)
+    finally:
+        server.terminate()
+        server.join()
+
+    return {
+        "commit": _commit(),
+        "measured_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "options": {
+            key: value for key, value in vars(options).items() if key != "output"
+        },
+        "results": results,
+    }
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _error_rate(text: str) -> Tuple[int, float]:
+    status, rate = text.split("=")
+    return int(status), float(rate)
+
+
+def parse_options(argv: List[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS)
+    )
+    parser.add_argument("--windows", type=int, default=200, help="requests per run")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--items-per-day", type=int, default=10)
+    parser.add_argument("--item-bytes", type=int, default=500)
+    parser.add_argument(
+        "--latency-median", type=float, default=0.005, help="seconds per response"
+    )
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument(
+        "--error-rate",
+        type=_error_rate,
+        action="append",
+        default=[],
+        help="STATUS=FRACTION of the responses that fail, e.g. 429=0.01 (repeatable)",
+    )
+    parser.add_argument(
+        "--retry-delay", type=float, default=0.05, help="base retry delay in seconds"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep-output", action="store_true")
+    parser.add_argument("--output", help="JSON report file, by default stdout")
+    options = parser.parse_args(argv)
+    options.error_rates = dict(options.error_rate)
+    del options.error_rate
+    return options
+
+
+def main(argv: List[str] | None = None) -> None:
+    options = parse_options(argv)
+    report = run(options)
+    text = json.dumps(report, indent=2)
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
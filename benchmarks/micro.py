@@ -0,0 +1,307 @@
+"""
+Micro-benchmarks of the CPU and I/O hot paths, compared against stored baselines
+
+    python -m benchmarks.micro                   # compare with benchmarks/baselines.json
+    python -m benchmarks.micro --save-baselines  # record the baselines on this machine
+    python -m benchmarks.micro csv_store_single --scale 0.1 --threshold 2
+
+Every benchmark is timed [repeat] times (the best run counts) and compared per operation,
+so a smaller [scale] can be compared with baselines recorded at another scale.
+A benchmark slower than [threshold] times its baseline is a regression, the exit code is 1.
+Baselines only mean something on the machine they were recorded on, record them again there.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+from data.csv.csv_store import CSVStore
+from entities.scrape_request.dated_request import DatedRequest
+from entities.scrape_request.scrape_request import ScrapeRequest
+from entities.scraped_data.factory.basic_data_factory import BasicDataFactory
+from entities.scraped_data.factory.scrape_data_factory import ScrapeDataFactory
+from entities.scraped_data.scraped_data import ScrapedData
+from formatters.iso_formatter import iso_format_date
+from formatters.ymd_formatter import ymd_format_date
+from use_cases.request_generator.historical.historical_config import HistoricalConfig
+from use_cases.request_generator.historical.historical_request_generator import (
+    HistoricalRequestGenerator,
+)
+
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+URL = "https://api.nasa.gov/neo/rest/v1/feed"
+START = datetime(2010, 1, 1)
+
+# The function to time, it returns the number of operations it did
+Run = Callable[[], int]
+# Builds the run for a [scale] of the full size, with a scratch folder for the files it writes
+Prepare = Callable[[float, str], Run]
+
+
+def _size(full: int, scale: float) -> int:
+    return max(1, int(full * scale))
+
+
+def historical_generator(scale: float, folder: str) -> Run:
+    """
+    10 years of 1 minute windows, the range doesn't end on a window so the remainder is generated too
+    """
+    windows = _size(10 * 365 * 24 * 60, scale)
+    config = HistoricalConfig(
+        start_date=START,
+        end_date=START + timedelta(minutes=windows, seconds=30),
+        interval=timedelta(minutes=1),
+        go_back_in_time=False,
+    )
+    generator = HistoricalRequestGenerator(
+        config, ScrapeRequest(URL, {"api_key": "DEMO_KEY"})
+    )
+
+    def run() -> int:
+        requests = 0
+        while generator.working():
+            if generator.next() is None:
+                break
+            requests += 1
+        return requests
+
+    return run
+
+
+def _dated_requests(formatter: Callable[[datetime], str]) -> Prepare:
+    def prepare(scale: float, folder: str) -> Run:
+        requests = _size(1_000_000, scale)
+        template = {"api_key": "DEMO_KEY"}
+        day = timedelta(days=1)
+
+        def run() -> int:
+            start = START
+            for _ in range(requests):
+                end = start + day
+                DatedRequest(
+                    URL, template, start, end, "start_date", "end_date", formatter
+                ).get_payload()
+                start = end
+            return requests
+
+        return run
+
+    return prepare
+
+
+def _csv_store(multiple_files: bool) -> Prepare:
+    def prepare(scale: float, folder: str) -> Run:
+        rows = _size(1_000_000, scale)
+        rows_per_request = 1000
+        row = {
+            "id": "2000433",
+            "name": "433 Eros (A898 PA)",
+            "absolute_magnitude_h": 10.41,
+            "diameter_min_km": 22.1,
+            "diameter_max_km": 49.4,
+            "hazardous": False,
+            "date": "2024-01-01",
+        }
+        data = ScrapedData(row)
+
+        def run() -> int:
+            store = CSVStore(multiple_files=multiple_files, root=folder)
+            request = None
+            for index in range(rows):
+                if index % rows_per_request == 0:
+                    request = ScrapeRequest(URL, {"page": index // rows_per_request})
+                store.save(data, request)
+            store.close()
+            return rows
+
+        return run
+
+    return prepare
+
+
+def basic_factory(scale: float, folder: str) -> Run:
+    """
+    A week of the NEO feed with 1000 asteroids a day
+    """
+    creates = _size(1_000_000, scale)
+    asteroid = {
+        "id": "2000433",
+        "name": "433 Eros (A898 PA)",
+        "estimated_diameter": {
+            unit: {"min": 22.1, "max": 49.4}
+            for unit in ("kilometers", "meters", "miles", "feet")
+        },
+        "close_approach_data": [
+            {"miss_distance": {"km": "1000", "au": "0.1"}, "orbiting_body": "Earth"}
+        ],
+    }
+    payload = {
+        "links": {"next": URL},
+        "element_count": 7000,
+        "near_earth_objects": {
+            f"2024-01-0{day}": [dict(asteroid) for _ in range(1000)]
+            for day in range(1, 8)
+        },
+    }
+    factory = BasicDataFactory({ScrapeDataFactory, ScrapedData})
+
+    def run() -> int:
+        for _ in range(creates):
+            for data in factory.create_many(payload):
+                data.get_data()
+        return creates
+
+    return run
+
+
+BENCHMARKS: Dict[str, Prepare] = {
+    "historical_generator": historical_generator,
+    "dated_request_ymd": _dated_requests(ymd_format_date),
+    "dated_request_iso": _dated_requests(iso_format_date),
+    "csv_store_single": _csv_store(multiple_files=False),
+    "csv_store_multiple": _csv_store(multiple_files=True),
+    "basic_factory": basic_factory,
+}
+
+
+def measure(name: str, scale: float = 1.0, repeat: int = 3) -> Dict[str, Any]:
+    """
+    The best of [repeat] runs of the benchmark
+    """
+    best = None
+    operations = 0
+    for _ in range(repeat):
+        folder = tempfile.mkdtemp(prefix=f"scraps-micro-{name}-")
+        try:
+            run = BENCHMARKS[name](scale, folder)
+            gc.collect()
+            started_at = time.perf_counter()
+            operations = run()
+            seconds = time.perf_counter() - started_at
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+        if best is None or seconds < best:
+            best = seconds
+    return {
+        "operations": operations,
+        "seconds": best,
+        "seconds_per_operation": best / operations,
+    }
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]],
+    baselines: Dict[str, Dict[str, Any]],
+    threshold: float,
+) -> List[str]:
+    """
+    The names of the benchmarks more than [threshold] times slower than their baseline
+    """
+    regressions = []
+    for name, result in results.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            continue
+        ratio = result["seconds_per_operation"] / baseline["seconds_per_operation"]
+        result["ratio"] = ratio
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def load_baselines(path: str) -> Dict[str, Any] | None:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_baselines(path: str, results: Dict[str, Dict[str, Any]], scale: float) -> None:
+    """
+    Keeps the baselines of the benchmarks that were not run
+    """
+    previous = load_baselines(path) or {}
+    baselines = {
+        "machine": platform.platform(),
+        "python": platform.python_version(),
+        "recorded_at": datetime.now().isoformat(),
+        "scale": scale,
+        "benchmarks": {**previous.get("benchmarks", {}), **results},
+    }
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(baselines, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+
+def parse_options(argv: List[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "benchmarks", nargs="*", help=f"by default all of them: {', '.join(BENCHMARKS)}"
+    )
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="fraction of the full sizes"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.5,
+        help="slowdown over the baseline (per operation) that fails the run",
+    )
+    parser.add_argument("--baselines", default=BASELINES_PATH)
+    parser.add_argument("--save-baselines", action="store_true")
+    options = parser.parse_args(argv)
+    unknown = [name for name in options.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+    options.benchmarks = options.benchmarks or list(BENCHMARKS)
+    return options
+
+
+def main(argv: List[str] | None = None) -> int:
+    options = parse_options(argv)
+    results = {}
+    for name in options.benchmarks:
+        results[name] = measure(name, options.scale, options.repeat)
+        result = results[name]
+        print(
+            f"{name:24} {result['operations']:>10} ops {result['seconds']:9.3f}s "
+            f"{result['seconds_per_operation'] * 1e9:12.1f} ns/op"
+        )
+
+    if options.save_baselines:
+        save_baselines(options.baselines, results, options.scale)
+        print(f"Baselines saved to {options.baselines}")
+        return 0
+
+    baselines = load_baselines(options.baselines)
+    if baselines is None:
+        print(f"No baselines in {options.baselines}, record them with --save-baselines")
+        return 0
+    if baselines.get("machine") != platform.platform():
+        print(f"The baselines were recorded on {baselines.get('machine')}")
+
+    regressions = compare(results, baselines["benchmarks"], options.threshold)
+    for name, result in results.items():
+        if "ratio" in result:
+            print(f"{name:24} {result['ratio']:6.2f}x the baseline")
+    if regressions:
+        print(
+            f"REGRESSION: {', '.join(regressions)} slower than "
+            f"{options.threshold}x the baseline",
+            file=sys.stderr,
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
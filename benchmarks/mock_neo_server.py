@@ -0,0 +1,175 @@
+import asyncio
+import json
+import math
+import random
+from datetime import date, timedelta
+from typing import Dict, List
+from aiohttp import web
+
+
+class MockNEOServer:
+    """
+    Local HTTP server that answers like the NASA NEO feed (/neo/rest/v1/feed),
+    so the scrapers can be measured without reaching the internet
+
+    Every day of the [start_date, end_date] window has [items_per_day] asteroids of about [item_bytes] bytes,
+    and the response links to the next window (links.next) until [last_date].
+    Windows longer than [max_window_days] are rejected with a 400, like the real API does.
+
+    The latency of every response is log-normal around [latency_median] seconds ([latency_sigma] spread),
+    and [error_rates] injects errors: {status: fraction of the requests}, e.g. {429: 0.01, 503: 0.005}
+    """
+
+    PATH = "/neo/rest/v1/feed"
+
+    def __init__(
+        self,
+        items_per_day: int = 10,
+        item_bytes: int = 500,
+        latency_median: float = 0.0,
+        latency_sigma: float = 0.0,
+        error_rates: Dict[int, float] | None = None,
+        retry_after: float = 0,
+        max_window_days: int | None = 7,
+        last_date: date | None = None,
+        seed: int | None = None,
+    ):
+        """
+        [retry_after] seconds sent in the Retry-After header of the 429 responses
+        """
+        self.items_per_day = items_per_day
+        self.item_bytes = item_bytes
+        self.latency_median = latency_median
+        self.latency_sigma = latency_sigma
+        self.error_rates = error_rates or {}
+        self.retry_after = retry_after
+        self.max_window_days = max_window_days
+        self.last_date = last_date
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.statuses: Dict[int, int] = {}
+        self._runner: web.AppRunner | None = None
+        self.port = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}{self.PATH}"
+
+    async def start(self, port: int = 0) -> "MockNEOServer":
+        app = web.Application()
+        app.router.add_get(self.PATH, self._feed)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def _feed(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        await asyncio.sleep(self._latency())
+        response = self._respond(request)
+        self.statuses[response.status] = self.statuses.get(response.status, 0) + 1
+        return response
+
+    def _respond(self, request: web.Request) -> web.Response:
+        status = self._injected_error()
+        if status == 429:
+            return web.json_response(
+                {"error": {"code": "OVER_RATE_LIMIT"}},
+                status=429,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        if status is not None:
+            return web.json_response({"error": {"code": str(status)}}, status=status)
+
+        try:
+            start = date.fromisoformat(request.query["start_date"])
+            end = date.fromisoformat(request.query.get("end_date", start.isoformat()))
+        except (KeyError, ValueError):
+            return self._bad_request(
+                "Date Format Exception - Expected format (yyyy-mm-dd)"
+            )
+        if end < start:
+            return self._bad_request("end_date must be after start_date")
+        limit = self.max_window_days
+        if limit is not None and (end - start).days > limit:
+            return self._bad_request(
+                f"Date Format Exception - The Feed date limit is only {limit} Days"
+            )
+
+        body = json.dumps(self._feed_body(request, start, end)).encode()
+        return web.Response(body=body, content_type="application/json")
+
+    def _feed_body(self, request: web.Request, start: date, end: date) -> Dict:
+        days = (end - start).days + 1
+        objects: Dict[str, List[Dict]] = {}
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            objects[day.isoformat()] = [
+                self._asteroid(day, index) for index in range(self.items_per_day)
+            ]
+
+        links = {"self": str(request.url)}
+        next_start = end + timedelta(days=1)
+        if self.last_date is None or next_start <= self.last_date:
+            next_end = next_start + (end - start)
+            if self.last_date is not None:
+                next_end = min(next_end, self.last_date)
+            links["next"] = str(
+                request.url.update_query(
+                    start_date=next_start.isoformat(), end_date=next_end.isoformat()
+                )
+            )
+        return {
+            "links": links,
+            "element_count": days * self.items_per_day,
+            "near_earth_objects": objects,
+        }
+
+    def _asteroid(self, day: date, index: int) -> Dict:
+        identifier = f"{day.toordinal()}{index:04d}"
+        asteroid = {
+            "id": identifier,
+            "name": f"({day.year} {identifier})",
+            "absolute_magnitude_h": 20.0 + index % 10,
+            "estimated_diameter": {"kilometers": {"min": 0.1, "max": 0.3}},
+            "is_potentially_hazardous_asteroid": index % 7 == 0,
+            "close_approach_data": [
+                {
+                    "close_approach_date": day.isoformat(),
+                    "miss_distance": {"kilometers": str(1_000_000 + index)},
+                    "orbiting_body": "Earth",
+                }
+            ],
+        }
+        padding = self.item_bytes - len(json.dumps(asteroid))
+        if padding > 0:
+            asteroid["nasa_jpl_url"] = "x" * padding
+        return asteroid
+
+    def _latency(self) -> float:
+        if self.latency_median <= 0:
+            return 0
+        if self.latency_sigma <= 0:
+            return self.latency_median
+        return self.latency_median * math.exp(self.random.gauss(0, self.latency_sigma))
+
+    def _injected_error(self) -> int | None:
+        draw = self.random.random()
+        for status, rate in self.error_rates.items():
+            if draw < rate:
+                return status
+            draw -= rate
+        return None
+
+    @staticmethod
+    def _bad_request(message: str) -> web.Response:
+        return web.json_response(
+            {"code": 400, "http_error": "BAD_REQUEST", "error_message": message},
+            status=400,
+        )
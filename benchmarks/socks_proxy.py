@@ -0,0 +1,135 @@
+import asyncio
+import socket
+import struct
+from typing import Set
+
+
+class SocksProxy:
+    """
+    Minimal SOCKS5 proxy on localhost that stands in for Tor in the benchmarks
+    It accepts the CONNECT command with or without username/password authentication (the Tor
+    scraper sends credentials for stream isolation), and relays the bytes both ways.
+    Host names are resolved by the proxy, like Tor does for rdns requests.
+    """
+
+    VERSION = 5
+    NO_AUTH = 0
+    USER_PASSWORD = 2
+    NO_ACCEPTABLE_METHOD = 0xFF
+    CONNECT = 1
+    IPV4, DOMAIN, IPV6 = 1, 3, 4
+    SUCCEEDED, FAILURE, COMMAND_NOT_SUPPORTED = 0, 1, 7
+
+    def __init__(self):
+        self.connections = 0
+        self.usernames: Set[str] = set()
+        self._server: asyncio.AbstractServer | None = None
+        self.port = 0
+
+    @property
+    def url(self) -> str:
+        return f"socks5://127.0.0.1:{self.port}"
+
+    async def start(self, port: int = 0) -> "SocksProxy":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.connections += 1
+        target_writer = None
+        try:
+            if not await self._authenticate(reader, writer):
+                return
+            target = await self._connect(reader, writer)
+            if target is None:
+                return
+            target_reader, target_writer = target
+            await asyncio.gather(
+                self._relay(reader, target_writer), self._relay(target_reader, writer)
+            )
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            if target_writer is not None:
+                target_writer.close()
+
+    async def _authenticate(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> bool:
+        version, count = await reader.readexactly(2)
+        methods = await reader.readexactly(count)
+        if version != self.VERSION:
+            return False
+        if self.USER_PASSWORD in methods:
+            writer.write(bytes([self.VERSION, self.USER_PASSWORD]))
+            # RFC 1929, every username and password is accepted
+            _, username_length = await reader.readexactly(2)
+            username = await reader.readexactly(username_length)
+            (password_length,) = await reader.readexactly(1)
+            await reader.readexactly(password_length)
+            self.usernames.add(username.decode(errors="replace"))
+            writer.write(b"\x01\x00")
+            return True
+        if self.NO_AUTH in methods:
+            writer.write(bytes([self.VERSION, self.NO_AUTH]))
+            return True
+        writer.write(bytes([self.VERSION, self.NO_ACCEPTABLE_METHOD]))
+        return False
+
+    async def _connect(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        """
+        The connection to the target of the CONNECT request, None when it can't be made
+        """
+        _, command, _, address_type = await reader.readexactly(4)
+        if address_type == self.IPV4:
+            host = socket.inet_ntop(socket.AF_INET, await reader.readexactly(4))
+        elif address_type == self.IPV6:
+            host = socket.inet_ntop(socket.AF_INET6, await reader.readexactly(16))
+        else:
+            (length,) = await reader.readexactly(1)
+            host = (await reader.readexactly(length)).decode()
+        (port,) = struct.unpack("!H", await reader.readexactly(2))
+
+        if command != self.CONNECT:
+            self._reply(writer, self.COMMAND_NOT_SUPPORTED)
+            return None
+        try:
+            target = await asyncio.open_connection(host, port)
+        except OSError:
+            self._reply(writer, self.FAILURE)
+            return None
+        self._reply(writer, self.SUCCEEDED)
+        return target
+
+    def _reply(self, writer: asyncio.StreamWriter, status: int) -> None:
+        # The bound address is not used by the clients
+        writer.write(bytes([self.VERSION, status, 0, self.IPV4, 0, 0, 0, 0, 0, 0]))
+
+    @staticmethod
+    async def _relay(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                data = await reader.read(64 * 1024)
+                if not data:
+                    break
+                writer.write(data)
+                await writer.drain()
+        finally:
+            if writer.can_write_eof():
+                try:
+                    writer.write_eof()
+                except OSError:
+                    pass
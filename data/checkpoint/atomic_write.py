@@ -0,0 +1,36 @@
+import os
+import tempfile
+from typing import IO, Callable
+
+
+def atomic_write(
+    path: str,
+    write: Callable[[IO], None],
+    binary: bool = False,
+    fsync: bool = False,
+) -> None:
+    """
+    Replaces the file at [path] with what [write] writes to the file it's given
+    It's written to a temporary file next to it (so the rename stays in the same filesystem) and renamed over it:
+    readers see the old file or the new one, never half of it, and a write that fails leaves the old one.
+    Text files are UTF-8 without newline translation, [binary] gives [write] a binary file
+    [fsync] makes sure the new file is on disk before the rename, so it also survives a power loss
+    """
+    folder = os.path.dirname(os.path.abspath(path))
+    os.makedirs(folder, exist_ok=True)
+    file_descriptor, temp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+    try:
+        if binary:
+            file = os.fdopen(file_descriptor, "wb")
+        else:
+            file = os.fdopen(file_descriptor, "w", encoding="utf-8", newline="")
+        with file:
+            write(file)
+            if fsync:
+                file.flush()
+                os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
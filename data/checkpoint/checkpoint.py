@@ -0,0 +1,81 @@
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict
+
+from data.checkpoint.atomic_write import atomic_write
+
+
+class Checkpoint:
+    """
+    Small state file that lets a long run be resumed where it stopped:
+    the position of the [RequestGenerator] (with the windows it handed out that are not done yet)
+    and the counters of the [DataStore] (so file numbering continues instead of starting over)
+
+    Writes are batched, the file is only rewritten every [save_every] completed requests
+    or [save_interval] seconds, and atomic, a crash while writing leaves the previous file intact.
+    Requests done after the last write are scraped again on resume (at least once delivery).
+    """
+
+    VERSION = 1
+
+    def __init__(
+        self,
+        path: str,
+        save_every: int = 20,
+        save_interval: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.path = path
+        self.save_every = save_every
+        self.save_interval = save_interval
+        self.clock = clock
+        self.saves = 0
+        self._unsaved = 0
+        self._saved_at = clock()
+
+    def load(self) -> Dict[str, Any] | None:
+        """
+        The state saved by a previous run, None if there isn't one
+        """
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "r", encoding="utf-8") as file:
+            state = json.load(file)
+        if state.get("version") != self.VERSION:
+            raise ValueError(f"Unsupported checkpoint version in {self.path}")
+        return state
+
+    def record_completed(self) -> None:
+        """
+        Counts a request as done, it will be part of the next save
+        """
+        self._unsaved += 1
+
+    def due(self) -> bool:
+        """
+        Whether enough requests were completed, or enough time passed, to save again
+        """
+        if self._unsaved == 0:
+            return False
+        return (
+            self._unsaved >= self.save_every
+            or self.clock() - self._saved_at >= self.save_interval
+        )
+
+    def save(self, generator_state: Dict[str, Any], store_state: Dict[str, Any]) -> None:
+        """
+        Replaces the state file atomically
+        """
+        state = {
+            "version": self.VERSION,
+            "saved_at": datetime.now().isoformat(),
+            "generator": generator_state,
+            "store": store_state,
+        }
+        atomic_write(self.path, lambda file: json.dump(state, file), fsync=True)
+
+        self.saves += 1
+        self._unsaved = 0
+        self._saved_at = self.clock()
@@ -1,7 +1,10 @@
 import csv
 import os
-from typing import Dict
+import time
+from collections import OrderedDict
+from typing import IO, Any, Dict, Iterable, List, TextIO, Tuple
 from urllib.parse import urlparse
+from data.checkpoint.atomic_write import atomic_write
 from data.data_store import DataStore
 from decorators.base_class import baseclass
 from entities.scrape_request.scrape_request import ScrapeRequest
@@ -11,37 +14,127 @@ from entities.scraped_data.scraped_data import ScrapedData
 class CSVStore(DataStore):
     """
     DataStore implementation that will save the files in a CSV fromat
+
+    Records don't need to have the same keys: a file has the columns of every record saved to it,
+    a record without one of them leaves it empty.
+    When a record brings a new column the file is rewritten once with the wider header
     """
 
-    def __init__(self, multiple_files: bool = False):
+    RECENT_REQUESTS = 256
+
+    def __init__(
+        self,
+        multiple_files: bool = False,
+        buffered: bool = False,
+        max_open_files: int = 32,
+        flush_rows: int = 1000,
+        flush_bytes: int = 1024 * 1024,
+        flush_interval: float = 5.0,
+        root: str | None = None,
+    ):
         """
         If multiple_files=False [CSVStore] will group the data of requests from the same site into single csv
         If multiple_files=True [CSVStore] will cerate a new csv for the requests data
+
+        If buffered=True the rows are kept in memory and written in batches,
+        through files that are kept open between writes (at most [max_open_files], least recently used are closed)
+        The rows are written once [flush_rows] rows or about [flush_bytes] bytes are waiting,
+        when [flush_interval] seconds passed since the last write, and on [flush] or [close]
+
+        [root] the folder where the folder of every site is created, by default the cwd
         """
         self.multiple_files = multiple_files
+        self.root = root
         self.urls_saved: Dict[str, int] = {}  # { "site.com": 1 }
 
+        self.buffered = buffered
+        self.max_open_files = max_open_files
+        self.flush_rows = flush_rows
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+
+        # Buffered mode state
+        self._folders: Dict[str, str] = {}  # { "site.com": "/cwd/site.com" }
+        self._url_filenames: Dict[str, str] = {}  # { url: "site.com_path" }
+        # { file path: (columns of the rows, rows) }
+        self._pending: Dict[str, Tuple[Dict[str, None], List[Dict[str, Any]]]] = {}
+        self._pending_rows = 0
+        self._pending_bytes = 0
+        self._last_flush = time.monotonic()
+        self._open_files: OrderedDict[str, Tuple[TextIO, csv.DictWriter]] = (
+            OrderedDict()
+        )
+        # { request: file number } of the requests whose records are still being saved
+        self._recent_requests: OrderedDict[ScrapeRequest, int] = OrderedDict()
+        # { file path: (columns, set of the columns) } of the files written recently
+        self._headers: OrderedDict[str, Tuple[List[str], set]] = OrderedDict()
+
     @baseclass
     def save(self, data: ScrapedData, request: ScrapeRequest) -> None:
         """
         Save the data scraped from the request
         """
+        file_num = self._file_num_for_request(data, request)
+
+        if self.buffered:
+            self._buffer(data, request, file_num)
+            return
+
         folder = self._get_folder(request.url)
-        filename = self._get_filename(request.url)
+        filename = self._get_filename(request.url, file_num)
 
         self._save_to(folder, filename, data)
-        self._register_request(data, request)
+
+    @baseclass
+    def flush(self) -> None:
+        """
+        Writes the buffered rows to their files
+        """
+        for file_path, (fieldnames, rows) in self._pending.items():
+            _, writer = self._open_file(file_path, fieldnames.keys())
+            writer.writerows(rows)
+
+        for csvfile, _ in self._open_files.values():
+            csvfile.flush()
+
+        self._pending.clear()
+        self._pending_rows = 0
+        self._pending_bytes = 0
+        self._last_flush = time.monotonic()
+
+    @baseclass
+    def close(self) -> None:
+        """
+        Writes the buffered rows and closes the files kept open
+        """
+        self.flush()
+        while self._open_files:
+            _, (csvfile, _) = self._open_files.popitem(last=False)
+            csvfile.close()
+
+    @baseclass
+    def get_state(self) -> Dict[str, Any]:
+        return {"urls_saved": dict(self.urls_saved)}
+
+    @baseclass
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        """
+        Continues numbering the files of every url from where the previous run stopped
+        """
+        self.urls_saved.update(state.get("urls_saved", {}))
 
     def _save_to(self, folder: str, filename: str, data: ScrapedData):
         """
         It uses the folder and filename to define the path where the data will be saved
         """
         file_path = os.path.join(folder, filename)
+        row = data.get_data()
+        fieldnames = self._columns(file_path, row.keys())
 
         # Open file in append mode
         with open(file_path, "a", newline="", encoding="utf-8") as csvfile:
 
-            writer = csv.DictWriter(csvfile, fieldnames=data.get_data().keys())
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
 
             # If it's empty write the header row using the headers in the subsequent writewrow
             file_is_empty = os.path.getsize(file_path) == 0
@@ -49,30 +142,144 @@ class CSVStore(DataStore):
                 writer.writeheader()
 
             # Write data to CSV file
-            writer.writerow(data.get_data())
+            writer.writerow(row)
+
+    def _buffer(self, data: ScrapedData, request: ScrapeRequest, file_num: int):
+        """
+        Keeps the row in memory until one of the flush thresholds is reached
+        """
+        file_path = self._get_file_path(request.url, file_num)
+        row = data.get_data()
+
+        pending = self._pending.get(file_path)
+        if pending is None:
+            pending = self._pending[file_path] = (dict.fromkeys(row), [])
+        elif len(row) != len(pending[0]) or not pending[0].keys() >= row.keys():
+            # The columns of every row waiting for the file
+            pending[0].update(dict.fromkeys(row))
+        pending[1].append(row)
+
+        self._pending_rows += 1
+        self._pending_bytes += sum(len(str(value)) for value in row.values())
+
+        if (
+            self._pending_rows >= self.flush_rows
+            or self._pending_bytes >= self.flush_bytes
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def _get_file_path(self, url: str, file_num: int) -> str:
+        """
+        Same path as [_get_folder] and [_get_filename],
+        but the folder and url filename are only resolved once per site and url
+        """
+        base_url = urlparse(url).netloc
+        folder = self._folders.get(base_url)
+        if folder is None:
+            folder = self._get_folder(url)
+            self._folders[base_url] = folder
+
+        url_filename = self._url_filenames.get(url)
+        if url_filename is None:
+            url_filename = self._url_filename(url)
+            self._url_filenames[url] = url_filename
+
+        if self.multiple_files:
+            filename = f"{ file_num }_{ url_filename }.csv"
+        else:
+            filename = f"{ url_filename }.csv"
+
+        return os.path.join(folder, filename)
+
+    def _open_file(
+        self, file_path: str, keys: Iterable[str]
+    ) -> Tuple[TextIO, csv.DictWriter]:
+        """
+        Returns the open file and its writer, opening the file if it's not open yet
+        When too many files are open, the least recently used one is closed
+        """
+        fieldnames = self._columns(file_path, keys)
+        open_file = self._open_files.get(file_path)
+        if open_file is not None:
+            self._open_files.move_to_end(file_path)
+            return open_file
+
+        if len(self._open_files) >= self.max_open_files:
+            _, (csvfile, _) = self._open_files.popitem(last=False)
+            csvfile.close()
+
+        csvfile = open(file_path, "a", newline="", encoding="utf-8")
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+
+        # The header is only needed when the file is new, it's checked once per open
+        if os.fstat(csvfile.fileno()).st_size == 0:
+            writer.writeheader()
+
+        self._open_files[file_path] = (csvfile, writer)
+        return csvfile, writer
+
+    def _columns(self, file_path: str, keys: Iterable[str]) -> List[str]:
+        """
+        The columns of the file, with the [keys] it doesn't have yet added at the end
+        A file that already has rows is rewritten with the new header, its rows leave the new columns empty
+        """
+        header = self._headers.get(file_path)
+        if header is None:
+            open_file = self._open_files.get(file_path)
+            if open_file is not None:
+                # What it wrote may not be on disk yet
+                columns = list(open_file[1].fieldnames)
+            else:
+                columns = read_header(file_path)
+            header = (columns, set(columns))
+        else:
+            self._headers.move_to_end(file_path)
+        columns, known = header
+
+        new = [key for key in keys if key not in known]
+        if new:
+            if columns:
+                self._rewrite_header(file_path, columns + new)
+            columns = columns + new
+            header = (columns, set(columns))
+
+        self._headers[file_path] = header
+        if len(self._headers) > self.RECENT_REQUESTS:
+            self._headers.popitem(last=False)
+        return columns
+
+    def _rewrite_header(self, file_path: str, columns: List[str]) -> None:
+        """
+        Replaces the header of the file with wider [columns], the open handle is closed first
+        """
+        open_file = self._open_files.pop(file_path, None)
+        if open_file is not None:
+            open_file[0].close()
+        widen_header(file_path, columns)
 
     def _get_folder(self, url: str) -> str:
         """
         It will extract the base_url from the url
-        And create a folder if one does not already exist in the cwd
+        And create a folder if one does not already exist in the [root] (the cwd by default)
         """
         parsed_url = urlparse(url)
         base_url = parsed_url.netloc
 
         # Create the folder if it doesn't exist
-        folder_path = os.path.join(os.getcwd(), base_url)
+        folder_path = os.path.join(self.root or os.getcwd(), base_url)
         os.makedirs(folder_path, exist_ok=True)
 
         return folder_path
 
-    def _get_filename(self, url: str) -> str:
+    def _get_filename(self, url: str, file_num: int) -> str:
         """
         Returns the file where the data should be saved
-        If [multiple_files = True] it will return a new filename for the request
+        If [multiple_files = True] it will return the filename numbered for the request
         If [multiple_files = False] it will return the name of the shared file for the url data
         """
         if self.multiple_files:
-            return f"{ self._request_num_for_url(url) }_{ self._url_filename(url) }.csv"
+            return f"{ file_num }_{ self._url_filename(url) }.csv"
         else:
             return f"{ self._url_filename(url) }.csv"
 
@@ -89,6 +296,25 @@ class CSVStore(DataStore):
         num = self.urls_saved.get(url, 0)
         return num
 
+    def _file_num_for_request(self, data: ScrapedData, request: ScrapeRequest) -> int:
+        """
+        The number of the request among the requests for its url, it's used to name its file
+        A factory can create many records from the same request, they all get the same number
+        Requests are remembered while they are recent, as their records can be interleaved with other requests
+        """
+        file_num = self._recent_requests.get(request)
+        if file_num is not None:
+            self._recent_requests.move_to_end(request)
+            return file_num
+
+        file_num = self._request_num_for_url(request.url)
+        self._register_request(data, request)
+
+        self._recent_requests[request] = file_num
+        if len(self._recent_requests) > self.RECENT_REQUESTS:
+            self._recent_requests.popitem(last=False)
+        return file_num
+
     def _register_request(self, data: ScrapedData, request: ScrapeRequest):
         """
         Registers the request was made, for the specified url
@@ -96,3 +322,32 @@ class CSVStore(DataStore):
         """
         current_num = self._request_num_for_url(request.url)
         self.urls_saved[request.url] = current_num + 1
+
+
+def read_header(file_path: str) -> List[str]:
+    """
+    The header of a CSV file, empty when there's no file yet
+    """
+    if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
+        return []
+    with open(file_path, "r", newline="", encoding="utf-8") as csvfile:
+        return next(csv.reader(csvfile), [])
+
+
+def widen_header(file_path: str, columns: List[str]) -> None:
+    """
+    Replaces the header of the CSV file with wider [columns] (the old ones first), atomically
+    The rows written before get empty values for the new columns
+    """
+
+    def write(target: IO) -> None:
+        with open(file_path, "r", newline="", encoding="utf-8") as source:
+            reader = csv.reader(source)
+            writer = csv.writer(target)
+            old_columns = next(reader, [])
+            padding = [""] * (len(columns) - len(old_columns))
+            writer.writerow(columns)
+            for row in reader:
+                writer.writerow(row + padding)
+
+    atomic_write(file_path, write)
@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+import json
+from typing import Any, AsyncIterator, Dict
 from entities.scrape_request.scrape_request import ScrapeRequest
 from entities.scraped_data.scraped_data import ScrapedData
 
@@ -6,8 +8,82 @@ from entities.scraped_data.scraped_data import ScrapedData
 class DataStore(ABC):
     """
     Blueprint to build a class that will store the data from a [ScrapeRequest]
+
+    Stores that buffer the data or keep files open write everything on [flush] and [close],
+    they can also be used as a context manager to be closed automatically
+
+    The [Scraper] uses the awaitable [asave] and [aclose],
+    by default they just call [save] and [close], stores that write in the background override them
     """
 
     @abstractmethod
     def save(self, data: ScrapedData, request: ScrapeRequest) -> None:
         pass
+
+    def flush(self) -> None:
+        """
+        Writes any data the store is holding in memory
+        """
+        pass
+
+    def close(self) -> None:
+        """
+        Writes any pending data and releases the resources of the store (open files...)
+        """
+        self.flush()
+
+    def __enter__(self) -> "DataStore":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    async def asave(self, data: ScrapedData, request: ScrapeRequest) -> None:
+        """
+        Awaitable version of [save]
+        """
+        self.save(data, request)
+
+    async def save_stream(
+        self, chunks: AsyncIterator[bytes], request: ScrapeRequest
+    ) -> None:
+        """
+        Saves a response body that arrives in chunks, as it is
+        By default the body is put together and saved as a single record,
+        stores that can write the bytes as they come override it
+        """
+        body = bytearray()
+        async for chunk in chunks:
+            body += chunk
+        await self.asave(ScrapedData(json.loads(body)), request)
+
+    async def aflush(self) -> None:
+        """
+        Awaitable version of [flush]
+        """
+        self.flush()
+
+    async def aclose(self) -> None:
+        """
+        Awaitable version of [close]
+        """
+        self.close()
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Records accepted by [asave] that are not written yet, for stores that queue them
+        """
+        return 0
+
+    def get_state(self) -> Dict[str, Any]:
+        """
+        JSON serializable state (counters...), so another run can continue where this one stopped
+        """
+        return {}
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        """
+        Continues from a state returned by [get_state]
+        """
+        pass
@@ -0,0 +1,104 @@
+import hashlib
+import math
+import os
+import struct
+from typing import BinaryIO, Iterator
+
+from data.checkpoint.atomic_write import atomic_write
+from data.dedup.record_index import RecordIndex
+from decorators.base_class import baseclass
+
+
+class BloomIndex(RecordIndex):
+    """
+    Bloom filter sized for [capacity] keys with a [error_rate] chance of false positives,
+    it takes about 1.2 bytes per key at 1%, whatever the size of the keys.
+    A false positive makes a new record look like a duplicate, so it's dropped:
+    the [error_rate] is the share of unique records that can be lost once the filter is full.
+
+    With a [path] the filter is written to the file on [flush] (atomically) and loaded by the next run
+    """
+
+    MAGIC = b"SCRAPSBF"
+    HEADER = struct.Struct("<8sQIQ")  # magic, bits, hashes, keys added
+
+    def __init__(
+        self,
+        capacity: int,
+        error_rate: float = 0.001,
+        path: str | None = None,
+    ):
+        if capacity < 1:
+            raise ValueError("BloomIndex capacity must be at least 1")
+        if not 0 < error_rate < 1:
+            raise ValueError("BloomIndex error_rate must be between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.path = path
+
+        bits = -capacity * math.log(error_rate) / math.log(2) ** 2
+        self.bits = max(8, math.ceil(bits))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self._filter = bytearray((self.bits + 7) // 8)
+        self._count = 0
+        self._dirty = False
+
+        if path is not None and os.path.exists(path):
+            self._load()
+
+    @baseclass
+    def add(self, key: str) -> bool:
+        new = False
+        for bit in self._bits_of(key):
+            byte, mask = bit >> 3, 1 << (bit & 7)
+            if not self._filter[byte] & mask:
+                self._filter[byte] |= mask
+                new = True
+        if new:
+            self._count += 1
+            self._dirty = True
+        return new
+
+    @baseclass
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self._filter[bit >> 3] & (1 << (bit & 7)) for bit in self._bits_of(key)
+        )
+
+    @baseclass
+    def __len__(self) -> int:
+        return self._count
+
+    @baseclass
+    def flush(self) -> None:
+        if self.path is None or not self._dirty:
+            return
+
+        def write(file: BinaryIO) -> None:
+            file.write(self.HEADER.pack(self.MAGIC, self.bits, self.hashes, self._count))
+            file.write(self._filter)
+
+        atomic_write(self.path, write, binary=True)
+        self._dirty = False
+
+    def _load(self) -> None:
+        with open(self.path, "rb") as file:
+            header = file.read(self.HEADER.size)
+            magic, bits, hashes, count = self.HEADER.unpack(header)
+            if magic != self.MAGIC:
+                raise ValueError(f"{self.path} is not a BloomIndex file")
+            # The filter keeps the size it was created with
+            self.bits, self.hashes, self._count = bits, hashes, count
+            self._filter = bytearray(file.read())
+        if len(self._filter) != (self.bits + 7) // 8:
+            raise ValueError(f"{self.path} is truncated")
+
+    def _bits_of(self, key: str) -> Iterator[int]:
+        """
+        Positions of the key, from two hashes combined (Kirsch-Mitzenmacher)
+        """
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first, second = struct.unpack("<QQ", digest)
+        second |= 1
+        for index in range(self.hashes):
+            yield (first + index * second) % self.bits
@@ -0,0 +1,123 @@
+import json
+from typing import Any, AsyncIterator, Dict, List
+
+from data.data_store import DataStore
+from data.dedup.record_index import RecordIndex
+from data.dedup.set_index import SetIndex
+from decorators.base_class import baseclass
+from entities.scrape_request.scrape_request import ScrapeRequest
+from entities.scraped_data.scraped_data import ScrapedData
+
+
+class DedupDataStore(DataStore):
+    """
+    DataStore that wraps another store and only lets through records it hasn't stored yet
+
+    Windows that share a boundary date get the records of that date twice from APIs with inclusive ranges,
+    every record is identified by its [id_fields] (NEO: "id", and the date when one asteroid has
+    an approach on many dates) and the keys already stored are kept in a [RecordIndex].
+    Records without the id fields are always stored.
+
+    The index is flushed after the wrapped store, so a key is never persisted before its record
+    """
+
+    def __init__(
+        self,
+        store: DataStore,
+        id_fields: str | List[str],
+        index: RecordIndex | None = None,
+    ):
+        """
+        [store] the store the unique records are written to
+        [id_fields] field, or fields, of the record that identify it
+        [index] the keys already stored, by default an in-memory [SetIndex]
+        """
+        self.store = store
+        self.id_fields = [id_fields] if isinstance(id_fields, str) else list(id_fields)
+        self.index = index if index is not None else SetIndex()
+        self.saved = 0
+        self.duplicates = 0
+        self.unkeyed = 0
+
+    @baseclass
+    def save(self, data: ScrapedData, request: ScrapeRequest) -> None:
+        if self._is_new(data):
+            self.store.save(data, request)
+
+    @baseclass
+    async def asave(self, data: ScrapedData, request: ScrapeRequest) -> None:
+        if self._is_new(data):
+            await self.store.asave(data, request)
+
+    @baseclass
+    async def save_stream(
+        self, chunks: AsyncIterator[bytes], request: ScrapeRequest
+    ) -> None:
+        """
+        The body goes to the wrapped store as it is, it's never decoded so it's stored like a record without ids
+        """
+        self.unkeyed += 1
+        self.saved += 1
+        await self.store.save_stream(chunks, request)
+
+    @baseclass
+    def flush(self) -> None:
+        self.store.flush()
+        self.index.flush()
+
+    @baseclass
+    async def aflush(self) -> None:
+        await self.store.aflush()
+        self.index.flush()
+
+    @baseclass
+    def close(self) -> None:
+        self.store.close()
+        self.index.close()
+
+    @baseclass
+    async def aclose(self) -> None:
+        await self.store.aclose()
+        self.index.close()
+
+    @property
+    @baseclass
+    def queue_depth(self) -> int:
+        return self.store.queue_depth
+
+    @baseclass
+    def get_state(self) -> Dict[str, Any]:
+        return self.store.get_state()
+
+    @baseclass
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        self.store.restore_state(state)
+
+    def record_key(self, data: ScrapedData) -> str | None:
+        """
+        The key of the record, None when it doesn't have every id field
+        """
+        return record_key(data.get_data(), self.id_fields)
+
+    def _is_new(self, data: ScrapedData) -> bool:
+        key = self.record_key(data)
+        if key is None:
+            self.unkeyed += 1
+        elif not self.index.add(key):
+            self.duplicates += 1
+            return False
+        self.saved += 1
+        return True
+
+
+def record_key(record: Dict[str, Any], id_fields: List[str]) -> str | None:
+    """
+    The key of the record made of its [id_fields], None when it doesn't have every one of them
+    """
+    values = []
+    for field in id_fields:
+        if field not in record:
+            return None
+        value = record[field]
+        values.append(value if isinstance(value, str) else json.dumps(value))
+    return "\x1f".join(values)
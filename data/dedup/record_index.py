@@ -0,0 +1,35 @@
+from abc import ABC, abstractmethod
+
+
+class RecordIndex(ABC):
+    """
+    Blueprint of the set of record keys a [DedupDataStore] has already stored
+    Indexes kept on disk write the new keys on [flush], so they survive between runs
+    """
+
+    @abstractmethod
+    def add(self, key: str) -> bool:
+        """
+        Adds the key, returns False if it was already in the index
+        """
+        pass
+
+    @abstractmethod
+    def __contains__(self, key: str) -> bool:
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """
+        Keys added to the index
+        """
+        pass
+
+    def flush(self) -> None:
+        """
+        Writes the keys added since the last flush
+        """
+        pass
+
+    def close(self) -> None:
+        self.flush()
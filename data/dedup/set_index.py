@@ -0,0 +1,47 @@
+import os
+from typing import List, Set
+
+from data.dedup.record_index import RecordIndex
+from decorators.base_class import baseclass
+
+
+class SetIndex(RecordIndex):
+    """
+    Exact index, every key is kept in memory
+    With a [path] the keys are appended to a file, one per line, and loaded again by the next run
+    Fits runs with up to a few million records, for bigger ones see [BloomIndex]
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self._keys: Set[str] = set()
+        self._unsaved: List[str] = []
+        if path is not None and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file:
+                self._keys = {line.rstrip("\n") for line in file if line != "\n"}
+
+    @baseclass
+    def add(self, key: str) -> bool:
+        if key in self._keys:
+            return False
+        self._keys.add(key)
+        if self.path is not None:
+            self._unsaved.append(key)
+        return True
+
+    @baseclass
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys
+
+    @baseclass
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @baseclass
+    def flush(self) -> None:
+        if not self._unsaved:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write("\n".join(self._unsaved) + "\n")
+        self._unsaved = []
@@ -0,0 +1,203 @@
+import gzip
+import json
+import os
+import tempfile
+import time
+from typing import Any, AsyncIterator, BinaryIO, Dict
+from urllib.parse import urlparse
+from data.data_store import DataStore
+from decorators.base_class import baseclass
+from entities.scrape_request.dated_request import DatedRequest
+from entities.scrape_request.scrape_request import ScrapeRequest
+from entities.scraped_data.scraped_data import ScrapedData
+
+
+class _JSONLFile:
+    """
+    File the records of a url are appended to, through the configured compression
+    """
+
+    def __init__(self, path: str, compression: str | None):
+        self.path = path
+        self.bytes_written = 0
+        self.opened_at = time.monotonic()
+        self._raw_file: BinaryIO | None = None
+
+        if compression is None:
+            self._file = open(path, "ab")
+        elif compression == "gzip":
+            self._file = gzip.open(path, "ab")
+        elif compression == "zstd":
+            try:
+                import zstandard
+            except ImportError as error:
+                raise ImportError(
+                    "JSONLStore needs the zstandard package for zstd compression"
+                ) from error
+            self._raw_file = open(path, "ab")
+            self._file = zstandard.ZstdCompressor().stream_writer(self._raw_file)
+        else:
+            raise ValueError(f"Unknown compression: {compression}")
+
+    def write(self, line: bytes) -> None:
+        self._file.write(line)
+        self.bytes_written += len(line)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+        if self._raw_file is not None and not self._raw_file.closed:
+            self._raw_file.close()
+
+
+class JSONLStore(DataStore):
+    """
+    DataStore implementation that appends every response as one JSON record per line,
+    together with the request it came from: { "url", "payload", "start_date", "end_date", "data" }
+
+    Unlike [CSVStore], nested data is kept as JSON so it can be parsed back.
+    Streamed bodies (see [save_stream]) are written as they are without decoding them.
+    """
+
+    EXTENSIONS = {None: ".jsonl", "gzip": ".jsonl.gz", "zstd": ".jsonl.zst"}
+    SPOOL_BYTES = 1024 * 1024  # Streamed bodies bigger than this are spooled to disk
+
+    def __init__(
+        self,
+        compression: str | None = None,
+        max_file_bytes: int | None = None,
+        max_file_seconds: float | None = None,
+        root: str | None = None,
+    ):
+        """
+        [compression] None, "gzip" or "zstd" (needs the zstandard package)
+        A new file is started once [max_file_bytes] bytes (before compression) were written to the current one,
+        or [max_file_seconds] seconds passed since it was opened
+        [root] the folder where the folder of every site is created, by default the cwd
+        """
+        if compression not in self.EXTENSIONS:
+            raise ValueError(f"Unknown compression: {compression}")
+        self.compression = compression
+        self.max_file_bytes = max_file_bytes
+        self.max_file_seconds = max_file_seconds
+        self.root = root
+        self.files_written: Dict[str, int] = {}  # { url: files started for the url }
+        self._open_files: Dict[str, _JSONLFile] = {}
+
+    @baseclass
+    def save(self, data: ScrapedData, request: ScrapeRequest) -> None:
+        """
+        Appends the data, and the request it came from, as a single line
+        """
+        self._file_for(request.url).write(self._encode(data, request))
+
+    @baseclass
+    async def save_stream(
+        self, chunks: AsyncIterator[bytes], request: ScrapeRequest
+    ) -> None:
+        """
+        Writes the body as the data of the record without decoding it
+        It's spooled first (to disk once it's over [SPOOL_BYTES]), a body cut halfway is never written
+        """
+        with tempfile.SpooledTemporaryFile(self.SPOOL_BYTES) as spool:
+            async for chunk in chunks:
+                # JSON strings can't hold raw line breaks, removing them keeps the body
+                # valid while keeping the record on a single line
+                spool.write(chunk.replace(b"\r", b"").replace(b"\n", b""))
+            if spool.tell() == 0:
+                spool.write(b"null")
+            spool.seek(0)
+
+            jsonl_file = self._file_for(request.url)
+            jsonl_file.write(self._record_prefix(request) + b',"data":')
+            while True:
+                block = spool.read(self.SPOOL_BYTES)
+                if not block:
+                    break
+                jsonl_file.write(block)
+            jsonl_file.write(b"}\n")
+
+    @baseclass
+    def flush(self) -> None:
+        for jsonl_file in self._open_files.values():
+            jsonl_file.flush()
+
+    @baseclass
+    def close(self) -> None:
+        for jsonl_file in self._open_files.values():
+            jsonl_file.close()
+        self._open_files.clear()
+
+    @baseclass
+    def get_state(self) -> Dict[str, Any]:
+        return {"files_written": dict(self.files_written)}
+
+    @baseclass
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        """
+        The next files of every url continue the numbering of the previous run
+        """
+        self.files_written.update(state.get("files_written", {}))
+
+    def _encode(self, data: ScrapedData, request: ScrapeRequest) -> bytes:
+        record = self._request_record(request)
+        record["data"] = data.get_data()
+        return self._dumps(record) + b"\n"
+
+    def _request_record(self, request: ScrapeRequest) -> Dict[str, Any]:
+        record: Dict[str, Any] = {"url": request.url, "payload": request.get_payload()}
+        if isinstance(request, DatedRequest):
+            record["start_date"] = request.start_date.isoformat()
+            record["end_date"] = request.end_date.isoformat()
+        return record
+
+    def _record_prefix(self, request: ScrapeRequest) -> bytes:
+        """
+        The record of the request without its closing brace, the data is written after it
+        """
+        return self._dumps(self._request_record(request))[:-1]
+
+    @staticmethod
+    def _dumps(record: Dict[str, Any]) -> bytes:
+        return json.dumps(record, separators=(",", ":"), default=str).encode("utf-8")
+
+    def _file_for(self, url: str) -> _JSONLFile:
+        """
+        The file the url records are appended to, a new one is started when the current one is full or too old
+        """
+        jsonl_file = self._open_files.get(url)
+        if jsonl_file is not None and self._should_rotate(jsonl_file):
+            jsonl_file.close()
+            jsonl_file = None
+
+        if jsonl_file is None:
+            jsonl_file = _JSONLFile(self._next_path(url), self.compression)
+            self._open_files[url] = jsonl_file
+
+        return jsonl_file
+
+    def _should_rotate(self, jsonl_file: _JSONLFile) -> bool:
+        if self.max_file_bytes is not None:
+            if jsonl_file.bytes_written >= self.max_file_bytes:
+                return True
+        if self.max_file_seconds is not None:
+            if time.monotonic() - jsonl_file.opened_at >= self.max_file_seconds:
+                return True
+        return False
+
+    def _next_path(self, url: str) -> str:
+        """
+        Path of the next file for the url: <root>/<site>/<part>_<url as filename><extension>
+        """
+        folder = os.path.join(self.root or os.getcwd(), urlparse(url).netloc)
+        os.makedirs(folder, exist_ok=True)
+
+        part = self.files_written.get(url, 0)
+        self.files_written[url] = part + 1
+
+        url_filename = url.replace("https://", "").replace("/", "_")
+        return os.path.join(
+            folder, f"{part}_{url_filename}{self.EXTENSIONS[self.compression]}"
+        )
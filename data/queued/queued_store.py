@@ -0,0 +1,224 @@
+import asyncio
+import logging
+import tempfile
+import threading
+import time
+from typing import Any, AsyncIterator, BinaryIO, Dict, List
+from data.data_store import DataStore
+from decorators.base_class import baseclass
+from entities.scrape_request.scrape_request import ScrapeRequest
+from entities.scraped_data.scraped_data import ScrapedData
+
+logger = logging.getLogger(__name__)
+
+
+class QueuedDataStore(DataStore):
+    """
+    DataStore that wraps another store ([CSVStore]...) and writes to it in the background
+
+    [asave] only puts the data in a bounded queue, so the scraper can go on with the next request
+    while writer tasks drain the queue into the wrapped store.
+    When the queue is full [asave] waits for room (backpressure),
+    and [aclose] waits for every queued item to be written before closing the wrapped store.
+    """
+
+    SPOOL_BYTES = 1024 * 1024  # Streamed bodies bigger than this are spooled to disk
+
+    def __init__(
+        self,
+        store: DataStore,
+        max_queue_size: int = 1000,
+        writers: int = 1,
+        use_thread: bool = True,
+    ):
+        """
+        [store] the store the data is written to
+        [max_queue_size] items that can be waiting to be written before [asave] blocks
+        [writers] number of background tasks writing to the store
+        If use_thread=True the writes run in a worker thread, so they never block the event loop
+        """
+        if writers < 1:
+            raise ValueError("QueuedDataStore needs at least one writer")
+        self.store = store
+        self.max_queue_size = max_queue_size
+        self.writers = writers
+        self.use_thread = use_thread
+
+        # Counters
+        self.saved = 0
+        self.failed = 0
+        self.max_queue_depth = 0
+        self.total_write_time = 0.0
+        self.max_write_time = 0.0
+        self.total_wait_time = 0.0  # Time items spent in the queue before being written
+
+        self._queue: asyncio.Queue | None = None
+        self._writer_tasks: List[asyncio.Task] = []
+        self._errors: List[Exception] = []
+        # The wrapped store is not expected to be thread safe
+        self._store_lock = threading.Lock()
+
+    @property
+    @baseclass
+    def queue_depth(self) -> int:
+        """
+        Items waiting to be written
+        """
+        return self._queue.qsize() if self._queue is not None else 0
+
+    @property
+    def average_write_time(self) -> float:
+        written = self.saved + self.failed
+        return self.total_write_time / written if written else 0.0
+
+    @baseclass
+    def save(self, data: ScrapedData, request: ScrapeRequest) -> None:
+        """
+        Writes straight to the wrapped store, outside of an event loop there is nothing to overlap with
+        """
+        with self._store_lock:
+            self.store.save(data, request)
+            self.saved += 1
+
+    @baseclass
+    async def asave(self, data: ScrapedData, request: ScrapeRequest) -> None:
+        """
+        Queues the data to be written, waits only if the queue is full
+        """
+        self._start_writers()
+        await self._queue.put((data, request, time.perf_counter()))
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+
+    @baseclass
+    async def save_stream(
+        self, chunks: AsyncIterator[bytes], request: ScrapeRequest
+    ) -> None:
+        """
+        Forwards the body to the wrapped store, so it can write it as it is ([JSONLStore])
+        The body is spooled first (to disk once it's over [SPOOL_BYTES]),
+        then written like the queued items, outside of the event loop thread with use_thread=True
+        """
+        with tempfile.SpooledTemporaryFile(self.SPOOL_BYTES) as spool:
+            async for chunk in chunks:
+                spool.write(chunk)
+            spool.seek(0)
+            if self.use_thread:
+                await asyncio.to_thread(self._save_spooled, spool, request)
+            else:
+                # Nothing else writes while the loop is busy with it
+                await self.store.save_stream(self._read_spool(spool), request)
+        self.saved += 1
+
+    def _save_spooled(self, spool: BinaryIO, request: ScrapeRequest) -> None:
+        """
+        Runs in a worker thread, so the wrapped store is only used by one writer at a time
+        """
+        with self._store_lock:
+            asyncio.run(self.store.save_stream(self._read_spool(spool), request))
+
+    @classmethod
+    async def _read_spool(cls, spool: BinaryIO) -> AsyncIterator[bytes]:
+        while True:
+            block = spool.read(cls.SPOOL_BYTES)
+            if not block:
+                return
+            yield block
+
+    @baseclass
+    def flush(self) -> None:
+        with self._store_lock:
+            self.store.flush()
+
+    @baseclass
+    async def aflush(self) -> None:
+        """
+        Waits until everything queued so far is written, then flushes the wrapped store
+        If a write failed it's raised, so what was queued is never taken as stored (by a checkpoint...)
+        """
+        if self._queue is not None:
+            await self._queue.join()
+        await self._call_store(self.flush)
+        if self._errors:
+            raise self._errors[0]
+
+    @baseclass
+    def get_state(self) -> Dict[str, Any]:
+        with self._store_lock:
+            return self.store.get_state()
+
+    @baseclass
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        with self._store_lock:
+            self.store.restore_state(state)
+
+    @baseclass
+    def close(self) -> None:
+        with self._store_lock:
+            self.store.close()
+
+    @baseclass
+    async def aclose(self) -> None:
+        """
+        Waits until the queue is drained, stops the writers and closes the wrapped store
+        If any write failed, the first error is raised once everything else is written
+        """
+        if self._queue is not None:
+            await self._queue.join()
+        for task in self._writer_tasks:
+            task.cancel()
+        await asyncio.gather(*self._writer_tasks, return_exceptions=True)
+        self._writer_tasks = []
+        self._queue = None
+
+        await self._call_store(self.close)
+
+        if self._errors:
+            raise self._errors[0]
+
+    def _start_writers(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        if not self._writer_tasks:
+            self._writer_tasks = [
+                asyncio.create_task(self._write()) for _ in range(self.writers)
+            ]
+
+    async def _write(self) -> None:
+        """
+        Writer task, takes the items from the queue and saves them in the wrapped store
+        """
+        while True:
+            data, request, queued_at = await self._queue.get()
+            started_at = time.perf_counter()
+            try:
+                await self._call_store(self.save, data, request)
+            except Exception as error:
+                self.failed += 1
+                self._errors.append(error)
+                logger.exception("Failed to save data from %s", request.url)
+            finally:
+                write_time = time.perf_counter() - started_at
+                self.total_write_time += write_time
+                self.max_write_time = max(self.max_write_time, write_time)
+                self.total_wait_time += started_at - queued_at
+                self._queue.task_done()
+
+    async def _call_store(self, method, *args) -> None:
+        if self.use_thread:
+            await asyncio.to_thread(method, *args)
+        else:
+            method(*args)
+
+    def stats(self) -> dict:
+        """
+        Snapshot of the counters of the store
+        """
+        return {
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "saved": self.saved,
+            "failed": self.failed,
+            "average_write_time": self.average_write_time,
+            "max_write_time": self.max_write_time,
+            "total_wait_time": self.total_wait_time,
+        }
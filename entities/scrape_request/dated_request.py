@@ -5,6 +5,20 @@ from entities.scrape_request.scrape_request import ScrapeRequest
 
 
 class DatedRequest(ScrapeRequest):
+    """
+    A request for the time window between [start_date] and [end_date]
+    The payload is the template plus the formatted dates, merged every time it's read,
+    so the requests of a range only keep their dates and share everything else
+    """
+
+    __slots__ = (
+        "_start_date",
+        "_end_date",
+        "_start_key",
+        "_end_key",
+        "_date_formatter",
+    )
+
     def __init__(
         self,
         url: str,
@@ -14,17 +28,17 @@ class DatedRequest(ScrapeRequest):
         start_key: str = "from",
         end_key: str = "to",
         date_formatter: Callable[[datetime], str] = None,
+        cacheable: bool = True,
     ):
-        super().__init__(url, payload)
+        """
+        [payload] the template shared by the requests, the dates are not written into it
+        """
+        super().__init__(url, payload, cacheable)
         self._start_date = start_date
         self._end_date = end_date
-        self.start_key = start_key
-        self.end_key = end_key
-        self.date_formatter = date_formatter or self._default_date_formatter
-        # Update Payload with formatted dates
-        payload[self.start_key] = self.date_formatter(self._start_date)
-        payload[self.end_key] = self.date_formatter(self._end_date)
-        self.payload = payload
+        self._start_key = start_key
+        self._end_key = end_key
+        self._date_formatter = date_formatter or self._default_date_formatter
 
     @staticmethod
     def _default_date_formatter(date: datetime) -> str:
@@ -34,20 +48,24 @@ class DatedRequest(ScrapeRequest):
     def start_date(self) -> datetime:
         return self._start_date
 
-    @start_date.setter
-    def start_date(self, value: datetime) -> None:
-        self._start_date = value
-        self._update_payload()
-
     @property
     def end_date(self) -> datetime:
         return self._end_date
 
-    @end_date.setter
-    def end_date(self, value: datetime) -> None:
-        self._end_date = value
-        self._update_payload()
+    @property
+    def start_key(self) -> str:
+        return self._start_key
+
+    @property
+    def end_key(self) -> str:
+        return self._end_key
+
+    @property
+    def date_formatter(self) -> Callable[[datetime], str]:
+        return self._date_formatter
 
-    def _update_payload(self) -> None:
-        self.payload[self.start_key] = self.date_formatter(self._start_date)
-        self.payload[self.end_key] = self.date_formatter(self._end_date)
+    def get_payload(self) -> Dict[str, Any]:
+        payload = dict(self._payload)
+        payload[self._start_key] = self._date_formatter(self._start_date)
+        payload[self._end_key] = self._date_formatter(self._end_date)
+        return payload
@@ -0,0 +1,28 @@
+import hashlib
+import json
+from typing import Any, Dict
+from urllib.parse import parse_qsl, urlsplit, urlunsplit
+
+
+def normalized_request(url: str, payload: Dict[str, Any]) -> str:
+    """
+    The url with its query and the payload merged as sorted parameters,
+    so the same request written in different ways looks the same
+    """
+    parts = urlsplit(url)
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    for key, value in payload.items():
+        if isinstance(value, (dict, list)):
+            value = json.dumps(value, sort_keys=True)
+        params.append((str(key), str(value)))
+    query = "&".join(f"{key}={value}" for key, value in sorted(params))
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", query, "")
+    )
+
+
+def request_key(url: str, payload: Dict[str, Any]) -> str:
+    """
+    Stable hash of the normalized request, used to name cached entries
+    """
+    return hashlib.sha256(normalized_request(url, payload).encode("utf-8")).hexdigest()
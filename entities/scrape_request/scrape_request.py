@@ -1,13 +1,49 @@
 from typing import Dict, Any
 
+from entities.scrape_request.request_key import request_key
+
 
 class ScrapeRequest:
-    def __init__(self, url: str, payload: Dict[str, Any]):
-        self.url = url
-        self._payload = payload
+    """
+    A request to scrape, it can't be changed once created
+    so it can be queued, retried and cached without copying it
+    """
 
-    def set_payload(self, payload: Dict[str, Any]) -> None:
+    __slots__ = ("_url", "_payload", "_cacheable", "_key")
+
+    def __init__(self, url: str, payload: Dict[str, Any], cacheable: bool = True):
+        """
+        [payload] is never modified by the request, it can be shared between requests
+        [cacheable] False makes the scraper always fetch the request, even if a cached response exists
+        """
+        self._url = url
         self._payload = payload
+        self._cacheable = cacheable
+        self._key: str | None = None
+
+    @property
+    def url(self) -> str:
+        return self._url
+
+    @property
+    def cacheable(self) -> bool:
+        return self._cacheable
+
+    @property
+    def key(self) -> str:
+        """
+        Stable hash of the url and payload ([request_key]), the same for equivalent requests
+        It's computed the first time it's needed
+        """
+        if self._key is None:
+            self._key = request_key(self._url, self.get_payload())
+        return self._key
 
     def get_payload(self) -> Dict[str, Any]:
-        return self._payload
+        """
+        A copy of the payload, changing it doesn't change the request
+        """
+        return dict(self._payload)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._url!r}, {self.get_payload()!r})"
@@ -0,0 +1,156 @@
+import json
+from typing import Any, Dict, Iterator, List, Tuple
+
+from decorators.base_class import baseclass
+from entities.scraped_data.factory.scrape_data_factory import ScrapeDataFactory
+from entities.scraped_data.scraped_data import ScrapedData
+
+
+class FlatteningDataFactory(ScrapeDataFactory[ScrapedData]):
+    """
+    Factory that explodes a response into one record per nested item,
+    and flattens the nested fields of every item into scalar columns
+
+    Example: NEO feed { "near_earth_objects": { "2024-01-01": [ {asteroid}, ... ] } }
+    With items_path="near_earth_objects.*.*" and path_keys=["date"]
+    Every asteroid becomes a record with a "date" column, and its own fields flattened
+    { "date": "2024-01-01", "id": "2000433", "estimated_diameter_kilometers_estimated_diameter_min": 0.1, ... }
+
+    Items don't always have the same fields (only some asteroids have "sentry_data"),
+    every record has all the columns seen so far, None for the ones its item doesn't have
+    """
+
+    WILDCARD = "*"
+
+    def __init__(
+        self,
+        items_path: str,
+        fields: Dict[str, str] | None = None,
+        path_keys: List[str] | None = None,
+        separator: str = "_",
+    ):
+        """
+        [items_path] dotted path to the items, a "*" goes through every key of an object or element of a list
+        [fields] columns to keep { column: dotted path inside the item }, by default every field is flattened
+        [path_keys] column names for the keys matched by each "*" of the [items_path], in order
+        [separator] joins the keys of the nested fields in the flattened column names
+        Lists inside an item are kept as a JSON string in a single column
+        """
+        self.items_path = items_path.split(".") if items_path else []
+        self.fields = {
+            column: path.split(".") for column, path in (fields or {}).items()
+        }
+        self.path_keys = path_keys or []
+        self.separator = separator
+        # Every column of the records created so far, in the order they were first seen
+        self.columns: Dict[str, None] = dict.fromkeys(self.path_keys)
+        self.columns.update(dict.fromkeys(self.fields))
+
+    @baseclass
+    def create(self, data: Dict[str, Any]) -> ScrapedData:
+        """
+        Flattens a single item
+        """
+        return ScrapedData(self._with_columns(self._flatten_item(data)))
+
+    @baseclass
+    def create_many(self, data: Dict[str, Any]) -> Iterator[ScrapedData]:
+        """
+        Streams a flattened record for every item in the [items_path] of the response
+        """
+        for keys, item in self._items(data, self.items_path, ()):
+            record = dict(zip(self.path_keys, keys))
+            record.update(self._flatten_item(item))
+            yield ScrapedData(self._with_columns(record))
+
+    @baseclass
+    def create_item(self, item: Any, keys: Tuple[Any, ...] = ()) -> ScrapedData:
+        """
+        Flattens an item of a streamed response, [keys] are the ones matched by the "*" of the path
+        """
+        record = dict(zip(self.path_keys, keys))
+        record.update(self._flatten_item(item))
+        return ScrapedData(self._with_columns(record))
+
+    def _with_columns(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        The record with every column seen so far, the ones it doesn't have are None
+        """
+        columns = self.columns
+        for column in record:
+            if column not in columns:
+                columns[column] = None
+        if len(record) == len(columns):
+            return record
+        return {column: record.get(column) for column in columns}
+
+    def _items(
+        self, node: Any, path: List[str], keys: Tuple[Any, ...]
+    ) -> Iterator[Tuple[Tuple[Any, ...], Any]]:
+        """
+        Walks the path, returning every item found with the keys matched by the wildcards on the way
+        """
+        if not path:
+            yield keys, node
+            return
+
+        segment, rest = path[0], path[1:]
+        if segment == self.WILDCARD:
+            if isinstance(node, dict):
+                children = node.items()
+            elif isinstance(node, list):
+                children = enumerate(node)
+            else:
+                return
+            for key, child in children:
+                yield from self._items(child, rest, keys + (key,))
+        else:
+            child = self._child(node, segment)
+            if child is not None:
+                yield from self._items(child, rest, keys)
+
+    def _flatten_item(self, item: Any) -> Dict[str, Any]:
+        if not isinstance(item, dict):
+            return {"value": self._scalar(item)}
+
+        if self.fields:
+            return {
+                column: self._scalar(self._get_path(item, path))
+                for column, path in self.fields.items()
+            }
+
+        flattened: Dict[str, Any] = {}
+        self._flatten_into(flattened, item, "")
+        return flattened
+
+    def _flatten_into(self, flattened: Dict[str, Any], node: Dict[str, Any], prefix: str):
+        for key, value in node.items():
+            column = f"{prefix}{self.separator}{key}" if prefix else str(key)
+            if isinstance(value, dict):
+                self._flatten_into(flattened, value, column)
+            else:
+                flattened[column] = self._scalar(value)
+
+    def _get_path(self, node: Any, path: List[str]) -> Any:
+        for segment in path:
+            node = self._child(node, segment)
+            if node is None:
+                return None
+        return node
+
+    @staticmethod
+    def _child(node: Any, segment: str) -> Any:
+        if isinstance(node, dict):
+            return node.get(segment)
+        if isinstance(node, list) and segment.isdigit() and int(segment) < len(node):
+            return node[int(segment)]
+        return None
+
+    @staticmethod
+    def _scalar(value: Any) -> Any:
+        """
+        Values that can't be a single column are kept as JSON
+        """
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, separators=(",", ":"))
+        return value
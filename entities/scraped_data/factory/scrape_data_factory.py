@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, TypeVar, Generic
+from typing import Any, Dict, Iterator, Tuple, TypeVar, Generic
 
 from entities.scraped_data.scraped_data import ScrapedData
 
@@ -23,3 +23,16 @@ class ScrapeDataFactory(ABC, Generic[D]):
     @abstractmethod
     def create(self, data: Dict[str, Any]) -> D:
         pass
+
+    def create_many(self, data: Dict[str, Any]) -> Iterator[D]:
+        """
+        The objects to store for a single response, the [Scraper] saves every one of them
+        By default a response is stored as a single object, factories that split responses override it
+        """
+        yield self.create(data)
+
+    def create_item(self, item: Any, keys: Tuple[Any, ...] = ()) -> D:
+        """
+        The object of a single item of a streamed response, found at the keys of the items path
+        """
+        return self.create(item)
@@ -1,9 +1,12 @@
 from datetime import datetime, timedelta
+import logging
 from entities.scrape_request.scrape_request import ScrapeRequest
 from formatters.ymd_formatter import ymd_format_date
 from formatters.iso_formatter import iso_format_date
 from scraps import Scraps
 
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
 API_KEY = ""
 tor = False
 start = datetime.now() - timedelta(days=30)
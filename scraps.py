@@ -1,15 +1,48 @@
 import asyncio
+import os
 from datetime import datetime, timedelta
+from typing import List
+from data.checkpoint.checkpoint import Checkpoint
 from data.csv.csv_store import CSVStore
+from data.dedup.bloom_index import BloomIndex
+from data.dedup.dedup_store import DedupDataStore
+from data.dedup.record_index import RecordIndex
+from data.dedup.set_index import SetIndex
+from data.jsonl.jsonl_store import JSONLStore
+from data.queued.queued_store import QueuedDataStore
+from entities.scrape_request.dated_request import DatedRequest
 from entities.scrape_request.scrape_request import ScrapeRequest
 from entities.scraped_data.factory.basic_data_factory import BasicDataFactory
+from entities.scraped_data.factory.flattening_data_factory import (
+    FlatteningDataFactory,
+)
 from entities.scraped_data.factory.scrape_data_factory import ScrapeDataFactory
 from entities.scraped_data.scraped_data import ScrapedData
+from use_cases.request_generator.adaptive.adaptive_config import AdaptiveConfig
+from use_cases.request_generator.adaptive.adaptive_request_generator import (
+    AdaptiveRequestGenerator,
+)
 from use_cases.request_generator.historical.historical_config import HistoricalConfig
 from use_cases.request_generator.historical.historical_request_generator import (
     HistoricalRequestGenerator,
 )
+from use_cases.request_generator.historical.window_plan import WindowPlan
+from use_cases.request_generator.link_following.link_following_request_generator import (
+    LinkFollowingRequestGenerator,
+)
+from use_cases.scraper.cache.response_cache import ResponseCache
+from use_cases.scraper.cache.validator_store import ValidatorStore
+from use_cases.scraper.metrics.scrape_metrics import ScrapeMetrics
+from use_cases.scraper.middleware.middleware import Middleware
+from use_cases.scraper.middleware.profiling_middleware import ProfilingMiddleware
+from use_cases.scraper.rate_limit.rate_limiter import RateLimiter
+from use_cases.scraper.retry.dead_letter_file import DeadLetterFile
+from use_cases.scraper.retry.retry_policy import RetryPolicy
+from use_cases.scraper.scraper import Scraper
 from use_cases.scraper.scraper_config import ScraperConfig
+from use_cases.scraper.sharded.shard import Shard
+from use_cases.scraper.sharded.sharded_runner import ShardedRunner
+from use_cases.scraper.tor.proxy_pool import ProxyPool
 from use_cases.scraper.tor.tor_scraper import TorScraper
 from use_cases.scraper.regular.regular_scraper import RegularScraper
 
@@ -28,7 +61,51 @@ class Scraps:
         tor: bool,
         back_in_time=False,
         multiple_files=False,
+        workers=1,
+        buffered_store=False,
+        queued_store=False,
+        jsonl_store=False,
+        compression=None,
+        items_path=None,
+        item_fields=None,
+        item_path_keys=None,
+        rate=None,
+        burst=1,
+        adaptive_rate=False,
+        max_attempts=5,
+        dead_letter_path=None,
+        tor_proxies=None,
+        checkpoint_path=None,
+        cache_folder=None,
+        validators_path=None,
+        adaptive_windows=False,
+        min_interval=timedelta(days=1),
+        max_interval=None,
+        max_elements=None,
+        processes=1,
+        output_root=None,
+        link_paths=None,
+        dedup_fields=None,
+        dedup_index_path=None,
+        dedup_capacity=None,
+        stream_mode=None,
+        metrics_path=None,
+        metrics_interval=10.0,
+        body_log_rate=0.0,
+        middlewares=None,
+        profile_path=None,
     ):
+        if stream_mode is not None and (link_paths or adaptive_windows):
+            # Streamed responses are never kept, there's nothing to follow or count
+            raise ValueError(
+                "stream_mode can't be used with link_paths or adaptive_windows"
+            )
+        if link_paths and processes > 1:
+            # The links can't be split in parts, every shard would follow all of them
+            raise ValueError("link_paths can't be used with more than one process")
+        if dedup_fields and not items_path:
+            # Without flattening every record is a whole response, it has no id fields
+            raise ValueError("dedup_fields needs items_path to split the responses")
         self.url = url
         self.payload = payload
         self.formatter = formatter
@@ -40,46 +117,245 @@ class Scraps:
         self.tor = tor
         self.back_in_time = back_in_time
         self.multiple_files = multiple_files
+        self.workers = workers
+        self.buffered_store = buffered_store
+        self.queued_store = queued_store
+        self.jsonl_store = jsonl_store
+        self.compression = compression
+        self.items_path = items_path
+        self.item_fields = item_fields
+        self.item_path_keys = item_path_keys
+        self.rate = rate
+        self.burst = burst
+        self.adaptive_rate = adaptive_rate
+        self.max_attempts = max_attempts
+        self.dead_letter_path = dead_letter_path
+        self.tor_proxies = tor_proxies
+        self.checkpoint_path = checkpoint_path
+        self.cache_folder = cache_folder
+        self.validators_path = validators_path
+        self.adaptive_windows = adaptive_windows
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_elements = max_elements
+        self.processes = processes
+        self.output_root = output_root
+        self.link_paths = link_paths
+        self.dedup_fields = dedup_fields
+        self.dedup_index_path = dedup_index_path
+        self.dedup_capacity = dedup_capacity
+        self.stream_mode = stream_mode
+        self.metrics_path = metrics_path
+        self.metrics_interval = metrics_interval
+        self.body_log_rate = body_log_rate
+        self.middlewares = middlewares
+        self.profile_path = profile_path
 
     def run(self):
+        print("Begin Scraping")
+        if self.processes > 1:
+            # Every process scrapes a part of the range, the files are merged at the end
+            plan = WindowPlan(self.start, self.end, self.interval, self.back_in_time)
+            runner = ShardedRunner(
+                plan,
+                self._create_scraper,
+                self.processes,
+                root=self.output_root,
+                rate=self.rate,
+                burst=self.burst,
+                dedup_fields=self.dedup_fields,
+                dedup_index=self._create_dedup_index() if self.dedup_fields else None,
+            )
+            runner.run()
+        else:
+            asyncio.run(self._create_scraper().scrape())
+        print("Done Scraping")
 
-        config_generator = HistoricalConfig(
-            start_date=self.start,
-            end_date=self.end,
-            interval=self.interval,
-            go_back_in_time=self.back_in_time,
-        )
-        historic_generator = HistoricalRequestGenerator(
-            config=config_generator,
-            initial_request=ScrapeRequest(self.url, self.payload),
-            start_key=self.start_key,
-            end_key=self.end_key,
-            date_formatter=self.formatter,
+    def _create_scraper(self, shard: Shard | None = None) -> Scraper:
+        """
+        The scraper of the whole range, or of the part of it of a [Shard] of a sharded run
+        """
+        start, end, plan = self.start, self.end, None
+        if shard is not None:
+            plan = shard.plan
+            start, end = plan.bounds() if len(plan) else (self.start, self.start)
+        root = shard.root if shard is not None else self.output_root
+        checkpoint_path = (
+            shard.checkpoint_path if shard is not None else self.checkpoint_path
         )
 
+        if self.link_paths:
+            # Only the first window is generated, the next ones come from the links of the responses.
+            # Every link is the window after it, so it stops once the windows of the range are requested
+            link_plan = WindowPlan(start, end, self.interval, self.back_in_time)
+            first_start, first_end = link_plan[0]
+            historic_generator = LinkFollowingRequestGenerator(
+                DatedRequest(
+                    self.url,
+                    dict(self.payload),
+                    first_start,
+                    first_end,
+                    self.start_key,
+                    self.end_key,
+                    self.formatter,
+                ),
+                link_paths=self.link_paths,
+                max_requests=len(link_plan),
+            )
+        elif self.adaptive_windows:
+            # Windows split when the responses are too big and grow when they are sparse
+            config_generator = AdaptiveConfig(
+                start_date=start,
+                end_date=end,
+                interval=self.interval,
+                min_interval=self.min_interval,
+                max_interval=self.max_interval,
+                max_elements=self.max_elements,
+                go_back_in_time=self.back_in_time,
+            )
+            historic_generator = AdaptiveRequestGenerator(
+                config=config_generator,
+                initial_request=ScrapeRequest(self.url, self.payload),
+                start_key=self.start_key,
+                end_key=self.end_key,
+                date_formatter=self.formatter,
+            )
+        else:
+            config_generator = HistoricalConfig(
+                start_date=self.start,
+                end_date=self.end,
+                interval=self.interval,
+                go_back_in_time=self.back_in_time,
+            )
+            historic_generator = HistoricalRequestGenerator(
+                config=config_generator,
+                initial_request=ScrapeRequest(self.url, self.payload),
+                start_key=self.start_key,
+                end_key=self.end_key,
+                date_formatter=self.formatter,
+                plan=plan,
+            )
+
         # Data Factory
-        basic_factory = BasicDataFactory({ScrapeDataFactory, ScrapedData})
+        if self.items_path:
+            data_factory = FlatteningDataFactory(
+                self.items_path,
+                fields=self.item_fields,
+                path_keys=self.item_path_keys,
+            )
+        else:
+            data_factory = BasicDataFactory({ScrapeDataFactory, ScrapedData})
 
         # Data Store
-        csv_store = CSVStore(multiple_files=self.multiple_files)
+        if self.jsonl_store:
+            file_store = JSONLStore(compression=self.compression, root=root)
+        else:
+            file_store = CSVStore(
+                multiple_files=self.multiple_files,
+                buffered=self.buffered_store,
+                root=root,
+            )
+        data_store = QueuedDataStore(file_store) if self.queued_store else file_store
+        if self.dedup_fields:
+            data_store = DedupDataStore(
+                data_store, self.dedup_fields, self._create_dedup_index(shard)
+            )
 
         # Scraper
-        config = ScraperConfig(3, 5)
+        retry_policy = RetryPolicy(max_attempts=self.max_attempts)
+        dead_letter = (
+            DeadLetterFile(self.dead_letter_path) if self.dead_letter_path else None
+        )
+        checkpoint = Checkpoint(checkpoint_path) if checkpoint_path else None
+        response_cache = (
+            ResponseCache(self.cache_folder) if self.cache_folder else None
+        )
+        validators = (
+            ValidatorStore(self.validators_path) if self.validators_path else None
+        )
+        # The random pauses between requests are only taken when there's no rate limiter
+        config = ScraperConfig(
+            3,
+            5,
+            workers=self.workers,
+            rate_limiter=self._create_rate_limiter(shard),
+            retry_policy=retry_policy,
+            dead_letter=dead_letter,
+            checkpoint=checkpoint,
+            response_cache=response_cache,
+            validators=validators,
+            stream_mode=self.stream_mode,
+            stream_items_path=self.items_path or "",
+            metrics=self._create_metrics(shard),
+            body_log_rate=self.body_log_rate,
+            middlewares=self._create_middlewares(shard),
+        )
         if self.tor:
+            # Every worker rides its own circuit
+            proxy_pool = (
+                ProxyPool.from_urls(self.tor_proxies, isolation_slots=self.workers)
+                if self.tor_proxies
+                else None
+            )
             scraper = TorScraper(
                 request_generator=historic_generator,
-                data_factory=basic_factory,
-                data_store=csv_store,
+                data_factory=data_factory,
+                data_store=data_store,
                 config=config,
+                proxy_pool=proxy_pool,
             )
         else:
             scraper = RegularScraper(
                 request_generator=historic_generator,
-                data_factory=basic_factory,
-                data_store=csv_store,
+                data_factory=data_factory,
+                data_store=data_store,
                 config=config,
             )
+        return scraper
 
-        print("Begin Scraping")
-        asyncio.run(scraper.scrape())
-        print("Done Scraping")
+    def _create_rate_limiter(self, shard: Shard | None = None) -> RateLimiter | None:
+        """
+        Paces the requests per host when there's a [rate], the shards share a single budget
+        """
+        if self.rate is None:
+            return None
+        if shard is not None and shard.rate_limiter is not None:
+            return shard.rate_limiter
+        return RateLimiter(self.rate, burst=self.burst, adaptive=self.adaptive_rate)
+
+    def _create_metrics(self, shard: Shard | None = None) -> ScrapeMetrics | None:
+        """
+        Metrics written to [metrics_path], every shard writes its own file next to it
+        """
+        if not self.metrics_path:
+            return None
+        path = self.metrics_path
+        if shard is not None:
+            base, extension = os.path.splitext(path)
+            path = f"{base}-shard-{shard.index}{extension}"
+        return ScrapeMetrics(path, interval=self.metrics_interval)
+
+    def _create_middlewares(self, shard: Shard | None = None) -> List[Middleware]:
+        """
+        The [middlewares] given, then the profiler when there's a [profile_path] (one per shard)
+        """
+        middlewares = list(self.middlewares or [])
+        if self.profile_path:
+            path = self.profile_path
+            if shard is not None:
+                base, extension = os.path.splitext(path)
+                path = f"{base}-shard-{shard.index}{extension}"
+            middlewares.append(ProfilingMiddleware(path))
+        return middlewares
+
+    def _create_dedup_index(self, shard: Shard | None = None) -> RecordIndex:
+        """
+        Exact index unless a [dedup_capacity] asks for a Bloom filter, every shard keeps its own
+        and the duplicates between shards are dropped by the index of the whole run when they're merged
+        """
+        path = self.dedup_index_path
+        if path and shard is not None:
+            path = f"{path}.shard-{shard.index}"
+        if self.dedup_capacity:
+            return BloomIndex(self.dedup_capacity, path=path)
+        return SetIndex(path)
@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+import unittest
+
+from entities.scrape_request.dated_request import DatedRequest
+from entities.scrape_request.scrape_request import ScrapeRequest
+from use_cases.request_generator.adaptive.adaptive_config import AdaptiveConfig
+from use_cases.request_generator.adaptive.adaptive_request_generator import (
+    AdaptiveRequestGenerator,
+)
+from use_cases.scraper.fetch_error import FetchError
+from use_cases.scraper.scraper import Scraper
+from use_cases.scraper.scraper_config import ScraperConfig
+from tests.mocks.run_async import run_async
+from tests.mocks.scraper_mocks import DictDataFactory, ListDataStore
+
+
+class DenseScraper(Scraper):
+    """
+    API with an element per day, that rejects windows longer than 7 days like the NEO feed
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fetched: List[DatedRequest] = []
+
+    async def fetch(self, request: DatedRequest) -> Dict[str, Any] | None:
+        self.fetched.append(request)
+        days = (request.end_date - request.start_date).days
+        if days > 7:
+            raise FetchError.from_status(400)
+        return {"element_count": days}
+
+
+class TestAdaptiveRequestGenerator(unittest.TestCase):
+    def setUp(self):
+        self.start_date = datetime(2024, 1, 1)
+        self.end_date = datetime(2024, 1, 31)
+
+    def _generator(self, **kwargs) -> AdaptiveRequestGenerator:
+        settings = {
+            "start_date": self.start_date,
+            "end_date": self.end_date,
+            "interval": timedelta(days=8),
+            "max_interval": timedelta(days=16),
+            "go_back_in_time": False,
+        }
+        settings.update(kwargs)
+        return AdaptiveRequestGenerator(
+            AdaptiveConfig(**settings), ScrapeRequest("https://example.com/feed", {})
+        )
+
+    def _windows(self, generator: AdaptiveRequestGenerator, respond) -> List[tuple]:
+        windows = []
+        while generator.working():
+            request = generator.next()
+            if generator.feedback(request, respond(request)):
+                windows.append((request.start_date, request.end_date))
+        return windows
+
+    def _assert_covers_range(self, windows: List[tuple]) -> None:
+        windows = sorted(windows)
+        self.assertEqual(windows[0][0], self.start_date)
+        self.assertEqual(windows[-1][1], self.end_date)
+        for previous, current in zip(windows, windows[1:]):
+            self.assertEqual(previous[1], current[0])
+
+    def test_dense_windows_are_split(self):
+        generator = self._generator(max_elements=3)
+        windows = self._windows(
+            generator,
+            lambda request: {
+                "element_count": (request.end_date - request.start_date).days
+            },
+        )
+        self._assert_covers_range(windows)
+        for start, end in windows:
+            self.assertLessEqual((end - start).days, 3)
+        self.assertGreater(generator.splits, 0)
+
+    def test_sparse_windows_grow(self):
+        generator = self._generator(max_elements=100)
+        windows = self._windows(generator, lambda request: {"element_count": 1})
+        self._assert_covers_range(windows)
+        self.assertEqual([(end - start).days for start, end in windows], [8, 16, 6])
+
+    def test_windows_are_split_back_in_time(self):
+        generator = self._generator(max_elements=5, go_back_in_time=True)
+        windows = self._windows(
+            generator,
+            lambda request: {
+                "element_count": (request.end_date - request.start_date).days
+            },
+        )
+        self._assert_covers_range(windows)
+        self.assertEqual(windows[0][1], self.end_date)
+        self.assertEqual(windows, sorted(windows, reverse=True))
+
+    def test_min_interval_is_not_split(self):
+        generator = self._generator(
+            interval=timedelta(days=1), max_interval=timedelta(days=1), max_elements=0
+        )
+        request = generator.next()
+        self.assertTrue(generator.feedback(request, {"element_count": 10}))
+
+    def test_state_keeps_the_interval(self):
+        generator = self._generator(max_elements=3)
+        request = generator.next()
+        generator.feedback(request, {"element_count": 8})
+
+        restored = self._generator(max_elements=3)
+        restored.restore_state(generator.get_state())
+        self.assertEqual(restored.interval, generator.interval)
+        self.assertEqual(restored.next().start_date, self.start_date)
+
+    def test_rejected_windows_are_split_by_the_scraper(self):
+        store = ListDataStore()
+        scraper = DenseScraper(
+            self._generator(interval=timedelta(days=16)),
+            DictDataFactory(),
+            store,
+            ScraperConfig(0, 0),
+        )
+        run_async(scraper.scrape())
+
+        saved = [(request.start_date, request.end_date) for request in store.saved]
+        self._assert_covers_range(saved)
+        for start, end in saved:
+            self.assertLessEqual((end - start).days, 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
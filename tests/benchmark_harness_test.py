@@ -0,0 +1,97 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import unittest
+from datetime import date
+
+import aiohttp
+
+from benchmarks.harness import measure, parse_options, percentile
+from benchmarks.mock_neo_server import MockNEOServer
+from benchmarks.socks_proxy import SocksProxy
+from tests.mocks.run_async import run_async
+
+
+class TestBenchmarkHarness(unittest.TestCase):
+    def test_mock_server_answers_like_the_feed(self):
+        async def scenario():
+            server = await MockNEOServer(
+                items_per_day=2, item_bytes=300, last_date=date(2024, 1, 10)
+            ).start()
+            try:
+                async with aiohttp.ClientSession() as session:
+                    params = {"start_date": "2024-01-01", "end_date": "2024-01-03"}
+                    async with session.get(server.url, params=params) as response:
+                        feed = await response.json()
+                    params = {"start_date": "2024-01-01", "end_date": "2024-01-09"}
+                    async with session.get(server.url, params=params) as response:
+                        too_long = response.status
+            finally:
+                await server.stop()
+            return feed, too_long
+
+        feed, too_long = run_async(scenario())
+        self.assertEqual(feed["element_count"], 6)
+        self.assertEqual(
+            sorted(feed["near_earth_objects"]),
+            ["2024-01-01", "2024-01-02", "2024-01-03"],
+        )
+        self.assertIn("start_date=2024-01-04", feed["links"]["next"])
+        self.assertIn("end_date=2024-01-06", feed["links"]["next"])
+        self.assertEqual(too_long, 400)
+
+    def test_injected_errors(self):
+        async def scenario():
+            server = await MockNEOServer(error_rates={503: 1.0}).start()
+            try:
+                async with aiohttp.ClientSession() as session:
+                    params = {"start_date": "2024-01-01"}
+                    async with session.get(server.url, params=params) as response:
+                        return response.status
+            finally:
+                await server.stop()
+
+        self.assertEqual(run_async(scenario()), 503)
+
+    def test_tor_scenario_through_the_socks_proxy(self):
+        options = parse_options(["--windows", "5", "--workers", "2"])
+
+        async def start():
+            server = await MockNEOServer(items_per_day=1).start()
+            proxy = await SocksProxy().start()
+            return server, proxy
+
+        # The scenario runs its own event loop (in a thread, so it doesn't replace the one
+        # of the main thread), the servers need one running in another thread
+        loop = asyncio.new_event_loop()
+        server, proxy = loop.run_until_complete(start())
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        try:
+            with ThreadPoolExecutor(1) as executor:
+                result = executor.submit(
+                    measure, "tor-jsonl", options, (server.url, proxy.url)
+                ).result()
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.run_until_complete(server.stop())
+            loop.run_until_complete(proxy.stop())
+            loop.close()
+
+        self.assertEqual(result["completed"], 5)
+        self.assertEqual(result["statuses"], {"200": 5})
+        self.assertGreater(result["bytes_written"], 0)
+        self.assertGreater(proxy.connections, 0)
+        # Every worker rides its own isolation slot
+        self.assertEqual(len(proxy.usernames), 2)
+
+    def test_percentile(self):
+        values = [float(value) for value in range(1, 101)]
+        self.assertEqual(percentile(values, 0.5), 50.0)
+        self.assertEqual(percentile(values, 0.99), 99.0)
+        self.assertIsNone(percentile([], 0.5))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,227 @@
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+import unittest
+
+from data.checkpoint.atomic_write import atomic_write
+from data.checkpoint.checkpoint import Checkpoint
+from data.csv.csv_store import CSVStore
+from data.queued.queued_store import QueuedDataStore
+from entities.scrape_request.dated_request import DatedRequest
+from entities.scrape_request.scrape_request import ScrapeRequest
+from use_cases.request_generator.historical.historical_config import HistoricalConfig
+from use_cases.request_generator.historical.historical_request_generator import (
+    HistoricalRequestGenerator,
+)
+from use_cases.scraper.scraper import Scraper
+from use_cases.scraper.scraper_config import ScraperConfig
+from tests.mocks.run_async import run_async
+from tests.mocks.scraper_mocks import DictDataFactory
+
+
+class CrashingScraper(Scraper):
+    """
+    Scraper that crashes on a given fetch, like a process dying in the middle of a run
+    """
+
+    def __init__(self, crash_on: int | None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.crash_on = crash_on
+        self.fetched: List[DatedRequest] = []
+
+    async def fetch(self, request: DatedRequest) -> Dict[str, Any] | None:
+        if len(self.fetched) + 1 == self.crash_on:
+            raise RuntimeError("crash")
+        self.fetched.append(request)
+        return {"start": request.start_date.isoformat()}
+
+
+class RecordingCheckpoint(Checkpoint):
+    """
+    Keeps every state saved, as a crash would find them
+    """
+
+    def __init__(self, *args, max_saves: int | None = None, **kwargs):
+        """
+        [max_saves] the saves after it are lost, like when the process is killed
+        """
+        super().__init__(*args, **kwargs)
+        self.max_saves = max_saves
+        self.saved: List[Dict[str, Any]] = []
+
+    def save(self, generator_state: Dict[str, Any], store_state: Dict[str, Any]) -> None:
+        if self.max_saves is not None and len(self.saved) >= self.max_saves:
+            return
+        self.saved.append({"generator": generator_state, "store": store_state})
+        super().save(generator_state, store_state)
+
+
+class FailingCloseStore(CSVStore):
+    """
+    Store whose close fails, like a disk that filled up
+    """
+
+    def close(self) -> None:
+        super().close()
+        raise OSError("disk full")
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "run.checkpoint.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+        if os.path.exists("example.com"):
+            shutil.rmtree("example.com")
+
+    def _generator(self) -> HistoricalRequestGenerator:
+        config = HistoricalConfig(
+            start_date=datetime(2024, 1, 1),
+            end_date=datetime(2024, 1, 11),
+            interval=timedelta(days=1),
+            go_back_in_time=False,
+        )
+        return HistoricalRequestGenerator(
+            config, ScrapeRequest("https://example.com/feed", {})
+        )
+
+    def _run(self, crash_on: int | None) -> CrashingScraper:
+        checkpoint = Checkpoint(self.path, save_every=2)
+        scraper = CrashingScraper(
+            crash_on,
+            self._generator(),
+            DictDataFactory(),
+            CSVStore(multiple_files=True),
+            ScraperConfig(0, 0, checkpoint=checkpoint),
+        )
+        try:
+            run_async(scraper.scrape())
+        except RuntimeError:
+            pass
+        return scraper
+
+    def test_resume_skips_completed_windows(self):
+        first_run = self._run(crash_on=6)
+        second_run = self._run(crash_on=None)
+
+        first = [request.start_date.day for request in first_run.fetched]
+        second = [request.start_date.day for request in second_run.fetched]
+        self.assertEqual(first, [1, 2, 3, 4, 5])
+        self.assertEqual(second, [6, 7, 8, 9, 10])
+
+    def test_resume_continues_file_numbering(self):
+        self._run(crash_on=4)
+        self._run(crash_on=None)
+
+        files = sorted(os.listdir("example.com"), key=lambda name: int(name.split("_")[0]))
+        self.assertEqual(len(files), 10)
+        self.assertEqual(files[-1], "9_example.com_feed.csv")
+
+    def test_queued_store_state_does_not_trail_the_generator(self):
+        checkpoint = RecordingCheckpoint(self.path, save_every=1)
+        scraper = CrashingScraper(
+            None,
+            self._generator(),
+            DictDataFactory(),
+            QueuedDataStore(CSVStore(multiple_files=True)),
+            ScraperConfig(0, 0, checkpoint=checkpoint),
+        )
+        run_async(scraper.scrape())
+
+        url = "https://example.com/feed"
+        for state in checkpoint.saved:
+            completed = state["generator"]["position"] - len(
+                state["generator"]["outstanding"]
+            )
+            self.assertGreaterEqual(state["store"]["urls_saved"].get(url, 0), completed)
+
+    def test_resume_with_queued_store_never_mixes_windows(self):
+        def run(crash_on, saves):
+            # The process dies right after the last checkpoint it saves
+            checkpoint = RecordingCheckpoint(self.path, save_every=1, max_saves=saves)
+            scraper = CrashingScraper(
+                crash_on,
+                self._generator(),
+                DictDataFactory(),
+                QueuedDataStore(CSVStore(multiple_files=True)),
+                ScraperConfig(0, 0, checkpoint=checkpoint),
+            )
+            try:
+                run_async(scraper.scrape())
+            except RuntimeError:
+                pass
+
+        run(crash_on=6, saves=3)
+        run(crash_on=None, saves=None)
+
+        windows = set()
+        for name in os.listdir("example.com"):
+            with open(os.path.join("example.com", name), encoding="utf-8") as file:
+                starts = {line for line in file.read().splitlines()[1:]}
+            self.assertEqual(len(starts), 1, name)
+            windows |= starts
+        self.assertEqual(len(windows), 10)
+
+    def test_outstanding_windows_are_generated_again(self):
+        generator = self._generator()
+        generator.track_completion()
+        first, second, third = generator.next(), generator.next(), generator.next()
+        generator.completed(second)
+
+        resumed = self._generator()
+        resumed.restore_state(generator.get_state())
+        windows = []
+        while resumed.working():
+            windows.append(resumed.next().start_date.day)
+
+        self.assertEqual(windows, [1, 3, 4, 5, 6, 7, 8, 9, 10])
+
+    def test_checkpoint_is_saved_when_the_store_fails_to_close(self):
+        checkpoint = Checkpoint(self.path, save_every=100)
+        scraper = CrashingScraper(
+            None,
+            self._generator(),
+            DictDataFactory(),
+            FailingCloseStore(multiple_files=True),
+            ScraperConfig(0, 0, checkpoint=checkpoint),
+        )
+        with self.assertRaises(OSError):
+            run_async(scraper.scrape())
+
+        state = checkpoint.load()
+        self.assertEqual(state["generator"]["position"], 10)
+        self.assertEqual(state["store"]["urls_saved"]["https://example.com/feed"], 10)
+
+    def test_saves_are_batched_and_atomic(self):
+        checkpoint = Checkpoint(self.path, save_every=3, save_interval=3600)
+        for _ in range(2):
+            checkpoint.record_completed()
+        self.assertFalse(checkpoint.due())
+        checkpoint.record_completed()
+        self.assertTrue(checkpoint.due())
+
+        checkpoint.save({"position": 3}, {"urls_saved": {}})
+        self.assertFalse(checkpoint.due())
+        self.assertEqual(checkpoint.load()["generator"], {"position": 3})
+        self.assertEqual(os.listdir(self.temp_dir.name), ["run.checkpoint.json"])
+
+    def test_failed_write_keeps_the_previous_file(self):
+        atomic_write(self.path, lambda file: file.write("old"))
+
+        def write(file):
+            file.write("half")
+            raise RuntimeError("crash")
+
+        with self.assertRaises(RuntimeError):
+            atomic_write(self.path, write)
+        with open(self.path, "r", encoding="utf-8") as file:
+            self.assertEqual(file.read(), "old")
+        self.assertEqual(os.listdir(self.temp_dir.name), ["run.checkpoint.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
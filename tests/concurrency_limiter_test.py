@@ -0,0 +1,118 @@
+import asyncio
+import unittest
+
+from use_cases.scraper.orchestrator.concurrency_limiter import ConcurrencyLimiter
+from tests.mocks.run_async import run_async
+
+A = "https://a.example.com/feed"
+B = "https://b.example.com/feed"
+
+
+async def settle() -> None:
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+class TestConcurrencyLimiter(unittest.TestCase):
+    def test_global_cap(self):
+        async def scenario():
+            limiter = ConcurrencyLimiter(max_in_flight=2)
+            job = limiter.job("job")
+            waiting = [asyncio.create_task(job.acquire(A)) for _ in range(3)]
+            await settle()
+            granted = [task.done() for task in waiting]
+            job.release(A)
+            await settle()
+            return granted, waiting[2].done(), limiter.in_flight
+
+        granted, last_granted, in_flight = run_async(scenario())
+        self.assertEqual(granted, [True, True, False])
+        self.assertTrue(last_granted)
+        self.assertEqual(in_flight, 2)
+
+    def test_full_host_does_not_hold_back_other_hosts(self):
+        async def scenario():
+            limiter = ConcurrencyLimiter(
+                max_per_host=1, host_limits={"b.example.com": 2}
+            )
+            first, second = limiter.job("first"), limiter.job("second")
+            await first.acquire(A)
+            blocked = asyncio.create_task(first.acquire(A))
+            others = [asyncio.create_task(second.acquire(B)) for _ in range(3)]
+            await settle()
+            granted = blocked.done(), [task.done() for task in others]
+            pending = [blocked, *others]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            return granted
+
+        blocked, others = run_async(scenario())
+        self.assertFalse(blocked)
+        self.assertEqual(others, [True, True, False])
+
+    def test_freed_slot_goes_to_the_job_with_fewer_in_flight(self):
+        async def scenario():
+            limiter = ConcurrencyLimiter(max_in_flight=1)
+            busy, quiet = limiter.job("busy"), limiter.job("quiet")
+            await busy.acquire(A)
+            queued = [asyncio.create_task(busy.acquire(A)) for _ in range(3)]
+            late = asyncio.create_task(quiet.acquire(A))
+            await settle()
+            busy.release(A)
+            await settle()
+            granted = (late.done(), [task.done() for task in queued])
+            for task in queued:
+                task.cancel()
+            await asyncio.gather(*queued, return_exceptions=True)
+            return granted
+
+        late, queued = run_async(scenario())
+        # The quiet job doesn't wait behind the requests the busy job queued first
+        self.assertTrue(late)
+        self.assertEqual(queued, [False, False, False])
+
+    def test_weight_gives_a_bigger_share(self):
+        async def scenario():
+            limiter = ConcurrencyLimiter(max_in_flight=3)
+            holder = limiter.job("holder")
+            heavy, light = limiter.job("heavy", weight=2), limiter.job("light")
+            for _ in range(3):
+                await holder.acquire(A)
+            tasks = [asyncio.create_task(heavy.acquire(A)) for _ in range(3)]
+            tasks += [asyncio.create_task(light.acquire(A)) for _ in range(3)]
+            await settle()
+            for _ in range(3):
+                holder.release(A)
+            await settle()
+            in_flight = (heavy.in_flight, light.in_flight)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            return in_flight
+
+        self.assertEqual(run_async(scenario()), (2, 1))
+
+    def test_cancelled_waiter_gives_up_its_place(self):
+        async def scenario():
+            limiter = ConcurrencyLimiter(max_in_flight=1)
+            job = limiter.job("job")
+            await job.acquire(A)
+            waiter = asyncio.create_task(job.acquire(A))
+            await settle()
+            waiter.cancel()
+            await settle()
+            job.release(A)
+            return limiter.in_flight, limiter.waiting("job")
+
+        self.assertEqual(run_async(scenario()), (0, 0))
+
+    def test_needs_a_positive_cap_and_weight(self):
+        with self.assertRaises(ValueError):
+            ConcurrencyLimiter(max_in_flight=0)
+        with self.assertRaises(ValueError):
+            ConcurrencyLimiter().job("job", weight=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,6 +7,7 @@ from data.csv.csv_store import CSVStore
 from entities.scrape_request.scrape_request import ScrapeRequest
 from entities.scraped_data.scraped_data import ScrapedData
 from tests.mocks.generate_request_data_pairs import generate_request_data_pairs
+from tests.mocks.run_async import run_async
 
 
 class TestCSVStore(unittest.TestCase):
@@ -140,7 +141,149 @@ class TestCSVStore(unittest.TestCase):
         filename: str = os.listdir(folder)[0]
         self._check_data_in_csv_file(folder, filename, self.data_pairs_1)
 
+    def test_records_of_a_request_share_a_file(self):
+        """
+        Checks every record created from the same request is saved in the file of that request
+        """
+        for store in (
+            CSVStore(multiple_files=True),
+            CSVStore(multiple_files=True, buffered=True),
+        ):
+            for request, data in self.data_pairs_1:
+                for _ in range(3):
+                    store.save(data, request)
+            store.close()
+
+            folder = "example.com"
+            files_in_folder: List[str] = os.listdir(folder)
+            self.assertEqual(len(self.data_pairs_1), len(files_in_folder))
+            for filename in files_in_folder:
+                self._check_rows_in_csv_file(folder, filename, 3)
+            shutil.rmtree(folder)
+
+    def test_buffered_rows_are_written_on_close(self):
+        """
+        Checks the buffered store only writes the rows once they are flushed
+        """
+        store = CSVStore(multiple_files=False, buffered=True)
+        for sample in self.data_pairs_1:
+            store.save(sample[1], sample[0])
+
+        folder = "example.com"
+        self.assertEqual(os.listdir(folder), [])
+
+        store.close()
+        filename: str = os.listdir(folder)[0]
+        self._check_data_in_csv_file(folder, filename, self.data_pairs_1)
+        self._check_rows_in_csv_file(folder, filename, len(self.data_pairs_1))
+
+    def test_buffered_flush_by_row_count(self):
+        """
+        Checks the rows are written once [flush_rows] rows are waiting
+        """
+        store = CSVStore(multiple_files=False, buffered=True, flush_rows=2)
+        for sample in self.data_pairs_1:
+            store.save(sample[1], sample[0])
+
+        folder = "example.com"
+        filename: str = os.listdir(folder)[0]
+        self._check_rows_in_csv_file(folder, filename, 2)
+
+        store.close()
+        self._check_rows_in_csv_file(folder, filename, len(self.data_pairs_1))
+
+    def test_buffered_header_written_once_across_flushes(self):
+        """
+        Checks the header is only written once when a file is appended in several flushes
+        """
+        with CSVStore(multiple_files=False, buffered=True) as store:
+            for sample in self.data_pairs_1:
+                store.save(sample[1], sample[0])
+                store.flush()
+
+        with CSVStore(multiple_files=False, buffered=True) as store:
+            for sample in self.data_pairs_1:
+                store.save(sample[1], sample[0])
+
+        folder = "example.com"
+        filename: str = os.listdir(folder)[0]
+        self._check_rows_in_csv_file(folder, filename, 2 * len(self.data_pairs_1))
+
+    def test_buffered_multiple_files_limits_open_files(self):
+        """
+        Checks every request gets its own file while only [max_open_files] stay open
+        """
+        store = CSVStore(multiple_files=True, buffered=True, max_open_files=2)
+        for sample in self.data_pairs_1 + self.data_pairs_2:
+            store.save(sample[1], sample[0])
+        store.flush()
+
+        self.assertEqual(len(store._open_files), 2)
+        store.close()
+        self.assertEqual(len(store._open_files), 0)
+
+        folder = "example.com"
+        expected_files: int = len(self.data_pairs_1) + len(self.data_pairs_2)
+        self.assertEqual(expected_files, len(os.listdir(folder)))
+
+    def test_records_with_different_keys(self):
+        """
+        Checks records with missing or new keys line up with the header, buffered or not
+        """
+        request = ScrapeRequest("https://example.com/feed", {})
+        records = [
+            {"id": "1", "name": "a"},
+            {"id": "2", "name": "b", "sentry_data": "yes"},
+            {"name": "c", "id": "3"},
+        ]
+        for options in ({}, {"buffered": True}, {"buffered": True, "flush_rows": 1}):
+            with CSVStore(multiple_files=False, **options) as store:
+                for record in records:
+                    store.save(ScrapedData(record), request)
+
+            file_path = os.path.join("example.com", "example.com_feed.csv")
+            with open(file_path, "r", newline="", encoding="utf-8") as file:
+                reader = csv.DictReader(file)
+                rows = list(reader)
+            self.assertEqual(reader.fieldnames, ["id", "name", "sentry_data"], options)
+            self.assertEqual(
+                rows,
+                [
+                    {"id": "1", "name": "a", "sentry_data": ""},
+                    {"id": "2", "name": "b", "sentry_data": "yes"},
+                    {"id": "3", "name": "c", "sentry_data": ""},
+                ],
+                options,
+            )
+            os.remove(file_path)
+
+    def test_streamed_body_is_saved_as_one_record(self):
+        """
+        Checks the default [save_stream] puts the chunks together and saves the decoded body
+        """
+        request = ScrapeRequest("https://example.com/feed", {})
+
+        async def chunks():
+            for chunk in [b'{"id": 1,', b' "name": ', b'"a"}']:
+                yield chunk
+
+        with CSVStore(multiple_files=False) as store:
+            run_async(store.save_stream(chunks(), request))
+
+        self._check_rows_in_csv_file("example.com", "example.com_feed.csv", 1)
+        self._check_data_in_csv_file(
+            "example.com",
+            "example.com_feed.csv",
+            [(request, ScrapedData({"id": 1, "name": "a"}))],
+        )
+
     # * Helper
+    def _check_rows_in_csv_file(self, folder: str, filename: str, expected_rows: int):
+        file_path = os.path.join(folder, filename)
+        with open(file_path, "r", newline="", encoding="utf-8") as file:
+            rows = list(csv.DictReader(file))
+        self.assertEqual(len(rows), expected_rows)
+
     def _check_data_in_csv_file(
         self,
         folder: str,
@@ -0,0 +1,71 @@
+from datetime import datetime
+import pickle
+import unittest
+
+from entities.scrape_request.dated_request import DatedRequest
+from entities.scrape_request.scrape_request import ScrapeRequest
+from formatters.ymd_formatter import ymd_format_date
+
+
+class TestDatedRequest(unittest.TestCase):
+    def setUp(self):
+        self.template = {"api_key": "DEMO_KEY"}
+        self.url = "https://api.nasa.gov/neo/rest/v1/feed"
+
+    def _request(self, start: datetime, end: datetime) -> DatedRequest:
+        return DatedRequest(
+            self.url,
+            self.template,
+            start,
+            end,
+            "start_date",
+            "end_date",
+            ymd_format_date,
+        )
+
+    def test_template_is_shared_without_being_modified(self):
+        first = self._request(datetime(2024, 1, 1), datetime(2024, 1, 8))
+        second = self._request(datetime(2024, 1, 8), datetime(2024, 1, 15))
+
+        self.assertEqual(self.template, {"api_key": "DEMO_KEY"})
+        self.assertEqual(first.get_payload()["start_date"], "2024-01-01")
+        self.assertEqual(second.get_payload()["start_date"], "2024-01-08")
+
+    def test_payload_copy_does_not_change_the_request(self):
+        request = self._request(datetime(2024, 1, 1), datetime(2024, 1, 8))
+        request.get_payload()["start_date"] = "1999-01-01"
+        self.assertEqual(request.get_payload()["start_date"], "2024-01-01")
+
+    def test_request_is_immutable(self):
+        request = self._request(datetime(2024, 1, 1), datetime(2024, 1, 8))
+        with self.assertRaises(AttributeError):
+            request.url = "https://example.com"
+        with self.assertRaises(AttributeError):
+            request.start_date = datetime(2023, 1, 1)
+        with self.assertRaises(AttributeError):
+            request.extra = True
+
+    def test_key_is_the_same_for_equivalent_requests(self):
+        dated = self._request(datetime(2024, 1, 1), datetime(2024, 1, 8))
+        plain = ScrapeRequest(
+            self.url,
+            {
+                "end_date": "2024-01-08",
+                "start_date": "2024-01-01",
+                "api_key": "DEMO_KEY",
+            },
+        )
+        other = self._request(datetime(2024, 1, 8), datetime(2024, 1, 15))
+
+        self.assertEqual(dated.key, plain.key)
+        self.assertNotEqual(dated.key, other.key)
+
+    def test_pickled_request_keeps_its_window(self):
+        request = self._request(datetime(2024, 1, 1), datetime(2024, 1, 8))
+        copy = pickle.loads(pickle.dumps(request))
+        self.assertEqual(copy.get_payload(), request.get_payload())
+        self.assertEqual(copy.key, request.key)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import tempfile
+from typing import List
+import unittest
+
+from data.dedup.bloom_index import BloomIndex
+from data.dedup.dedup_store import DedupDataStore
+from data.dedup.set_index import SetIndex
+from data.jsonl.jsonl_store import JSONLStore
+from entities.scrape_request.scrape_request import ScrapeRequest
+from entities.scraped_data.scraped_data import ScrapedData
+from tests.mocks.run_async import run_async
+from tests.mocks.scraper_mocks import ListDataStore
+
+
+class TestDedupDataStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.request = ScrapeRequest("https://example.com/feed", {})
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _save_all(self, store: DedupDataStore, records: List[dict]) -> None:
+        for record in records:
+            store.save(ScrapedData(record), self.request)
+
+    def test_duplicates_are_dropped(self):
+        inner = ListDataStore()
+        store = DedupDataStore(inner, ["id", "date"])
+        self._save_all(
+            store,
+            [
+                {"id": 1, "date": "2024-01-01"},
+                {"id": 1, "date": "2024-01-02"},
+                {"id": 1, "date": "2024-01-01"},
+                {"name": "no id"},
+            ],
+        )
+        self.assertEqual(len(inner.saved), 3)
+        self.assertEqual((store.saved, store.duplicates, store.unkeyed), (3, 1, 1))
+
+    def test_async_saves_are_deduplicated(self):
+        inner = ListDataStore()
+        store = DedupDataStore(inner, "id")
+
+        async def scenario():
+            for record in [{"id": "a"}, {"id": "a"}, {"id": "b"}]:
+                await store.asave(ScrapedData(record), self.request)
+            await store.aclose()
+
+        run_async(scenario())
+        self.assertEqual(len(inner.saved), 2)
+
+    def test_streamed_body_goes_to_the_wrapped_store(self):
+        root = os.path.join(self.temp_dir.name, "output")
+        store = DedupDataStore(JSONLStore(root=root), "id")
+
+        async def chunks():
+            yield b'{"id": 1}'
+
+        async def scenario():
+            await store.save_stream(chunks(), self.request)
+            await store.aclose()
+
+        run_async(scenario())
+        path = os.path.join(root, "example.com", "0_example.com_feed.jsonl")
+        with open(path, "rb") as file:
+            line = file.read()
+        self.assertIn(b'"data":{"id": 1}', line)
+        self.assertEqual((store.saved, store.unkeyed), (1, 1))
+
+    def test_set_index_survives_restarts(self):
+        path = os.path.join(self.temp_dir.name, "index.txt")
+        with DedupDataStore(ListDataStore(), "id", SetIndex(path)) as store:
+            self._save_all(store, [{"id": 1}, {"id": 2}])
+
+        inner = ListDataStore()
+        store = DedupDataStore(inner, "id", SetIndex(path))
+        self._save_all(store, [{"id": 2}, {"id": 3}])
+        self.assertEqual(len(inner.saved), 1)
+        self.assertEqual(len(store.index), 3)
+
+    def test_bloom_index_survives_restarts(self):
+        path = os.path.join(self.temp_dir.name, "index.bloom")
+        index = BloomIndex(1000, path=path)
+        for key in range(500):
+            self.assertTrue(index.add(f"key-{key}"))
+        index.close()
+
+        index = BloomIndex(1000, path=path)
+        self.assertEqual(len(index), 500)
+        self.assertTrue(all(f"key-{key}" in index for key in range(500)))
+        self.assertFalse(index.add("key-1"))
+
+    def test_bloom_index_false_positives(self):
+        index = BloomIndex(10_000, error_rate=0.01)
+        for key in range(10_000):
+            index.add(f"key-{key}")
+        false_positives = sum(f"other-{key}" in index for key in range(10_000))
+        self.assertLess(false_positives, 10_000 * 0.02)
+
+
+if __name__ == "__main__":
+    unittest.main()
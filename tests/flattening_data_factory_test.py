@@ -0,0 +1,106 @@
+import json
+import unittest
+
+from entities.scraped_data.factory.flattening_data_factory import FlatteningDataFactory
+
+
+NEO_FEED = {
+    "links": {"next": "https://api.nasa.gov/neo/rest/v1/feed?start_date=2024-01-02"},
+    "element_count": 3,
+    "near_earth_objects": {
+        "2024-01-01": [
+            {
+                "id": "2000433",
+                "name": "433 Eros",
+                "estimated_diameter": {"kilometers": {"min": 22.1, "max": 49.4}},
+                "close_approach_data": [{"miss_distance": {"km": "1000"}}],
+            },
+            {
+                "id": "2000719",
+                "name": "719 Albert",
+                "estimated_diameter": {"kilometers": {"min": 2.0, "max": 4.5}},
+                "close_approach_data": [],
+            },
+        ],
+        "2024-01-02": [
+            {
+                "id": "2001036",
+                "name": "1036 Ganymed",
+                "estimated_diameter": {"kilometers": {"min": 37.5, "max": 83.9}},
+                "close_approach_data": [{"miss_distance": {"km": "2000"}}],
+            }
+        ],
+    },
+}
+
+
+class TestFlatteningDataFactory(unittest.TestCase):
+    def test_one_record_per_item(self):
+        factory = FlatteningDataFactory("near_earth_objects.*.*", path_keys=["date"])
+        records = [data.get_data() for data in factory.create_many(NEO_FEED)]
+
+        self.assertEqual([r["id"] for r in records], ["2000433", "2000719", "2001036"])
+        self.assertEqual(
+            [r["date"] for r in records], ["2024-01-01", "2024-01-01", "2024-01-02"]
+        )
+
+    def test_nested_fields_are_flattened(self):
+        factory = FlatteningDataFactory("near_earth_objects.*.*", path_keys=["date"])
+        record = next(factory.create_many(NEO_FEED)).get_data()
+
+        self.assertEqual(record["estimated_diameter_kilometers_min"], 22.1)
+        self.assertEqual(record["estimated_diameter_kilometers_max"], 49.4)
+        # Lists are kept as JSON in a single column
+        self.assertEqual(
+            json.loads(record["close_approach_data"]),
+            [{"miss_distance": {"km": "1000"}}],
+        )
+
+    def test_selected_fields(self):
+        factory = FlatteningDataFactory(
+            "near_earth_objects.*.*",
+            fields={
+                "id": "id",
+                "diameter_min_km": "estimated_diameter.kilometers.min",
+                "miss_distance_km": "close_approach_data.0.miss_distance.km",
+            },
+            path_keys=["date", "position"],
+        )
+        records = [data.get_data() for data in factory.create_many(NEO_FEED)]
+
+        self.assertEqual(
+            records[0],
+            {
+                "date": "2024-01-01",
+                "position": 0,
+                "id": "2000433",
+                "diameter_min_km": 22.1,
+                "miss_distance_km": "1000",
+            },
+        )
+        self.assertIsNone(records[1]["miss_distance_km"])
+
+    def test_records_share_the_columns_seen_so_far(self):
+        feed = {
+            "items": [
+                {"id": "1", "name": "a"},
+                {"id": "2", "name": "b", "sentry_data": "https://ssd.jpl.nasa.gov"},
+                {"id": "3"},
+            ]
+        }
+        factory = FlatteningDataFactory("items.*")
+        records = [data.get_data() for data in factory.create_many(feed)]
+
+        self.assertEqual(records[0], {"id": "1", "name": "a"})
+        self.assertEqual(
+            records[2], {"id": "3", "name": None, "sentry_data": None}
+        )
+        self.assertEqual(list(factory.columns), ["id", "name", "sentry_data"])
+
+    def test_missing_path_creates_no_records(self):
+        factory = FlatteningDataFactory("near_earth_objects.*.*")
+        self.assertEqual(list(factory.create_many({"error": "limit"})), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
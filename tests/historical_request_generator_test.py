@@ -147,6 +147,16 @@ class TestHistoricalRequestGenerator(unittest.TestCase):
             )
         self.assertEqual(len(requests), 7)
 
+    def test_requests_keep_their_own_dates(self):
+        generator = HistoricalRequestGenerator(self.config, self.initial_request)
+        requests = []
+        while generator.working():
+            requests.append(generator.next())
+
+        starts = [request.get_payload()["from"] for request in requests]
+        self.assertEqual(len(set(starts)), len(requests))
+        self.assertEqual(self.initial_request.get_payload(), {"param": "value"})
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,60 @@
+import json
+import unittest
+
+from entities.scraped_data.factory.flattening_data_factory import FlatteningDataFactory
+from use_cases.scraper.streaming.json_item_parser import JSONItemParser
+from tests.flattening_data_factory_test import NEO_FEED
+
+
+def parse(document: bytes, items_path: str, chunk_size: int):
+    parser = JSONItemParser(items_path)
+    items = []
+    for i in range(0, len(document), chunk_size):
+        items.extend(parser.feed(document[i : i + chunk_size]))
+    items.extend(parser.close())
+    return items
+
+
+class TestJSONItemParser(unittest.TestCase):
+    def test_same_items_as_the_factory_for_any_chunk_size(self):
+        document = json.dumps(NEO_FEED).encode()
+        factory = FlatteningDataFactory("near_earth_objects.*.*", path_keys=["date"])
+        expected = [data.get_data() for data in factory.create_many(NEO_FEED)]
+
+        for chunk_size in (1, 2, 7, 1000):
+            items = parse(document, "near_earth_objects.*.*", chunk_size)
+            records = [
+                factory.create_item(item, keys).get_data() for keys, item in items
+            ]
+            self.assertEqual(records, expected, f"chunk_size={chunk_size}")
+
+    def test_keys_matched_by_wildcards(self):
+        items = parse(json.dumps(NEO_FEED).encode(), "near_earth_objects.*.*", 5)
+        self.assertEqual(
+            [keys for keys, _ in items],
+            [("2024-01-01", 0), ("2024-01-01", 1), ("2024-01-02", 0)],
+        )
+
+    def test_strings_with_escapes_and_structural_characters(self):
+        document = {"items": [{"name": 'a "quoted" {[,:]} \\ name', "unicode": "é"}]}
+        items = parse(json.dumps(document).encode(), "items.*", 3)
+        self.assertEqual([item for _, item in items], document["items"])
+
+    def test_scalar_items(self):
+        document = b'{"items": [1, -2.5e3, true, false, null, "x"], "other": 7}'
+        items = parse(document, "items.*", 2)
+        self.assertEqual([item for _, item in items], [1, -2500.0, True, False, None, "x"])
+
+    def test_whole_document_without_path(self):
+        items = parse(json.dumps(NEO_FEED).encode(), "", 4)
+        self.assertEqual(items, [((), NEO_FEED)])
+
+    def test_truncated_document_raises(self):
+        parser = JSONItemParser("items.*")
+        parser.feed(b'{"items": [{"id": 1}, {"id"')
+        with self.assertRaises(ValueError):
+            parser.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
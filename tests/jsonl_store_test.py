@@ -0,0 +1,104 @@
+import gzip
+import json
+import os
+import shutil
+from datetime import datetime
+from typing import Any, Dict, List
+import unittest
+
+from data.jsonl.jsonl_store import JSONLStore
+from entities.scrape_request.dated_request import DatedRequest
+from entities.scrape_request.scrape_request import ScrapeRequest
+from entities.scraped_data.scraped_data import ScrapedData
+from tests.mocks.generate_request_data_pairs import generate_request_data_pairs
+from tests.mocks.run_async import run_async
+
+
+class TestJSONLStore(unittest.TestCase):
+    def setUp(self):
+        self.url = "https://example.com/feed"
+        self.data_pairs = generate_request_data_pairs(self.url, {"key": "value"}, 3, 2)
+
+    def tearDown(self):
+        folder = "example.com"
+        if os.path.exists(folder):
+            shutil.rmtree(folder)
+
+    def test_one_record_per_line(self):
+        with JSONLStore() as store:
+            for request, data in self.data_pairs:
+                store.save(data, request)
+
+        records = self._read_records("0_example.com_feed.jsonl")
+        self.assertEqual(len(records), len(self.data_pairs))
+        for record, (request, data) in zip(records, self.data_pairs):
+            self.assertEqual(record["url"], self.url)
+            self.assertEqual(record["payload"], {"key": "value"})
+            self.assertEqual(record["data"], data.get_data())
+
+    def test_dated_request_window_is_recorded(self):
+        request = DatedRequest(
+            self.url, {}, datetime(2024, 1, 1), datetime(2024, 1, 8), "start", "end"
+        )
+        with JSONLStore() as store:
+            store.save(ScrapedData({"element_count": 1}), request)
+
+        record = self._read_records("0_example.com_feed.jsonl")[0]
+        self.assertEqual(record["start_date"], "2024-01-01T00:00:00")
+        self.assertEqual(record["end_date"], "2024-01-08T00:00:00")
+
+    def test_gzip_compression(self):
+        with JSONLStore(compression="gzip") as store:
+            for request, data in self.data_pairs:
+                store.save(data, request)
+
+        records = self._read_records("0_example.com_feed.jsonl.gz", gzip.open)
+        self.assertEqual([r["data"] for r in records], [d.get_data() for _, d in self.data_pairs])
+
+    def test_streamed_body_is_written_as_is(self):
+        raw = b'{\n  "links": {"next": null},\r\n  "text": "a\\nb"\n}'
+
+        async def chunks():
+            for i in range(0, len(raw), 4):
+                yield raw[i : i + 4]
+
+        with JSONLStore() as store:
+            run_async(store.save_stream(chunks(), ScrapeRequest(self.url, {})))
+
+        records = self._read_records("0_example.com_feed.jsonl")
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["data"], json.loads(raw))
+
+    def test_body_cut_halfway_is_not_written(self):
+        async def chunks():
+            yield b'{"links": '
+            raise ConnectionError("cut")
+
+        with JSONLStore() as store:
+            with self.assertRaises(ConnectionError):
+                run_async(store.save_stream(chunks(), ScrapeRequest(self.url, {})))
+
+        self.assertFalse(os.path.exists("example.com"))
+
+    def test_rotation_by_size(self):
+        with JSONLStore(max_file_bytes=1) as store:
+            for request, data in self.data_pairs:
+                store.save(data, request)
+
+        files = sorted(os.listdir("example.com"))
+        self.assertEqual(len(files), len(self.data_pairs))
+        for filename in files:
+            self.assertEqual(len(self._read_records(filename)), 1)
+
+    def test_unknown_compression(self):
+        with self.assertRaises(ValueError):
+            JSONLStore(compression="rar")
+
+    # * Helper
+    def _read_records(self, filename: str, opener=open) -> List[Dict[str, Any]]:
+        with opener(os.path.join("example.com", filename), "rb") as file:
+            return [json.loads(line) for line in file.read().splitlines()]
+
+
+if __name__ == "__main__":
+    unittest.main()
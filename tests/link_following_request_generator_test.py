@@ -0,0 +1,103 @@
+import asyncio
+import unittest
+from aiohttp import web
+
+from entities.scrape_request.scrape_request import ScrapeRequest
+from use_cases.request_generator.link_following.link_following_request_generator import (
+    LinkFollowingRequestGenerator,
+)
+from use_cases.scraper.regular.regular_scraper import RegularScraper
+from use_cases.scraper.scraper_config import ScraperConfig
+from tests.mocks.local_server import LocalServer
+from tests.mocks.run_async import run_async
+from tests.mocks.scraper_mocks import DictDataFactory, ListDataStore
+
+PAGES = 6
+
+
+async def paginated_handler(request: web.Request) -> web.Response:
+    """
+    Pages linking to the previous and next ones, like the NEO feed
+    """
+    page = int(request.query.get("page", 0))
+    links = {"self": f"/feed?page={page}"}
+    if page > 0:
+        links["previous"] = f"/feed?page={page - 1}"
+    if page < PAGES - 1:
+        links["next"] = f"/feed?page={page + 1}"
+    await asyncio.sleep(0.02)
+    return web.json_response({"page": page, "links": links})
+
+
+class TestLinkFollowingRequestGenerator(unittest.TestCase):
+    def test_links_are_followed_once(self):
+        generator = LinkFollowingRequestGenerator(
+            ScrapeRequest("https://example.com/feed", {"page": 0}),
+            link_paths=["links.next", "links.previous"],
+        )
+        pages = []
+        while generator.working():
+            request = generator.next()
+            page = len(pages)
+            pages.append(request.url)
+            links = {"previous": "https://example.com/feed?page=0"}
+            if page < 3:
+                links["next"] = f"https://example.com/feed?page={page + 1}"
+            generator.feedback(request, {"links": links})
+        self.assertEqual(len(pages), 4)
+        self.assertEqual(generator.total_requests, 4)
+
+    def test_max_requests(self):
+        generator = LinkFollowingRequestGenerator(
+            ScrapeRequest("https://example.com/feed", {}), max_requests=1
+        )
+        request = generator.next()
+        generator.feedback(request, {"links": {"next": "/feed?page=1"}})
+        self.assertFalse(generator.working())
+
+    def test_state_keeps_pending_links(self):
+        generator = LinkFollowingRequestGenerator(
+            ScrapeRequest("https://example.com/feed", {})
+        )
+        generator.track_completion()
+        request = generator.next()
+        generator.feedback(request, {"links": {"next": "/feed?page=1"}})
+
+        restored = LinkFollowingRequestGenerator(
+            ScrapeRequest("https://example.com/feed", {})
+        )
+        restored.restore_state(generator.get_state())
+        urls = []
+        while restored.working():
+            urls.append(restored.next().url)
+        # The first page was not completed, it's requested again
+        self.assertEqual(
+            urls, ["https://example.com/feed", "https://example.com/feed?page=1"]
+        )
+
+    def test_scraper_follows_the_pages(self):
+        async def scenario():
+            server = await LocalServer(paginated_handler).start()
+            try:
+                store = ListDataStore()
+                scraper = RegularScraper(
+                    LinkFollowingRequestGenerator(
+                        ScrapeRequest(f"{server.url}/feed", {"page": 0}),
+                        link_paths=["links.next", "links.previous", "links.self"],
+                    ),
+                    DictDataFactory(),
+                    store,
+                    ScraperConfig(0, 0, workers=2),
+                )
+                await scraper.scrape()
+            finally:
+                await server.stop()
+            return store, server
+
+        store, server = run_async(scenario())
+        self.assertEqual(len(server.requests), PAGES)
+        self.assertEqual(len(store.saved), PAGES)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+
+from benchmarks.micro import (
+    BENCHMARKS,
+    compare,
+    load_baselines,
+    measure,
+    save_baselines,
+)
+
+
+class TestMicroBenchmarks(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "baselines.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_every_benchmark_runs(self):
+        for name in BENCHMARKS:
+            result = measure(name, scale=0.0001, repeat=1)
+            self.assertGreater(result["operations"], 0, name)
+            self.assertGreater(result["seconds"], 0, name)
+
+    def test_generator_benchmark_includes_the_remainder(self):
+        # 10 years of minutes at this scale are 525 windows, and the 30 seconds left
+        self.assertEqual(measure("historical_generator", 0.0001, 1)["operations"], 526)
+
+    def test_twice_as_slow_is_a_regression(self):
+        baselines = {
+            "fast": {"seconds_per_operation": 1e-6},
+            "slow": {"seconds_per_operation": 1e-6},
+        }
+        results = {
+            "fast": {"seconds_per_operation": 1.2e-6},
+            "slow": {"seconds_per_operation": 2e-6},
+            "new": {"seconds_per_operation": 5e-6},
+        }
+        self.assertEqual(compare(results, baselines, threshold=1.5), ["slow"])
+        self.assertAlmostEqual(results["slow"]["ratio"], 2.0)
+        # Benchmarks without a baseline are not compared
+        self.assertNotIn("ratio", results["new"])
+
+    def test_saved_baselines_keep_the_ones_not_run(self):
+        save_baselines(self.path, {"a": {"seconds_per_operation": 1.0}}, 1.0)
+        save_baselines(self.path, {"b": {"seconds_per_operation": 2.0}}, 0.1)
+
+        baselines = load_baselines(self.path)
+        self.assertEqual(sorted(baselines["benchmarks"]), ["a", "b"])
+        self.assertEqual(baselines["scale"], 0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,226 @@
+import json
+import os
+import shutil
+import tempfile
+from typing import Any, Dict
+import unittest
+from aiohttp import web
+
+from entities.scrape_request.scrape_request import ScrapeRequest
+from entities.scraped_data.scraped_data import ScrapedData
+from use_cases.scraper.middleware.middleware import Middleware
+from use_cases.scraper.middleware.middleware_chain import MiddlewareChain
+from use_cases.scraper.middleware.profiling_middleware import ProfilingMiddleware
+from use_cases.scraper.middleware.request_context import RequestContext
+from use_cases.scraper.regular.regular_scraper import RegularScraper
+from use_cases.scraper.scraper import Scraper
+from use_cases.scraper.scraper_config import ScraperConfig
+from tests.mocks.local_server import LocalServer
+from tests.mocks.run_async import run_async
+from tests.mocks.scraper_mocks import (
+    DictDataFactory,
+    ListDataStore,
+    ListRequestGenerator,
+)
+
+
+class EchoScraper(Scraper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fetched = []
+
+    async def fetch(self, request: ScrapeRequest) -> Dict[str, Any] | None:
+        self.fetched.append(request.url)
+        return {"url": request.url}
+
+
+class TagResponses(Middleware):
+    def on_response(self, request, response, context):
+        return {**response, "tag": "seen"}
+
+
+class DropOddRecords(Middleware):
+    def on_record(self, request, data, context):
+        if int(data.get_data()["url"].rsplit("/", 1)[1]) % 2:
+            return None
+        return data
+
+
+class AnswerFirstRequest(Middleware):
+    def on_request(self, request, context):
+        if request.url.endswith("/0"):
+            return {"url": request.url, "answered": True}
+        return None
+
+
+class RecordSaved(Middleware):
+    def __init__(self):
+        self.saved = []
+        self.closed = False
+
+    def on_saved(self, request, context):
+        self.saved.append((request.url, set(context.spans)))
+
+    def on_close(self):
+        self.closed = True
+
+
+class AddHeader(Middleware):
+    def on_request(self, request, context):
+        context.headers["X-Trace"] = request.url.rsplit("/", 1)[1]
+        return None
+
+
+async def headers_handler(request: web.Request) -> web.Response:
+    return web.json_response({"trace": request.headers.get("X-Trace")})
+
+
+class TestMiddlewareChain(unittest.TestCase):
+    def test_hooks_nobody_overrides_are_skipped(self):
+        chain = MiddlewareChain([DropOddRecords()])
+        context = RequestContext()
+        request = ScrapeRequest("https://example.com/1", {})
+        response = {"url": request.url}
+
+        self.assertIs(chain.on_response(request, response, context), response)
+        self.assertIsNone(chain.on_request(request, context))
+        self.assertIsNone(chain.on_record(request, ScrapedData(response), context))
+        self.assertEqual(set(context.spans), {"on_record"})
+
+    def test_hooks_run_in_order_until_one_drops(self):
+        class Drop(Middleware):
+            def on_response(self, request, response, context):
+                return None
+
+        tagger = TagResponses()
+        chain = MiddlewareChain([Drop(), tagger])
+        request = ScrapeRequest("https://example.com/1", {})
+
+        response = chain.on_response(request, {"url": request.url}, RequestContext())
+        self.assertIsNone(response)
+
+    def test_span_adds_up_every_run_of_a_stage(self):
+        context = RequestContext()
+        for _ in range(3):
+            with context.span("save"):
+                pass
+        span = context.spans["save"]
+        self.assertEqual(span.count, 3)
+        self.assertGreaterEqual(span.wall, 0)
+        self.assertGreaterEqual(span.cpu, 0)
+
+
+class TestScraperMiddlewares(unittest.TestCase):
+    def _scraper(self, middlewares, num_requests=4) -> EchoScraper:
+        return EchoScraper(
+            ListRequestGenerator(num_requests),
+            DictDataFactory(),
+            ListDataStore(),
+            ScraperConfig(0, 0, middlewares=middlewares),
+        )
+
+    def test_without_middlewares_there_is_no_chain(self):
+        scraper = self._scraper([])
+        run_async(scraper.scrape())
+
+        self.assertIsNone(scraper.middleware)
+        self.assertEqual(len(scraper.data_store.saved), 4)
+
+    def test_hooks_change_and_filter_the_records(self):
+        recorder = RecordSaved()
+        scraper = self._scraper([TagResponses(), DropOddRecords(), recorder])
+        run_async(scraper.scrape())
+
+        records = [data.get_data() for data in scraper.data_store.records]
+        self.assertEqual(
+            records,
+            [
+                {"url": "https://example.com/0", "tag": "seen"},
+                {"url": "https://example.com/2", "tag": "seen"},
+            ],
+        )
+        self.assertEqual(len(recorder.saved), 4)
+        self.assertTrue(recorder.closed)
+        self.assertEqual(scraper._contexts, {})
+
+        _, stages = recorder.saved[0]
+        self.assertEqual(
+            stages, {"fetch", "on_response", "create", "on_record", "save"}
+        )
+
+    def test_answered_request_is_not_fetched(self):
+        scraper = self._scraper([AnswerFirstRequest()])
+        run_async(scraper.scrape())
+
+        self.assertNotIn("https://example.com/0", scraper.fetched)
+        self.assertEqual(len(scraper.fetched), 3)
+        records = [data.get_data() for data in scraper.data_store.records]
+        self.assertIn({"url": "https://example.com/0", "answered": True}, records)
+
+    def test_dropped_response_completes_without_saving(self):
+        class DropAll(Middleware):
+            def on_response(self, request, response, context):
+                return None
+
+        recorder = RecordSaved()
+        scraper = self._scraper([DropAll(), recorder])
+        run_async(scraper.scrape())
+
+        self.assertEqual(scraper.data_store.saved, [])
+        self.assertEqual(recorder.saved, [])
+        self.assertFalse(scraper.request_generator.working())
+
+    def test_headers_are_added_to_the_request(self):
+        async def scenario():
+            server = await LocalServer(headers_handler).start()
+            scraper = RegularScraper(
+                ListRequestGenerator(2, base_url=server.url),
+                DictDataFactory(),
+                ListDataStore(),
+                ScraperConfig(0, 0, middlewares=[AddHeader()]),
+            )
+            try:
+                await scraper.scrape()
+            finally:
+                await server.stop()
+            return scraper
+
+        scraper = run_async(scenario())
+        traces = [data.get_data()["trace"] for data in scraper.data_store.records]
+        self.assertEqual(traces, ["0", "1"])
+
+
+class TestProfilingMiddleware(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_dumps_the_stages_at_the_end_of_the_run(self):
+        path = os.path.join(self.folder, "profile.json")
+        profiler = ProfilingMiddleware(path)
+        scraper = EchoScraper(
+            ListRequestGenerator(5),
+            DictDataFactory(),
+            ListDataStore(),
+            ScraperConfig(0, 0, middlewares=[profiler]),
+        )
+        with self.assertLogs(
+            "use_cases.scraper.middleware.profiling_middleware", "INFO"
+        ) as logs:
+            run_async(scraper.scrape())
+
+        with open(path, "r", encoding="utf-8") as file:
+            profile = json.load(file)
+        self.assertEqual(profile["requests"], 5)
+        self.assertEqual(set(profile["stages"]), {"fetch", "create", "save"})
+        for stage in profile["stages"].values():
+            self.assertEqual(stage["count"], 5)
+            self.assertGreaterEqual(stage["wall"], 0)
+            self.assertGreaterEqual(stage["cpu"], 0)
+        self.assertIn("Profile of 5 requests", logs.output[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import asyncio
+from typing import List
+
+
+class FakeTorControlServer:
+    """
+    Local stand-in for the Tor control port, it speaks enough of the protocol
+    to authenticate and accept signals, and records the commands it received
+    """
+
+    def __init__(self, password: str | None = None):
+        self.password = password
+        self.commands: List[str] = []
+        self.newnym_signals = 0
+        self.port = 0
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self) -> "FakeTorControlServer":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        authenticated = False
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command = line.decode("utf-8").strip()
+            self.commands.append(command)
+
+            if command.startswith("AUTHENTICATE"):
+                expected = "AUTHENTICATE" if self.password is None else f'AUTHENTICATE "{self.password}"'
+                authenticated = command == expected
+                reply = "250 OK" if authenticated else "515 Authentication failed"
+            elif command == "QUIT":
+                writer.write(b"250 closing connection\r\n")
+                break
+            elif not authenticated:
+                reply = "514 Authentication required."
+            elif command == "SIGNAL NEWNYM":
+                self.newnym_signals += 1
+                reply = "250 OK"
+            else:
+                reply = f'510 Unrecognized command "{command}"'
+
+            writer.write(reply.encode("utf-8") + b"\r\n")
+            await writer.drain()
+        writer.close()
@@ -0,0 +1,42 @@
+from typing import Awaitable, Callable, List
+from aiohttp import web
+
+
+Handler = Callable[[web.Request], Awaitable[web.StreamResponse]]
+
+
+class LocalServer:
+    """
+    HTTP server on localhost used to test the scrapers without reaching the internet
+    It keeps track of the requests received and the connections they came from
+    """
+
+    def __init__(self, handler: Handler):
+        self.handler = handler
+        self.requests: List[web.Request] = []
+        self.connections: List[int] = []  # client port of every request
+        self._runner: web.AppRunner | None = None
+        self.port = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    async def start(self) -> "LocalServer":
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        self.requests.append(request)
+        self.connections.append(request.transport.get_extra_info("peername")[1])
+        return await self.handler(request)
@@ -0,0 +1,14 @@
+import asyncio
+from typing import Any, Coroutine
+
+
+def run_async(coroutine: Coroutine) -> Any:
+    """
+    Runs the coroutine in a private loop,
+    so the default event loop other tests rely on is left untouched
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
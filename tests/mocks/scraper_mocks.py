@@ -0,0 +1,44 @@
+from typing import Any, Dict, List
+
+from data.data_store import DataStore
+from entities.scrape_request.scrape_request import ScrapeRequest
+from entities.scraped_data.factory.scrape_data_factory import ScrapeDataFactory
+from entities.scraped_data.scraped_data import ScrapedData
+from use_cases.request_generator.request_generator import RequestGenerator
+
+
+class ListRequestGenerator(RequestGenerator):
+    def __init__(self, num_requests: int, base_url: str = "https://example.com"):
+        self.requests = [
+            ScrapeRequest(f"{base_url}/{i}", {}) for i in range(num_requests)
+        ]
+        self.index = 0
+
+    def working(self) -> bool:
+        return self.index < len(self.requests)
+
+    def next(self) -> ScrapeRequest | None:
+        if not self.working():
+            return None
+        request = self.requests[self.index]
+        self.index += 1
+        return request
+
+    @property
+    def total_requests(self) -> int:
+        return self.index
+
+
+class DictDataFactory(ScrapeDataFactory[ScrapedData]):
+    def create(self, data: Dict[str, Any]) -> ScrapedData:
+        return ScrapedData(data)
+
+
+class ListDataStore(DataStore):
+    def __init__(self):
+        self.saved: List[ScrapeRequest] = []
+        self.records: List[ScrapedData] = []
+
+    def save(self, data: ScrapedData, request: ScrapeRequest) -> None:
+        self.saved.append(request)
+        self.records.append(data)
@@ -0,0 +1,116 @@
+import asyncio
+from datetime import datetime, timedelta
+import unittest
+from aiohttp import web
+
+from entities.scrape_request.scrape_request import ScrapeRequest
+from entities.scraped_data.scraped_data import ScrapedData
+from use_cases.scraper.orchestrator.job_progress import JobProgress
+from use_cases.scraper.orchestrator.job_spec import JobSpec
+from use_cases.scraper.orchestrator.orchestrator import Orchestrator
+from tests.mocks.local_server import LocalServer
+from tests.mocks.run_async import run_async
+from tests.mocks.scraper_mocks import DictDataFactory, ListDataStore
+
+START = datetime(2024, 1, 1)
+
+
+class FailingStore(ListDataStore):
+    def save(self, data: ScrapedData, request: ScrapeRequest) -> None:
+        raise OSError("disk full")
+
+
+class TestOrchestrator(unittest.TestCase):
+    def setUp(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _feed(self, request: web.Request) -> web.Response:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return web.json_response({"path": request.path, **request.query})
+
+    def _job(self, name: str, url: str, days: int, store=None, workers=4) -> JobSpec:
+        return JobSpec(
+            name,
+            f"{url}/{name}",
+            {"api_key": "DEMO_KEY"},
+            start=START,
+            end=START + timedelta(days=days),
+            interval=timedelta(days=1),
+            data_store=store or ListDataStore(),
+            start_key="start_date",
+            end_key="end_date",
+            data_factory=DictDataFactory(),
+            workers=workers,
+        )
+
+    def _run(self, build_jobs, **options):
+        reports = []
+
+        async def scenario():
+            server = await LocalServer(self._feed).start()
+            jobs = build_jobs(server.url)
+            orchestrator = Orchestrator(
+                jobs, on_progress=reports.append, progress_interval=0.01, **options
+            )
+            try:
+                completed = await orchestrator.run()
+            finally:
+                await server.stop()
+            return orchestrator, jobs, server, completed
+
+        return (*run_async(scenario()), reports)
+
+    def test_runs_every_job_within_the_caps(self):
+        orchestrator, jobs, server, completed, reports = self._run(
+            lambda url: [self._job("neo", url, 6), self._job("cad", url, 4)],
+            max_in_flight=3,
+        )
+
+        self.assertTrue(completed)
+        self.assertEqual(len(jobs[0].data_store.saved), 6)
+        self.assertEqual(len(jobs[1].data_store.saved), 4)
+        self.assertEqual(self.max_in_flight, 3)
+        # Both jobs go through the same pool of connections
+        self.assertLessEqual(len(set(server.connections)), 3)
+        for job in jobs:
+            progress = orchestrator.progress[job.name]
+            self.assertEqual(progress.status, JobProgress.DONE)
+            self.assertEqual(progress.completed, progress.total)
+        self.assertTrue(any(report.status == JobProgress.RUNNING for report in reports))
+
+    def test_per_host_cap(self):
+        _, _, _, completed, _ = self._run(
+            lambda url: [self._job("neo", url, 4), self._job("cad", url, 4)],
+            max_per_host=2,
+        )
+        self.assertTrue(completed)
+        self.assertEqual(self.max_in_flight, 2)
+
+    def test_failed_job_does_not_stop_the_others(self):
+        orchestrator, jobs, _, completed, _ = self._run(
+            lambda url: [
+                self._job("neo", url, 3),
+                self._job("broken", url, 3, store=FailingStore()),
+            ]
+        )
+
+        self.assertFalse(completed)
+        self.assertEqual(orchestrator.failed, ["broken"])
+        self.assertEqual(len(jobs[0].data_store.saved), 3)
+        broken = orchestrator.progress["broken"]
+        self.assertEqual(broken.status, JobProgress.FAILED)
+        self.assertIn("disk full", broken.error)
+
+    def test_job_names_must_be_unique(self):
+        with self.assertRaises(ValueError):
+            Orchestrator(
+                [self._job("neo", "http://x", 1), self._job("neo", "http://x", 1)]
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+
+from use_cases.scraper.tor.proxy_pool import ProxyPool, TorProxy
+from use_cases.scraper.tor.tor_controller import TorControlError, TorController
+from tests.mocks.fake_tor_control_server import FakeTorControlServer
+from tests.mocks.run_async import run_async
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTorController(unittest.TestCase):
+    def _newnym(self, server_password, client_password):
+        async def scenario():
+            server = await FakeTorControlServer(server_password).start()
+            try:
+                controller = TorController(port=server.port, password=client_password)
+                await controller.new_identity()
+            finally:
+                await server.stop()
+            return server
+
+        return run_async(scenario())
+
+    def test_new_identity(self):
+        server = self._newnym("secret", "secret")
+        self.assertEqual(server.newnym_signals, 1)
+        self.assertEqual(server.commands, ['AUTHENTICATE "secret"', "SIGNAL NEWNYM", "QUIT"])
+
+    def test_wrong_password(self):
+        with self.assertRaises(TorControlError):
+            self._newnym("secret", "guess")
+
+
+class TestProxyPool(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def _use(self, pool: ProxyPool, latencies, failing=()):
+        """
+        Runs requests through the pool, with the latency of every proxy and the ones failing
+        """
+
+        async def scenario():
+            used = []
+            for _ in range(20):
+                lease = pool.acquire()
+                used.append(lease.proxy.url)
+                ok = lease.proxy.url not in failing
+                await pool.release(lease, latencies[lease.proxy.url], ok)
+            return used
+
+        return run_async(scenario())
+
+    def test_prefers_the_fastest_proxy(self):
+        pool = ProxyPool.from_urls(["socks5://fast:9050", "socks5://slow:9050"], clock=self.clock)
+        used = self._use(pool, {"socks5://fast:9050": 0.1, "socks5://slow:9050": 2.0})
+        self.assertGreater(used.count("socks5://fast:9050"), 15)
+
+    def test_failing_proxy_is_benched(self):
+        pool = ProxyPool.from_urls(
+            ["socks5://good:9050", "socks5://bad:9050"], cooldown=60, clock=self.clock
+        )
+        used = self._use(
+            pool,
+            {"socks5://good:9050": 1.0, "socks5://bad:9050": 0.1},
+            failing={"socks5://bad:9050"},
+        )
+        # The bad proxy looks fast, but it's benched once it fails enough
+        self.assertLessEqual(used.count("socks5://bad:9050"), 4)
+        self.assertEqual(used[-10:], ["socks5://good:9050"] * 10)
+
+    def test_isolation_slots_rotate(self):
+        pool = ProxyPool.from_urls(["socks5://tor:9050"], isolation_slots=3, clock=self.clock)
+        leases = [pool.acquire() for _ in range(4)]
+        self.assertEqual([lease.slot for lease in leases], [0, 1, 2, 0])
+        self.assertEqual(len({lease.username for lease in leases}), 3)
+        self.assertEqual(len(pool.leases_of("socks5://tor:9050")), 3)
+
+    def test_degraded_proxy_gets_new_circuits(self):
+        async def scenario():
+            server = await FakeTorControlServer().start()
+            try:
+                proxy = TorProxy("socks5://tor:9050", TorController(port=server.port))
+                pool = ProxyPool([proxy], min_requests=2, clock=self.clock)
+                renewed = []
+                for _ in range(4):
+                    lease = pool.acquire()
+                    renewed.append(await pool.release(lease, 1.0, False))
+            finally:
+                await server.stop()
+            return server, pool, renewed
+
+        server, pool, renewed = run_async(scenario())
+        # NEWNYM is only sent once within the interval Tor allows
+        self.assertEqual(server.newnym_signals, 1)
+        self.assertEqual(pool.renewals, 1)
+        self.assertEqual(renewed.count(True), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
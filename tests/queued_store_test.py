@@ -0,0 +1,140 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import List
+import unittest
+
+from data.data_store import DataStore
+from data.jsonl.jsonl_store import JSONLStore
+from data.queued.queued_store import QueuedDataStore
+from entities.scrape_request.scrape_request import ScrapeRequest
+from entities.scraped_data.scraped_data import ScrapedData
+from tests.mocks.generate_request_data_pairs import generate_request_data_pairs
+from tests.mocks.run_async import run_async
+
+
+class SlowDataStore(DataStore):
+    def __init__(self, delay: float = 0.01, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.saved: List[ScrapedData] = []
+        self.threads = set()
+        self.closed = False
+
+    def save(self, data: ScrapedData, request: ScrapeRequest) -> None:
+        time.sleep(self.delay)
+        if self.fail:
+            raise IOError("disk full")
+        self.threads.add(threading.get_ident())
+        self.saved.append(data)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class TestQueuedDataStore(unittest.TestCase):
+    def setUp(self):
+        self.pairs = generate_request_data_pairs("https://example.com", {}, 10, 2)
+
+    def test_aclose_drains_the_queue(self):
+        wrapped = SlowDataStore()
+        store = QueuedDataStore(wrapped)
+
+        async def scenario():
+            for request, data in self.pairs:
+                await store.asave(data, request)
+            await store.aclose()
+
+        run_async(scenario())
+        self.assertEqual(wrapped.saved, [data for _, data in self.pairs])
+        self.assertTrue(wrapped.closed)
+        self.assertEqual(store.saved, len(self.pairs))
+        self.assertEqual(store.queue_depth, 0)
+
+    def test_writes_run_outside_the_event_loop_thread(self):
+        wrapped = SlowDataStore(delay=0)
+        store = QueuedDataStore(wrapped)
+
+        async def scenario():
+            request, data = self.pairs[0]
+            await store.asave(data, request)
+            await store.aclose()
+
+        run_async(scenario())
+        self.assertNotIn(threading.get_ident(), wrapped.threads)
+
+    def test_full_queue_applies_backpressure(self):
+        wrapped = SlowDataStore(delay=0.02)
+        store = QueuedDataStore(wrapped, max_queue_size=2)
+
+        async def scenario():
+            for request, data in self.pairs:
+                await store.asave(data, request)
+                self.assertLessEqual(store.queue_depth, 2)
+            await store.aclose()
+
+        run_async(scenario())
+        self.assertEqual(store.max_queue_depth, 2)
+        self.assertEqual(len(wrapped.saved), len(self.pairs))
+
+    def test_failed_writes_are_counted_and_raised_on_close(self):
+        store = QueuedDataStore(SlowDataStore(delay=0, fail=True))
+
+        async def scenario():
+            for request, data in self.pairs[:3]:
+                await store.asave(data, request)
+            await store.aclose()
+
+        with self.assertRaises(IOError):
+            run_async(scenario())
+        self.assertEqual(store.failed, 3)
+        self.assertEqual(store.saved, 0)
+
+    def test_failed_writes_are_raised_on_flush(self):
+        store = QueuedDataStore(SlowDataStore(delay=0, fail=True))
+
+        async def scenario():
+            request, data = self.pairs[0]
+            await store.asave(data, request)
+            try:
+                await store.aflush()
+            finally:
+                with self.assertRaises(IOError):
+                    await store.aclose()
+
+        with self.assertLogs("data.queued.queued_store", "ERROR"):
+            with self.assertRaises(IOError):
+                run_async(scenario())
+        self.assertEqual(store.failed, 1)
+
+    def test_streamed_body_goes_to_the_wrapped_store(self):
+        request = ScrapeRequest("https://example.com/feed", {})
+        body = b'{"id": 1, "name": "a"}'
+
+        async def chunks():
+            for i in range(0, len(body), 4):
+                yield body[i : i + 4]
+
+        for use_thread in (True, False):
+            with tempfile.TemporaryDirectory() as root:
+                store = QueuedDataStore(JSONLStore(root=root), use_thread=use_thread)
+
+                async def scenario():
+                    await store.save_stream(chunks(), request)
+                    await store.aclose()
+
+                run_async(scenario())
+                path = os.path.join(root, "example.com", "0_example.com_feed.jsonl")
+                with open(path, "rb") as file:
+                    (line,) = file.read().splitlines()
+                # Written as it is, not decoded and encoded again
+                self.assertIn(body, line)
+                self.assertEqual(json.loads(line)["data"], json.loads(body))
+                self.assertEqual(store.saved, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+
+from use_cases.scraper.rate_limit.rate_limiter import RateLimiter
+from use_cases.scraper.rate_limit.token_bucket import TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTokenBucket(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_burst_then_rate(self):
+        bucket = TokenBucket(rate=2, burst=3, clock=self.clock)
+        waits = [bucket.reserve() for _ in range(5)]
+        # 3 requests right away, then one every 0.5 seconds
+        self.assertEqual(waits, [0, 0, 0, 0.5, 1.0])
+
+    def test_tokens_refill_over_time(self):
+        bucket = TokenBucket(rate=1, burst=2, clock=self.clock)
+        bucket.reserve()
+        bucket.reserve()
+        self.clock.now = 1.0
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 1.0)
+
+    def test_pause(self):
+        bucket = TokenBucket(rate=10, burst=5, clock=self.clock)
+        bucket.pause(30)
+        self.assertEqual(bucket.reserve(), 30)
+        self.clock.now = 30
+        self.assertEqual(bucket.reserve(), 0)
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.url = "https://api.nasa.gov/neo/rest/v1/feed"
+
+    def test_buckets_per_host(self):
+        limiter = RateLimiter(rate=1, clock=self.clock)
+        self.assertEqual(limiter.bucket(self.url).reserve(), 0)
+        self.assertEqual(limiter.bucket("https://example.com/a").reserve(), 0)
+        self.assertEqual(limiter.bucket(self.url + "?page=2").reserve(), 1.0)
+
+    def test_retry_after_pauses_the_host(self):
+        limiter = RateLimiter(rate=10, burst=10, clock=self.clock)
+        limiter.observe(self.url, 429, {"Retry-After": "12"})
+        self.assertEqual(limiter.bucket(self.url).reserve(), 12)
+
+    def test_remaining_requests_cap_the_burst(self):
+        limiter = RateLimiter(rate=1, burst=10, clock=self.clock)
+        limiter.observe(self.url, 200, {"X-RateLimit-Remaining": "2"})
+        waits = [limiter.bucket(self.url).reserve() for _ in range(3)]
+        self.assertEqual(waits, [0, 0, 1.0])
+
+    def test_no_remaining_requests_pauses_the_host(self):
+        limiter = RateLimiter(rate=1, burst=10, exhausted_pause=60, clock=self.clock)
+        limiter.observe(self.url, 200, {"X-RateLimit-Remaining": "0"})
+        self.assertEqual(limiter.bucket(self.url).reserve(), 60)
+
+    def test_adaptive_increase_and_decrease(self):
+        limiter = RateLimiter(
+            rate=4, adaptive=True, increase=1, decrease=0.5, clock=self.clock
+        )
+        limiter.observe(self.url, 200)
+        limiter.observe(self.url, 200)
+        self.assertEqual(limiter.bucket(self.url).rate, 6)
+
+        limiter.observe(self.url, 503)
+        self.assertEqual(limiter.bucket(self.url).rate, 3)
+
+    def test_adaptive_slow_responses_decrease(self):
+        limiter = RateLimiter(
+            rate=4, adaptive=True, target_latency=1.0, min_rate=3, clock=self.clock
+        )
+        limiter.observe(self.url, 200, latency=2.5)
+        self.assertEqual(limiter.bucket(self.url).rate, 3)
+
+    def test_fixed_rate_ignores_statuses(self):
+        limiter = RateLimiter(rate=4, clock=self.clock)
+        limiter.observe(self.url, 429)
+        self.assertEqual(limiter.bucket(self.url).rate, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from aiohttp import web
+
+from data.jsonl.jsonl_store import JSONLStore
+
+from entities.scrape_request.scrape_request import ScrapeRequest
+from use_cases.request_generator.link_following.link_following_request_generator import (
+    LinkFollowingRequestGenerator,
+)
+from use_cases.scraper.fetch_error import FetchError
+from use_cases.scraper.regular.regular_scraper import RegularScraper
+from use_cases.scraper.scraper_config import ScraperConfig
+from tests.mocks.local_server import LocalServer
+from tests.mocks.run_async import run_async
+from tests.mocks.scraper_mocks import DictDataFactory, ListDataStore, ListRequestGenerator
+
+
+ITEMS = [{"id": i, "name": f"asteroid {i}"} for i in range(500)]
+
+
+async def feed_handler(request: web.Request) -> web.StreamResponse:
+    body = json.dumps({"element_count": len(ITEMS), "items": ITEMS}).encode()
+    response = web.StreamResponse()
+    response.content_type = "application/json"
+    await response.prepare(request)
+    # Small writes so the body arrives in many chunks
+    for i in range(0, len(body), 1000):
+        await response.write(body[i : i + 1000])
+    await response.write_eof()
+    return response
+
+
+async def echo_handler(request: web.Request) -> web.Response:
+    if request.path == "/error":
+        return web.json_response({"error": "boom"}, status=500)
+    return web.json_response(dict(request.query))
+
+
+class FailingDataStore(ListDataStore):
+    def save(self, data, request):
+        raise ValueError("bad record")
+
+
+class TestRegularScraper(unittest.TestCase):
+    def setUp(self):
+        self.scraper = RegularScraper(None, None, None, ScraperConfig(0, 0))
+
+    def _fetch_all(self, paths, payload=None):
+        async def scenario():
+            server = await LocalServer(echo_handler).start()
+            try:
+                responses = [
+                    await self.scraper.fetch(
+                        ScrapeRequest(f"{server.url}{path}", payload or {})
+                    )
+                    for path in paths
+                ]
+            finally:
+                await self.scraper.close()
+                await server.stop()
+            return responses, server
+
+        return run_async(scenario())
+
+    def test_fetch_returns_json(self):
+        responses, _ = self._fetch_all(["/feed"], {"start_date": "2024-01-01"})
+        self.assertEqual(responses, [{"start_date": "2024-01-01"}])
+
+    def test_server_error_raises_fetch_error(self):
+        with self.assertRaises(FetchError) as context:
+            self._fetch_all(["/error"])
+        self.assertEqual(context.exception.kind, FetchError.SERVER)
+        self.assertEqual(context.exception.status, 500)
+
+    def test_unreachable_host_raises_fetch_error(self):
+        async def scenario():
+            try:
+                return await self.scraper.fetch(ScrapeRequest("http://127.0.0.1:1", {}))
+            finally:
+                await self.scraper.close()
+
+        with self.assertRaises(FetchError) as context:
+            run_async(scenario())
+        self.assertEqual(context.exception.kind, FetchError.CONNECTION)
+
+    def test_stream_items(self):
+        store = ListDataStore()
+        self._stream(
+            ScraperConfig(
+                0,
+                0,
+                stream_mode=ScraperConfig.STREAM_ITEMS,
+                stream_items_path="items.*",
+                chunk_size=256,
+            ),
+            store,
+        )
+        self.assertEqual(len(store.saved), len(ITEMS))
+
+    def test_store_errors_are_not_retried_while_streaming(self):
+        store = FailingDataStore()
+        config = ScraperConfig(
+            0, 0, stream_mode=ScraperConfig.STREAM_ITEMS, stream_items_path="items.*"
+        )
+        with self.assertRaises(ValueError):
+            self._stream(config, store)
+
+    def test_stream_needs_a_generator_without_feedback(self):
+        generator = LinkFollowingRequestGenerator(
+            ScrapeRequest("https://example.com", {}), link_paths=["next"]
+        )
+        config = ScraperConfig(0, 0, stream_mode=ScraperConfig.STREAM_RAW)
+        with self.assertRaises(ValueError):
+            RegularScraper(generator, DictDataFactory(), ListDataStore(), config)
+
+    def test_stream_raw(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        self._stream(
+            ScraperConfig(0, 0, stream_mode=ScraperConfig.STREAM_RAW, chunk_size=256),
+            JSONLStore(root=root),
+        )
+        (folder,) = os.listdir(root)
+        (filename,) = os.listdir(os.path.join(root, folder))
+        with open(os.path.join(root, folder, filename)) as file:
+            records = [json.loads(line) for line in file]
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["data"]["items"], ITEMS)
+
+    def _stream(self, config: ScraperConfig, store) -> None:
+        async def scenario():
+            server = await LocalServer(feed_handler).start()
+            try:
+                generator = ListRequestGenerator(1, base_url=server.url)
+                scraper = RegularScraper(generator, DictDataFactory(), store, config)
+                await scraper.scrape()
+            finally:
+                await server.stop()
+
+        run_async(scenario())
+
+    def test_connection_is_reused(self):
+        _, server = self._fetch_all(["/a", "/b", "/c"])
+        self.assertEqual(len(server.requests), 3)
+        self.assertEqual(len(set(server.connections)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
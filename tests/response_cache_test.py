@@ -0,0 +1,176 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+import tempfile
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+import unittest
+
+from entities.scrape_request.dated_request import DatedRequest
+from entities.scrape_request.request_key import normalized_request, request_key
+from entities.scrape_request.scrape_request import ScrapeRequest
+from use_cases.scraper.cache.response_cache import ResponseCache
+from use_cases.scraper.scraper import Scraper
+from use_cases.scraper.scraper_config import ScraperConfig
+from tests.mocks.run_async import run_async
+from tests.mocks.scraper_mocks import (
+    DictDataFactory,
+    ListDataStore,
+    ListRequestGenerator,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingScraper(Scraper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fetched: List[ScrapeRequest] = []
+
+    async def fetch(self, request: ScrapeRequest) -> Dict[str, Any] | None:
+        self.fetched.append(request)
+        return {"url": request.url}
+
+
+class TestRequestKey(unittest.TestCase):
+    def test_query_and_payload_are_merged_in_order(self):
+        first = normalized_request("HTTPS://Example.com/feed?b=2#top", {"a": 1})
+        second = normalized_request("https://example.com/feed", {"b": "2", "a": "1"})
+        self.assertEqual(first, second)
+        self.assertEqual(first, "https://example.com/feed?a=1&b=2")
+
+    def test_different_payloads_have_different_keys(self):
+        self.assertNotEqual(
+            request_key("https://example.com/feed", {"a": 1}),
+            request_key("https://example.com/feed", {"a": 2}),
+        )
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder = os.path.join(self.temp_dir.name, "cache")
+        self.clock = FakeClock()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _cache(self, **kwargs) -> ResponseCache:
+        return ResponseCache(self.folder, clock=self.clock, **kwargs)
+
+    def test_hit_and_miss(self):
+        cache = self._cache()
+        request = ScrapeRequest("https://example.com/feed", {"page": 1})
+        self.assertIsNone(cache.get(request))
+
+        cache.put(request, {"value": 1})
+        same_request = ScrapeRequest("https://example.com/feed?page=1", {})
+        self.assertEqual(cache.get(same_request), {"value": 1})
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_entries_expire_after_ttl(self):
+        cache = self._cache(ttl=60, endpoint_ttls={"example.com/live": 5})
+        feed = ScrapeRequest("https://example.com/feed", {})
+        live = ScrapeRequest("https://example.com/live/now", {})
+        cache.put(feed, {"value": 1})
+        cache.put(live, {"value": 2})
+
+        self.clock.now += 10
+        self.assertEqual(cache.get(feed), {"value": 1})
+        self.assertIsNone(cache.get(live))
+
+        self.clock.now += 60
+        self.assertIsNone(cache.get(feed))
+        self.assertEqual(len(cache), 0)
+
+    def test_closed_windows_never_expire(self):
+        cache = self._cache(ttl=60)
+        past = DatedRequest(
+            "https://example.com/feed", {}, datetime(2020, 1, 1), datetime(2020, 1, 2)
+        )
+        today = DatedRequest(
+            "https://example.com/feed",
+            {},
+            datetime.now() - timedelta(hours=1),
+            datetime.now(),
+        )
+        self.assertIsNone(cache.ttl_for(past))
+        self.assertEqual(cache.ttl_for(today), 60)
+
+        cache.put(past, {"value": 1})
+        self.clock.now += 10**9
+        self.assertEqual(cache.get(past), {"value": 1})
+
+    def test_least_recently_used_entries_are_evicted(self):
+        requests = [ScrapeRequest(f"https://example.com/{i}", {}) for i in range(3)]
+        cache = self._cache()
+        cache.put(requests[0], {"value": "x" * 100})
+        entry_size = cache.total_bytes
+
+        cache = self._cache(max_bytes=entry_size * 2 + entry_size // 2)
+        cache.put(requests[1], {"value": "x" * 100})
+        cache.get(requests[0])
+        cache.put(requests[2], {"value": "x" * 100})
+
+        self.assertIsNotNone(cache.get(requests[0]))
+        self.assertIsNone(cache.get(requests[1]))
+        self.assertIsNotNone(cache.get(requests[2]))
+        self.assertLessEqual(cache.total_bytes, cache.max_bytes)
+
+    def test_entries_survive_between_instances(self):
+        request = ScrapeRequest("https://example.com/feed", {})
+        self._cache().put(request, {"value": 1})
+
+        cache = self._cache()
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.get(request), {"value": 1})
+
+    def test_caches_sharing_a_folder_write_the_same_entry(self):
+        request = ScrapeRequest("https://example.com/feed", {})
+        caches = [self._cache(), self._cache()]
+
+        def put_many(cache: ResponseCache) -> None:
+            for value in range(200):
+                cache.put(request, {"value": value})
+
+        # Like the shards of a run, every one with its own cache over the same folder
+        with ThreadPoolExecutor(len(caches)) as executor:
+            list(executor.map(put_many, caches))
+
+        cache = self._cache()
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.get(request), {"value": 199})
+
+    def test_requests_can_bypass_the_cache(self):
+        cache = self._cache()
+        request = ScrapeRequest("https://example.com/feed", {}, cacheable=False)
+        cache.put(request, {"value": 1})
+        self.assertIsNone(cache.get(request))
+        self.assertEqual(len(cache), 0)
+
+    def test_second_run_is_served_from_the_cache(self):
+        def run() -> CountingScraper:
+            scraper = CountingScraper(
+                ListRequestGenerator(4),
+                DictDataFactory(),
+                ListDataStore(),
+                ScraperConfig(0, 0, response_cache=self._cache()),
+            )
+            run_async(scraper.scrape())
+            return scraper
+
+        first_run = run()
+        second_run = run()
+
+        self.assertEqual(len(first_run.fetched), 4)
+        self.assertEqual(second_run.fetched, [])
+        self.assertEqual(len(second_run.data_store.saved), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
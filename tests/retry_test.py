@@ -0,0 +1,168 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+import json
+import os
+import tempfile
+from typing import Any, Dict
+import unittest
+
+from entities.scrape_request.scrape_request import ScrapeRequest
+from use_cases.scraper.fetch_error import FetchError
+from use_cases.scraper.retry.dead_letter_file import DeadLetterFile
+from use_cases.scraper.retry.retry_policy import RetryPolicy
+from use_cases.scraper.retry.retry_queue import RetryQueue
+from use_cases.scraper.scraper import Scraper
+from use_cases.scraper.scraper_config import ScraperConfig
+from tests.mocks.run_async import run_async
+from tests.mocks.scraper_mocks import (
+    DictDataFactory,
+    ListDataStore,
+    ListRequestGenerator,
+)
+
+
+class FlakyScraper(Scraper):
+    """
+    Scraper whose requests fail a number of times before succeeding
+    """
+
+    def __init__(self, failures: Dict[str, int], error_kind: str, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.failures = failures
+        self.error_kind = error_kind
+        self.attempts: Dict[str, int] = {}
+
+    async def fetch(self, request: ScrapeRequest) -> Dict[str, Any] | None:
+        self.attempts[request.url] = self.attempts.get(request.url, 0) + 1
+        if self.attempts[request.url] <= self.failures.get(request.url, 0):
+            raise FetchError(self.error_kind)
+        return {"url": request.url}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_exponential_delay(self):
+        policy = RetryPolicy(base_delay=1, max_delay=5, jitter=0)
+        error = FetchError(FetchError.SERVER)
+        delays = [policy.delay(error, attempt) for attempt in range(1, 6)]
+        self.assertEqual(delays, [1, 2, 4, 5, 5])
+
+    def test_jitter_shortens_the_delay(self):
+        policy = RetryPolicy(base_delay=4, jitter=0.5, random_source=lambda: 1.0)
+        self.assertEqual(policy.delay(FetchError(FetchError.SERVER), 1), 2)
+
+    def test_retry_after_is_honoured(self):
+        policy = RetryPolicy(base_delay=1, jitter=0)
+        error = FetchError(FetchError.THROTTLED, 429, retry_after=30)
+        self.assertEqual(policy.delay(error, 1), 30)
+
+    def test_classification(self):
+        policy = RetryPolicy(max_attempts=3)
+        self.assertTrue(policy.should_retry(FetchError(FetchError.TIMEOUT), 1))
+        self.assertFalse(policy.should_retry(FetchError(FetchError.CLIENT), 1))
+        self.assertFalse(policy.should_retry(FetchError(FetchError.TIMEOUT), 3))
+
+    def test_error_from_status(self):
+        self.assertEqual(FetchError.from_status(503).kind, FetchError.SERVER)
+        self.assertEqual(FetchError.from_status(429).kind, FetchError.THROTTLED)
+        self.assertEqual(FetchError.from_status(404).kind, FetchError.CLIENT)
+        self.assertEqual(
+            FetchError.from_status(429, {"Retry-After": "7"}).retry_after, 7
+        )
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=60)
+        error = FetchError.from_status(503, {"Retry-After": format_datetime(retry_at)})
+        self.assertAlmostEqual(error.retry_after, 60, delta=2)
+        self.assertEqual(
+            FetchError.from_exception(ConnectionResetError()).kind,
+            FetchError.CONNECTION,
+        )
+
+
+class TestRetryQueue(unittest.TestCase):
+    def test_requests_are_ready_after_their_delay(self):
+        clock = FakeClock()
+        queue = RetryQueue(clock)
+        error = FetchError(FetchError.SERVER)
+        late, early = ScrapeRequest("late", {}), ScrapeRequest("early", {})
+        queue.push(late, 2, 10, error)
+        queue.push(early, 3, 5, error)
+
+        self.assertIsNone(queue.pop_ready())
+        self.assertEqual(queue.ready_in(), 5)
+        clock.now = 10
+        self.assertEqual(queue.pop_ready(), (early, 3))
+        self.assertEqual(queue.pop_ready(), (late, 2))
+        self.assertEqual(len(queue), 0)
+
+
+class TestScraperRetries(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.dead_letter = DeadLetterFile(os.path.join(self.temp_dir.name, "dead.jsonl"))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _scraper(self, failures, error_kind=FetchError.SERVER, max_attempts=3):
+        config = ScraperConfig(
+            0,
+            0,
+            workers=2,
+            retry_policy=RetryPolicy(max_attempts=max_attempts, base_delay=0.001),
+            dead_letter=self.dead_letter,
+        )
+        return FlakyScraper(
+            failures,
+            error_kind,
+            ListRequestGenerator(4),
+            DictDataFactory(),
+            ListDataStore(),
+            config,
+        )
+
+    def test_failed_requests_are_retried(self):
+        scraper = self._scraper({"https://example.com/1": 2, "https://example.com/3": 1})
+        run_async(scraper.scrape())
+
+        self.assertEqual(len(scraper.data_store.saved), 4)
+        self.assertEqual(scraper.attempts["https://example.com/1"], 3)
+        self.assertEqual(self.dead_letter.written, 0)
+
+    def test_exhausted_requests_go_to_dead_letter(self):
+        scraper = self._scraper({"https://example.com/2": 10})
+        run_async(scraper.scrape())
+
+        self.assertEqual(len(scraper.data_store.saved), 3)
+        self.assertEqual(scraper.attempts["https://example.com/2"], 3)
+        with open(self.dead_letter.path, encoding="utf-8") as file:
+            records = [json.loads(line) for line in file]
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["url"], "https://example.com/2")
+        self.assertEqual(records[0]["attempts"], 3)
+        self.assertEqual(records[0]["error"], FetchError.SERVER)
+
+    def test_client_errors_are_not_retried(self):
+        scraper = self._scraper({"https://example.com/0": 1}, FetchError.CLIENT)
+        run_async(scraper.scrape())
+
+        self.assertEqual(scraper.attempts["https://example.com/0"], 1)
+        self.assertEqual(self.dead_letter.written, 1)
+
+    def test_without_policy_failures_are_dropped(self):
+        scraper = self._scraper({"https://example.com/0": 1})
+        scraper.config.retry_policy = None
+        run_async(scraper.scrape())
+
+        self.assertEqual(len(scraper.data_store.saved), 3)
+        self.assertEqual(scraper.attempts["https://example.com/0"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+from aiohttp import web
+
+from data.queued.queued_store import QueuedDataStore
+from entities.scrape_request.scrape_request import ScrapeRequest
+from entities.scraped_data.scraped_data import ScrapedData
+from use_cases.scraper.metrics.scrape_metrics import ScrapeMetrics
+from use_cases.scraper.regular.regular_scraper import RegularScraper
+from use_cases.scraper.retry.retry_policy import RetryPolicy
+from use_cases.scraper.scraper_config import ScraperConfig
+from tests.mocks.local_server import LocalServer
+from tests.mocks.run_async import run_async
+from tests.mocks.scraper_mocks import (
+    DictDataFactory,
+    ListDataStore,
+    ListRequestGenerator,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def flaky_handler(request: web.Request) -> web.Response:
+    # The first request of /1 fails, every other one works
+    if request.path == "/1" and not getattr(flaky_handler, "failed", False):
+        flaky_handler.failed = True
+        return web.json_response({"error": "boom"}, status=500)
+    return web.json_response({"path": request.path, "padding": "x" * 100})
+
+
+async def slow_handler(request: web.Request) -> web.Response:
+    await asyncio.sleep(0.02)
+    return web.json_response({"path": request.path})
+
+
+class BlockedDataStore(ListDataStore):
+    """
+    Store that doesn't write until it's released, so the records pile up in a queue
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.released = threading.Event()
+
+    def save(self, data: ScrapedData, request: ScrapeRequest) -> None:
+        self.released.wait(timeout=5)
+        super().save(data, request)
+
+
+class TestScrapeMetrics(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "scraps.prom")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_prometheus_text(self):
+        metrics = ScrapeMetrics()
+        metrics.observe_response("https://api.nasa.gov/neo", 200, 0.3)
+        metrics.observe_response(
+            "https://api.nasa.gov/neo", None, proxy="socks5://tor:9050"
+        )
+        text = metrics.render()
+
+        self.assertIn("# TYPE scraps_responses_total counter", text)
+        self.assertIn(
+            'scraps_responses_total{host="api.nasa.gov",proxy="",status="200"} 1', text
+        )
+        self.assertIn(
+            'scraps_responses_total{host="api.nasa.gov",proxy="socks5://tor:9050",status="error"} 1',
+            text,
+        )
+        # Buckets are cumulative
+        self.assertIn(
+            'scraps_request_seconds_bucket{host="api.nasa.gov",proxy="",le="0.25"} 0', text
+        )
+        self.assertIn(
+            'scraps_request_seconds_bucket{host="api.nasa.gov",proxy="",le="0.5"} 1', text
+        )
+        self.assertIn(
+            'scraps_request_seconds_bucket{host="api.nasa.gov",proxy="",le="+Inf"} 1', text
+        )
+        self.assertIn('scraps_request_seconds_count{host="api.nasa.gov",proxy=""} 1', text)
+
+    def test_label_values_are_escaped(self):
+        metrics = ScrapeMetrics()
+        metrics.store_writes.observe(0.001, store='a "quoted"\\store')
+        self.assertIn('store="a \\"quoted\\"\\\\store"', metrics.render())
+
+    def test_eta_from_the_pace_so_far(self):
+        clock = FakeClock()
+        metrics = ScrapeMetrics(clock=clock)
+        metrics.progress(10)
+        self.assertIsNone(metrics.eta.value())
+
+        clock.now = 20.0
+        for _ in range(4):
+            metrics.completed.inc()
+        metrics.progress(6)
+        self.assertEqual(metrics.remaining.value(), 6)
+        self.assertEqual(metrics.eta.value(), 30.0)
+
+    def test_report_writes_the_file_and_calls_back(self):
+        reports = []
+        metrics = ScrapeMetrics(self.path, on_report=reports.append)
+        metrics.completed.inc()
+        metrics.report()
+
+        with open(self.path, "r", encoding="utf-8") as file:
+            self.assertIn("scraps_requests_completed_total 1", file.read())
+        self.assertEqual(reports, [metrics])
+
+    def test_scraper_metrics(self):
+        flaky_handler.failed = False
+        metrics = ScrapeMetrics(self.path)
+
+        async def scenario():
+            server = await LocalServer(flaky_handler).start()
+            try:
+                scraper = RegularScraper(
+                    ListRequestGenerator(3, base_url=server.url),
+                    DictDataFactory(),
+                    ListDataStore(),
+                    ScraperConfig(
+                        0,
+                        0,
+                        retry_policy=RetryPolicy(base_delay=0, jitter=0),
+                        metrics=metrics,
+                    ),
+                )
+                await scraper.scrape()
+            finally:
+                await server.stop()
+            return server
+
+        server = run_async(scenario())
+        host = server.url.split("//")[1]
+
+        self.assertEqual(metrics.responses.value(host=host, status="200"), 3)
+        self.assertEqual(metrics.responses.value(host=host, status="500"), 1)
+        self.assertEqual(metrics.retries.value(host=host, kind="server"), 1)
+        self.assertEqual(metrics.completed.total(), 3)
+        self.assertEqual(metrics.store_writes.count(store="ListDataStore"), 3)
+        self.assertGreater(metrics.bytes_received.value(host=host), 300)
+        self.assertGreater(metrics.bytes_sent.value(host=host), 0)
+        # A last report is written when the scraper is done
+        self.assertTrue(os.path.exists(self.path))
+
+    def test_store_queue_depth(self):
+        store = BlockedDataStore()
+        depths = []
+
+        def on_report(metrics: ScrapeMetrics) -> None:
+            depths.append(metrics.store_queue.value())
+            if metrics.store_queue.value():
+                store.released.set()
+
+        metrics = ScrapeMetrics(interval=0.01, on_report=on_report)
+
+        async def scenario():
+            server = await LocalServer(slow_handler).start()
+            try:
+                scraper = RegularScraper(
+                    ListRequestGenerator(5, base_url=server.url),
+                    DictDataFactory(),
+                    QueuedDataStore(store),
+                    ScraperConfig(0, 0, metrics=metrics),
+                )
+                await scraper.scrape()
+            finally:
+                await server.stop()
+
+        run_async(scenario())
+
+        self.assertGreater(max(depths), 0)
+        # The last report comes once the queue is written
+        self.assertEqual(depths[-1], 0)
+        self.assertEqual(len(store.saved), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
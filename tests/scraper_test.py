@@ -0,0 +1,106 @@
+import asyncio
+import time
+from typing import Any, Dict
+import unittest
+
+from entities.scrape_request.scrape_request import ScrapeRequest
+from use_cases.scraper.rate_limit.rate_limiter import RateLimiter
+from use_cases.scraper.scraper import Scraper
+from use_cases.scraper.scraper_config import ScraperConfig
+from tests.mocks.run_async import run_async
+from tests.mocks.scraper_mocks import (
+    DictDataFactory,
+    ListDataStore,
+    ListRequestGenerator,
+)
+
+
+class SlowScraper(Scraper):
+    """
+    Scraper that takes a while to answer, and keeps track of how many fetches overlap
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def fetch(self, request: ScrapeRequest) -> Dict[str, Any] | None:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return {"url": request.url}
+
+
+class TestScraper(unittest.TestCase):
+    def _scraper(self, num_requests: int, workers: int) -> SlowScraper:
+        return SlowScraper(
+            ListRequestGenerator(num_requests),
+            DictDataFactory(),
+            ListDataStore(),
+            ScraperConfig(0, 0, workers=workers),
+        )
+
+    def test_single_worker_is_sequential(self):
+        scraper = self._scraper(num_requests=5, workers=1)
+        run_async(scraper.scrape())
+
+        self.assertEqual(scraper.max_in_flight, 1)
+        saved = [request.url for request in scraper.data_store.saved]
+        expected = [request.url for request in scraper.request_generator.requests]
+        self.assertEqual(saved, expected)
+
+    def test_workers_keep_requests_in_flight(self):
+        scraper = self._scraper(num_requests=20, workers=4)
+        run_async(scraper.scrape())
+
+        self.assertEqual(scraper.max_in_flight, 4)
+        self.assertEqual(len(scraper.data_store.saved), 20)
+        self.assertEqual(len(set(scraper.data_store.saved)), 20)
+
+    def test_stop_ends_all_workers(self):
+        scraper = self._scraper(num_requests=20, workers=4)
+        original_fetch = scraper.fetch
+
+        async def fetch_and_stop(request: ScrapeRequest):
+            scraper.stop = True
+            return await original_fetch(request)
+
+        scraper.fetch = fetch_and_stop
+        run_async(scraper.scrape())
+
+        # Only the requests already being fetched when stop was set get saved
+        self.assertEqual(len(scraper.data_store.saved), 1)
+
+    def test_rate_limiter_paces_concurrent_workers(self):
+        scraper = SlowScraper(
+            ListRequestGenerator(5),
+            DictDataFactory(),
+            ListDataStore(),
+            ScraperConfig(10, 10, workers=4, rate_limiter=RateLimiter(rate=50)),
+        )
+        started_at = time.perf_counter()
+        run_async(scraper.scrape())
+        elapsed = time.perf_counter() - started_at
+
+        # 5 requests at 50 per second take at least 4 * 0.02 seconds,
+        # and the 10 seconds random pauses are not used
+        self.assertEqual(len(scraper.data_store.saved), 5)
+        self.assertGreaterEqual(elapsed, 0.08)
+        self.assertLess(elapsed, 1)
+
+    def test_invalid_workers(self):
+        with self.assertRaises(ValueError):
+            ScraperConfig(0, 0, workers=0)
+
+    def test_stream_mode_needs_a_scraper_that_streams(self):
+        config = ScraperConfig(0, 0, stream_mode=ScraperConfig.STREAM_RAW)
+        with self.assertRaises(ValueError):
+            SlowScraper(
+                ListRequestGenerator(1), DictDataFactory(), ListDataStore(), config
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
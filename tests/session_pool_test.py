@@ -0,0 +1,77 @@
+import unittest
+import aiohttp
+
+from use_cases.scraper.session_pool import SessionPool
+from tests.mocks.run_async import run_async
+
+
+class TestSessionPool(unittest.TestCase):
+    def setUp(self):
+        self.connectors_created = []
+        self.pool = SessionPool(self._create_connector)
+
+    def _create_connector(self, key: str) -> aiohttp.BaseConnector:
+        self.connectors_created.append(key)
+        return aiohttp.TCPConnector()
+
+    def test_sessions_are_created_lazily_and_reused(self):
+        async def scenario():
+            self.assertEqual(len(self.pool), 0)
+            first = self.pool.get("proxy-a")
+            second = self.pool.get("proxy-a")
+            other = self.pool.get("proxy-b")
+            await self.pool.close()
+            return first, second, other
+
+        first, second, other = run_async(scenario())
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+        self.assertEqual(self.connectors_created, ["proxy-a", "proxy-b"])
+
+    def test_discarded_session_is_rebuilt(self):
+        async def scenario():
+            first = self.pool.get("proxy-a")
+            await self.pool.discard("proxy-a")
+            rebuilt = self.pool.get("proxy-a")
+            await self.pool.close()
+            return first, rebuilt
+
+        first, rebuilt = run_async(scenario())
+        self.assertTrue(first.closed)
+        self.assertIsNot(first, rebuilt)
+        self.assertEqual(self.connectors_created, ["proxy-a", "proxy-a"])
+
+    def test_discarded_session_waits_for_its_requests(self):
+        async def scenario():
+            async with self.pool.using("proxy-a") as first:
+                async with self.pool.using("proxy-a") as second:
+                    await self.pool.discard("proxy-a")
+                    rebuilt = self.pool.get("proxy-a")
+                    closed_while_in_use = first.closed
+                closed_after_one = first.closed
+            closed_after_all = first.closed
+            await self.pool.close()
+            return first, second, rebuilt, (
+                closed_while_in_use,
+                closed_after_one,
+                closed_after_all,
+            )
+
+        first, second, rebuilt, closed = run_async(scenario())
+        self.assertIs(first, second)
+        self.assertIsNot(first, rebuilt)
+        self.assertEqual(closed, (False, False, True))
+
+    def test_close_closes_every_session(self):
+        async def scenario():
+            sessions = [self.pool.get("proxy-a"), self.pool.get("proxy-b")]
+            await self.pool.close()
+            return sessions
+
+        sessions = run_async(scenario())
+        self.assertTrue(all(session.closed for session in sessions))
+        self.assertEqual(len(self.pool), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
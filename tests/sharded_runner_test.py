@@ -0,0 +1,290 @@
+import asyncio
+import csv
+import gzip
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+import unittest
+from unittest import mock
+
+from data.checkpoint.checkpoint import Checkpoint
+from data.csv.csv_store import CSVStore
+from data.dedup.dedup_store import DedupDataStore
+from data.jsonl.jsonl_store import JSONLStore
+from entities.scrape_request.dated_request import DatedRequest
+from entities.scrape_request.scrape_request import ScrapeRequest
+from entities.scraped_data.scraped_data import ScrapedData
+from use_cases.request_generator.historical.historical_config import HistoricalConfig
+from use_cases.request_generator.historical.historical_request_generator import (
+    HistoricalRequestGenerator,
+)
+from use_cases.request_generator.historical.window_plan import WindowPlan
+from use_cases.scraper.rate_limit.shared_rate_limiter import SharedRateLimiter
+from use_cases.scraper.scraper import Scraper
+from use_cases.scraper.scraper_config import ScraperConfig
+from use_cases.scraper.sharded.shard import Shard, ShardProgress
+from use_cases.scraper.sharded import shard_merger
+from use_cases.scraper.sharded.shard_merger import merge_shards
+from use_cases.scraper.sharded.sharded_runner import ShardedRunner
+from tests.mocks.scraper_mocks import DictDataFactory
+
+START_DATE = datetime(2024, 1, 1)
+END_DATE = datetime(2024, 1, 13)
+
+
+class WindowScraper(Scraper):
+    def __init__(
+        self, crash_after: int | None, stop_after: int | None, *args, **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        self.crash_after = crash_after
+        self.stop_after = stop_after
+        self.fetched = 0
+
+    async def fetch(self, request: DatedRequest) -> Dict[str, Any] | None:
+        if self.fetched == self.crash_after:
+            raise RuntimeError("crash")
+        self.fetched += 1
+        if self.fetched == self.stop_after:
+            # Like a blocked TorScraper, it stops with windows left
+            self.stop = True
+        start = request.start_date.date()
+        # Windows next to each other share an id, like the boundary dates of inclusive ranges
+        return {"start": start.isoformat(), "id": start.day // 2}
+
+
+class ShardScraperBuilder:
+    """
+    Creates the scraper of every shard in the worker processes
+    """
+
+    def __init__(
+        self,
+        multiple_files: bool = False,
+        crash_shard: int | None = None,
+        stop_shard: int | None = None,
+        dedup: bool = False,
+    ):
+        self.multiple_files = multiple_files
+        self.crash_shard = crash_shard
+        self.stop_shard = stop_shard
+        self.dedup = dedup
+
+    def __call__(self, shard: Shard) -> Scraper:
+        config = HistoricalConfig(
+            START_DATE, END_DATE, timedelta(days=1), go_back_in_time=False
+        )
+        generator = HistoricalRequestGenerator(
+            config, ScrapeRequest("https://example.com/feed", {}), plan=shard.plan
+        )
+        store = CSVStore(multiple_files=self.multiple_files, root=shard.root)
+        return WindowScraper(
+            2 if shard.index == self.crash_shard else None,
+            2 if shard.index == self.stop_shard else None,
+            generator,
+            DictDataFactory(),
+            DedupDataStore(store, "id") if self.dedup else store,
+            ScraperConfig(
+                0,
+                0,
+                rate_limiter=shard.rate_limiter,
+                checkpoint=Checkpoint(shard.checkpoint_path),
+            ),
+        )
+
+
+def take_tokens(rate_limiter: SharedRateLimiter, tokens: int) -> None:
+    async def take():
+        for _ in range(tokens):
+            await rate_limiter.acquire("https://example.com")
+
+    asyncio.run(take())
+
+
+class TestShardedRunner(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        self.folder = os.path.join(self.root, "example.com")
+        self.progress: List[ShardProgress] = []
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _runner(self, builder: ShardScraperBuilder, **kwargs) -> ShardedRunner:
+        plan = WindowPlan(START_DATE, END_DATE, timedelta(days=1), False)
+        return ShardedRunner(
+            plan,
+            builder,
+            3,
+            root=self.root,
+            on_progress=self.progress.append,
+            progress_interval=0.05,
+            **kwargs,
+        )
+
+    def _rows(self, filename: str) -> List[Dict[str, str]]:
+        with open(os.path.join(self.folder, filename), newline="") as file:
+            return list(csv.DictReader(file))
+
+    def test_shards_are_merged_in_window_order(self):
+        self.assertTrue(self._runner(ShardScraperBuilder(), rate=1000).run())
+
+        starts = [row["start"] for row in self._rows("example.com_feed.csv")]
+        expected = [
+            (START_DATE + timedelta(days=day)).date().isoformat() for day in range(12)
+        ]
+        self.assertEqual(starts, expected)
+        self.assertFalse(os.path.exists(os.path.join(self.root, ".shards")))
+
+        last = {progress.index: progress for progress in self.progress}
+        self.assertEqual(len(last), 3)
+        for progress in last.values():
+            self.assertEqual(progress.status, ShardProgress.DONE)
+            self.assertEqual(progress.completed, progress.total)
+
+    def test_numbered_files_are_renumbered(self):
+        self.assertTrue(self._runner(ShardScraperBuilder(multiple_files=True)).run())
+
+        for day in range(12):
+            rows = self._rows(f"{day}_example.com_feed.csv")
+            expected = (START_DATE + timedelta(days=day)).date().isoformat()
+            self.assertEqual([row["start"] for row in rows], [expected])
+
+    def test_crashed_shard_is_resumed(self):
+        runner = self._runner(ShardScraperBuilder(crash_shard=1))
+        self.assertFalse(runner.run())
+        self.assertEqual(runner.failed, [1])
+        self.assertFalse(os.path.exists(self.folder))
+
+        runner = self._runner(ShardScraperBuilder())
+        self.assertTrue(runner.run())
+        starts = [row["start"] for row in self._rows("example.com_feed.csv")]
+        self.assertEqual(len(starts), 12)
+        self.assertEqual(starts, sorted(starts))
+
+    def test_stopped_shard_is_not_done(self):
+        runner = self._runner(ShardScraperBuilder(stop_shard=1))
+        self.assertFalse(runner.run())
+        self.assertEqual(runner.failed, [1])
+        self.assertEqual(self.progress[-1].status, ShardProgress.FAILED)
+        self.assertFalse(os.path.exists(self.folder))
+
+        runner = self._runner(ShardScraperBuilder())
+        self.assertTrue(runner.run())
+        starts = [row["start"] for row in self._rows("example.com_feed.csv")]
+        self.assertEqual(len(starts), 12)
+        self.assertEqual(starts, sorted(starts))
+
+    def test_duplicates_between_shards_are_dropped(self):
+        runner = self._runner(ShardScraperBuilder(dedup=True), dedup_fields="id")
+        self.assertTrue(runner.run())
+
+        rows = self._rows("example.com_feed.csv")
+        self.assertEqual([row["id"] for row in rows], [str(day) for day in range(7)])
+        # The first record of every id is kept, shard 1 starts with the id shard 0 ended with
+        self.assertEqual(
+            [row["start"] for row in rows],
+            [f"2024-01-{day:02}" for day in [1, 2, 4, 6, 8, 10, 12]],
+        )
+
+    def test_jsonl_duplicates_are_dropped_when_merged(self):
+        request = ScrapeRequest("https://example.com/feed", {})
+        shard_roots = [os.path.join(self.root, f"shard-{index}") for index in range(2)]
+        for shard_root, ids in zip(shard_roots, [[1, 2], [2, 3]]):
+            store = JSONLStore(compression="gzip", root=shard_root)
+            for record_id in ids:
+                store.save(ScrapedData({"id": record_id}), request)
+            store.close()
+
+        merge_shards(shard_roots, self.root, os.path.join(self.root, "merge"), "id")
+
+        ids = []
+        for filename in sorted(os.listdir(self.folder)):
+            with gzip.open(os.path.join(self.folder, filename)) as file:
+                ids += [json.loads(line)["data"]["id"] for line in file]
+        self.assertEqual(ids, [1, 2, 3])
+
+    def test_csv_shards_with_different_columns(self):
+        shard_roots = self._csv_shards([[{"id": 1, "a": "x"}], [{"id": 2, "b": "y"}]])
+        merge_shards(shard_roots, self.root, os.path.join(self.root, "merge"))
+
+        self.assertEqual(
+            self._rows("example.com_feed.csv"),
+            [{"id": "1", "a": "x", "b": ""}, {"id": "2", "a": "", "b": "y"}],
+        )
+
+    def test_stopped_merge_is_finished_by_the_next_one(self):
+        records = [[{"id": 1}, {"id": 2}], [{"id": 2}, {"id": 3}]]
+        staging = os.path.join(self.root, "merge")
+        real_append = shard_merger._append
+        real_replace = os.replace
+
+        def append(*args):
+            if append.calls == 2:
+                raise OSError("stopped while staging")
+            append.calls += 1
+            real_append(*args)
+
+        def replace(source, target):
+            if source.startswith(staging) and replace.calls == 1:
+                raise OSError("stopped while moving the files")
+            replace.calls += source.startswith(staging)
+            real_replace(source, target)
+
+        append.calls = replace.calls = 0
+        shard_roots = self._csv_shards(records, multiple_files=True)
+        with mock.patch.object(shard_merger, "_append", append):
+            with self.assertRaises(OSError):
+                merge_shards(shard_roots, self.root, staging, "id")
+        with mock.patch.object(shard_merger.os, "replace", replace):
+            with self.assertRaises(OSError):
+                merge_shards(shard_roots, self.root, staging, "id")
+        merge_shards(shard_roots, self.root, staging, "id")
+
+        filenames = sorted(os.listdir(self.folder), key=lambda name: int(name[0]))
+        ids = [row["id"] for filename in filenames for row in self._rows(filename)]
+        self.assertEqual(ids, ["1", "2", "3"])
+
+    def _csv_shards(
+        self, records: List[List[Dict[str, Any]]], multiple_files: bool = False
+    ) -> List[str]:
+        """
+        A folder per shard with its records, every record is saved from its own request
+        """
+        shard_roots = []
+        for index, shard_records in enumerate(records):
+            shard_root = os.path.join(self.root, f"shard-{index}")
+            with CSVStore(multiple_files=multiple_files, root=shard_root) as store:
+                for page, record in enumerate(shard_records):
+                    request = ScrapeRequest("https://example.com/feed", {"page": page})
+                    store.save(ScrapedData(record), request)
+            shard_roots.append(shard_root)
+        return shard_roots
+
+
+class TestSharedRateLimiter(unittest.TestCase):
+    def test_budget_is_shared_between_processes(self):
+        rate_limiter = SharedRateLimiter(40, burst=1)
+        context = multiprocessing.get_context()
+        processes = [
+            context.Process(target=take_tokens, args=(rate_limiter, 10))
+            for _ in range(2)
+        ]
+        started_at = time.monotonic()
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        self.assertEqual([process.exitcode for process in processes], [0, 0])
+        # 20 requests with a burst of 1 at 40 per second
+        self.assertGreaterEqual(time.monotonic() - started_at, 19 / 40)
+
+
+if __name__ == "__main__":
+    unittest.main()
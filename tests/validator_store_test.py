@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+from aiohttp import web
+
+from entities.scrape_request.scrape_request import ScrapeRequest
+from use_cases.scraper.cache.validator_store import ValidatorStore
+from use_cases.scraper.fetch_error import FetchError
+from use_cases.scraper.regular.regular_scraper import RegularScraper
+from use_cases.scraper.scraper_config import ScraperConfig
+from tests.mocks.local_server import LocalServer
+from tests.mocks.run_async import run_async
+from tests.mocks.scraper_mocks import (
+    DictDataFactory,
+    ListDataStore,
+    ListRequestGenerator,
+)
+
+ETAG = '"v1"'
+LAST_MODIFIED = "Mon, 01 Jan 2024 00:00:00 GMT"
+
+
+async def conditional_handler(request: web.Request) -> web.Response:
+    if request.headers.get("If-None-Match") == ETAG:
+        return web.Response(status=304)
+    return web.json_response(
+        {"path": request.path},
+        headers={"ETag": ETAG, "Last-Modified": LAST_MODIFIED},
+    )
+
+
+class TestValidatorStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "validators.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_validators_are_used_once_confirmed(self):
+        validators = ValidatorStore(self.path)
+        request = ScrapeRequest("https://example.com/feed", {"page": 1})
+        validators.stage(request, {"ETag": ETAG, "Last-Modified": LAST_MODIFIED})
+        self.assertEqual(validators.headers_for(request), {})
+
+        validators.confirm(request)
+        validators.save()
+        headers = ValidatorStore(self.path).headers_for(request)
+        self.assertEqual(
+            headers, {"If-None-Match": ETAG, "If-Modified-Since": LAST_MODIFIED}
+        )
+
+    def test_not_cacheable_requests_are_not_conditional(self):
+        validators = ValidatorStore(self.path)
+        request = ScrapeRequest("https://example.com/feed", {}, cacheable=False)
+        validators.stage(request, {"ETag": ETAG})
+        validators.confirm(request)
+        self.assertEqual(validators.headers_for(request), {})
+
+    def test_not_modified_skips_the_store(self):
+        async def scenario():
+            server = await LocalServer(conditional_handler).start()
+            stores = []
+            try:
+                for _ in range(2):
+                    generator = ListRequestGenerator(3, base_url=server.url)
+                    store = ListDataStore()
+                    scraper = RegularScraper(
+                        generator,
+                        DictDataFactory(),
+                        store,
+                        ScraperConfig(0, 0, validators=ValidatorStore(self.path)),
+                    )
+                    await scraper.scrape()
+                    stores.append(store)
+            finally:
+                await server.stop()
+            return stores, server
+
+        stores, server = run_async(scenario())
+        self.assertEqual(len(stores[0].saved), 3)
+        self.assertEqual(stores[1].saved, [])
+        self.assertEqual(len(server.requests), 6)
+        self.assertEqual(server.requests[-1].headers["If-None-Match"], ETAG)
+
+    def test_304_is_not_modified(self):
+        self.assertEqual(FetchError.from_status(304).kind, FetchError.NOT_MODIFIED)
+
+
+if __name__ == "__main__":
+    unittest.main()
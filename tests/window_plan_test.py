@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta
+import importlib.util
+from typing import List, Tuple
+import unittest
+
+from use_cases.request_generator.historical.window_plan import WindowPlan
+
+
+def stepped_windows(
+    start_date: datetime, end_date: datetime, interval: timedelta, back: bool
+) -> List[Tuple[datetime, datetime]]:
+    """
+    Windows built one step at a time, to compare the plan against
+    """
+    windows = []
+    if back:
+        end = end_date
+        while end - interval >= start_date:
+            windows.append((end - interval, end))
+            end -= interval
+        if end > start_date:
+            windows.append((start_date, end))
+    else:
+        start = start_date
+        while start + interval <= end_date:
+            windows.append((start, start + interval))
+            start += interval
+        if start < end_date:
+            windows.append((start, end_date))
+    return windows
+
+
+class TestWindowPlan(unittest.TestCase):
+    def setUp(self):
+        self.start_date = datetime(2024, 1, 1)
+
+    def test_windows_match_stepping(self):
+        cases = [
+            (timedelta(days=6), timedelta(days=1)),
+            (timedelta(days=6, hours=1), timedelta(days=1)),
+            (timedelta(hours=5), timedelta(days=1)),
+            (timedelta(days=30), timedelta(days=7)),
+            (timedelta(0), timedelta(days=1)),
+        ]
+        for span, interval in cases:
+            for back in (False, True):
+                end_date = self.start_date + span
+                plan = WindowPlan(self.start_date, end_date, interval, back)
+                expected = stepped_windows(self.start_date, end_date, interval, back)
+                self.assertEqual(list(plan), expected, (span, interval, back))
+                self.assertEqual(len(plan), len(expected))
+                if expected:
+                    self.assertEqual(plan[-1], expected[-1])
+
+    def test_remainder(self):
+        plan = WindowPlan(
+            self.start_date,
+            self.start_date + timedelta(days=6, hours=1),
+            timedelta(days=1),
+            go_back_in_time=False,
+        )
+        self.assertEqual(plan.full_windows, 6)
+        self.assertTrue(plan.has_remainder)
+        self.assertTrue(plan.is_remainder(-1))
+        self.assertFalse(plan.is_remainder(0))
+
+    def test_huge_plans_are_not_built(self):
+        plan = WindowPlan(
+            self.start_date,
+            self.start_date + timedelta(days=365 * 20),
+            timedelta(minutes=1),
+            go_back_in_time=False,
+        )
+        self.assertEqual(len(plan), 365 * 20 * 24 * 60)
+        self.assertEqual(
+            plan[1_000_000],
+            (
+                self.start_date + timedelta(minutes=1_000_000),
+                self.start_date + timedelta(minutes=1_000_001),
+            ),
+        )
+
+    def test_slices_and_shards(self):
+        plan = WindowPlan(
+            self.start_date,
+            self.start_date + timedelta(days=10, hours=12),
+            timedelta(days=1),
+        )
+        self.assertEqual(list(plan[2:5]), list(plan)[2:5])
+        self.assertEqual(list(plan[::3]), list(plan)[::3])
+
+        shards = plan.shards(3)
+        self.assertEqual([len(shard) for shard in shards], [3, 4, 4])
+        self.assertEqual([window for shard in shards for window in shard], list(plan))
+        self.assertTrue(shards[-1].is_remainder(-1))
+
+    @unittest.skipIf(importlib.util.find_spec("numpy") is None, "needs numpy")
+    def test_arrays_match_windows(self):
+        for back in (False, True):
+            plan = WindowPlan(
+                self.start_date,
+                self.start_date + timedelta(days=3, minutes=30),
+                timedelta(hours=7),
+                back,
+            )
+            starts, ends = plan[1:].arrays()
+            windows = [
+                (start.astype(datetime), end.astype(datetime))
+                for start, end in zip(starts, ends)
+            ]
+            self.assertEqual(windows, list(plan)[1:])
+
+
+if __name__ == "__main__":
+    unittest.main()
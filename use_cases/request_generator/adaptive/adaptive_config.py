@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from use_cases.request_generator.historical.historical_config import HistoricalConfig
+from use_cases.scraper.fetch_error import FetchError
+
+
+class AdaptiveConfig(HistoricalConfig):
+    DEFAULT_SPLIT_ON = (FetchError.CLIENT, FetchError.TIMEOUT, FetchError.INVALID)
+
+    def __init__(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        interval: timedelta,
+        min_interval: timedelta = timedelta(days=1),
+        max_interval: timedelta | None = None,
+        max_elements: int | None = None,
+        min_elements: int | None = None,
+        count_key: str | None = "element_count",
+        truncated_key: str | None = None,
+        split_on: Iterable[str] = DEFAULT_SPLIT_ON,
+        grow_factor: float = 2,
+        go_back_in_time: bool = True,
+    ):
+        """
+        [interval] size of the first window, the next ones adapt to the responses
+        [min_interval] windows are never split below it, and split windows are multiples of it
+        [max_interval] windows never grow over it (7 days for the NEO feed), by default [interval]
+        [max_elements] a response counting more elements than this is split in two windows
+        [min_elements] a response counting less elements widens the next window, by default a quarter of [max_elements]
+        [count_key] key of the response with the element count, None to not count elements
+        [truncated_key] key of the response that is true when the server cut the results
+        [split_on] [FetchError] kinds that make the window split, a window too big can be rejected or time out
+        [grow_factor] how much the window grows when the responses are sparse
+        """
+        super().__init__(start_date, end_date, interval, go_back_in_time)
+        if min_interval <= timedelta(0):
+            raise ValueError("AdaptiveConfig needs a positive min_interval")
+        self.min_interval = min_interval
+        self.max_interval = max_interval or interval
+        if self.max_interval < min_interval:
+            raise ValueError("AdaptiveConfig max_interval is smaller than min_interval")
+        self.max_elements = max_elements
+        if min_elements is None and max_elements is not None:
+            min_elements = max_elements // 4
+        self.min_elements = min_elements
+        self.count_key = count_key
+        self.truncated_key = truncated_key
+        self.split_on = tuple(split_on)
+        self.grow_factor = grow_factor
@@ -0,0 +1,179 @@
+from datetime import datetime, timedelta
+import math
+from typing import Any, Callable, Dict, Optional
+
+from decorators.base_class import baseclass
+from entities.scrape_request.dated_request import DatedRequest
+from entities.scrape_request.scrape_request import ScrapeRequest
+from formatters.ymd_formatter import ymd_format_date
+from use_cases.request_generator.adaptive.adaptive_config import AdaptiveConfig
+from use_cases.request_generator.historical.historical_request_generator import (
+    HistoricalRequestGenerator,
+)
+
+
+class AdaptiveRequestGenerator(HistoricalRequestGenerator):
+    """
+    [HistoricalRequestGenerator] whose windows adapt to the responses, to make as few requests
+    as possible while keeping every response within the limits of the API
+
+    A window whose response is too big (more than [max_elements], truncated or rejected)
+    is split in half, recursively down to [min_interval], and the next windows get smaller.
+    When the responses are sparse the next windows grow, up to [max_interval].
+    The windows are clipped to the date range, so there's never a remainder request.
+    """
+
+    def __init__(
+        self,
+        config: AdaptiveConfig,
+        initial_request: ScrapeRequest,
+        start_key: Optional[str] = "from",
+        end_key: Optional[str] = "to",
+        date_formatter: Callable[[datetime], str] = ymd_format_date,
+    ):
+        super().__init__(config, initial_request, start_key, end_key, date_formatter)
+        self.interval = self._clamp(config.interval)
+        self.splits = 0
+        # The windows change size, so they can't come from the [WindowPlan]
+        if config.go_back_in_time:
+            self.current_start_date = config.end_date - self.interval
+            self.current_end_date = config.end_date
+        else:
+            self.current_start_date = config.start_date
+            self.current_end_date = config.start_date + self.interval
+
+    @baseclass
+    def feedback(
+        self,
+        request: DatedRequest,
+        response: Dict[str, Any] | None,
+        error: Exception | None = None,
+    ) -> bool:
+        """
+        Splits the window of the request when its response is too big, or widens the next windows
+        when it's sparse. Returns False when the window was split, the halves are generated next
+        """
+        if self._too_big(response, error):
+            return not self._split(request)
+
+        count = self._count(response)
+        sparse = self.config.min_elements
+        if count is not None and sparse is not None and count < sparse:
+            self.interval = self._clamp(self.interval * self.config.grow_factor)
+        return True
+
+    @baseclass
+    def get_state(self) -> Dict[str, Any]:
+        state = super().get_state()
+        state["current_start_date"] = self.current_start_date.isoformat()
+        state["current_end_date"] = self.current_end_date.isoformat()
+        state["interval"] = self.interval.total_seconds()
+        return state
+
+    @baseclass
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        super().restore_state(state)
+        if not state:
+            return
+        self.current_start_date = datetime.fromisoformat(state["current_start_date"])
+        self.current_end_date = datetime.fromisoformat(state["current_end_date"])
+        self.interval = self._clamp(timedelta(seconds=state["interval"]))
+
+    @baseclass
+    def _continue_generating(self) -> bool:
+        if self.config.go_back_in_time:
+            return self.current_end_date > self.config.start_date
+        else:
+            return self.current_start_date < self.config.end_date
+
+    @property
+    @baseclass
+    def needs_responses(self) -> bool:
+        """
+        The windows are split or widened from the size of the responses
+        """
+        return True
+
+    @property
+    @baseclass
+    def remaining_requests(self) -> int:
+        """
+        The rest of the range at the current [interval], the estimate changes as the windows adapt
+        """
+        if self.config.go_back_in_time:
+            left = self.current_end_date - self.config.start_date
+        else:
+            left = self.config.end_date - self.current_start_date
+        windows = max(0, math.ceil(left / self.interval))
+        return windows + len(self._outstanding) + len(self._pending)
+
+    @baseclass
+    def has_remainder(self) -> bool:
+        return False
+
+    @baseclass
+    def _generate_interval_request(self) -> DatedRequest:
+        """
+        The next window with the current [interval], clipped to the date range
+        """
+        if self.config.go_back_in_time:
+            end_date = self.current_end_date
+            start_date = max(end_date - self.interval, self.config.start_date)
+            self.current_end_date = start_date
+            self.current_start_date = start_date - self.interval
+        else:
+            start_date = self.current_start_date
+            end_date = min(start_date + self.interval, self.config.end_date)
+            self.current_start_date = end_date
+            self.current_end_date = end_date + self.interval
+        return self._create_request(start_date, end_date)
+
+    def _too_big(
+        self, response: Dict[str, Any] | None, error: Exception | None
+    ) -> bool:
+        if error is not None:
+            return getattr(error, "kind", None) in self.config.split_on
+        if response is None:
+            return False
+
+        truncated_key = self.config.truncated_key
+        if truncated_key is not None and response.get(truncated_key):
+            return True
+        count = self._count(response)
+        max_elements = self.config.max_elements
+        return count is not None and max_elements is not None and count > max_elements
+
+    def _count(self, response: Dict[str, Any] | None) -> int | None:
+        if response is None or self.config.count_key is None:
+            return None
+        count = response.get(self.config.count_key)
+        return count if isinstance(count, int) else None
+
+    def _split(self, request: DatedRequest) -> bool:
+        """
+        Replaces the window of the request with its two halves, False if it can't be split
+        """
+        window = request.end_date - request.start_date
+        min_interval = self.config.min_interval
+        if window < 2 * min_interval:
+            return False
+
+        # Halves are multiples of min_interval, so they keep the granularity of the dates
+        half = (window / 2) // min_interval * min_interval
+        middle = request.start_date + half
+        halves = [(request.start_date, middle), (middle, request.end_date)]
+        if self.config.go_back_in_time:
+            halves.reverse()
+        self._pending[0:0] = halves
+
+        self.interval = self._clamp(min(self.interval, half))
+        self.splits += 1
+        return True
+
+    def _clamp(self, interval: timedelta) -> timedelta:
+        """
+        The interval within the window sizes, as a multiple of [min_interval]
+        """
+        min_interval = self.config.min_interval
+        interval = interval // min_interval * min_interval
+        return max(min_interval, min(interval, self.config.max_interval))
@@ -1,9 +1,10 @@
-from datetime import datetime, timedelta
-from typing import Callable, Optional
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from decorators.base_class import baseclass
 from entities.scrape_request.dated_request import DatedRequest
 from entities.scrape_request.scrape_request import ScrapeRequest
 from use_cases.request_generator.historical.historical_config import HistoricalConfig
+from use_cases.request_generator.historical.window_plan import WindowPlan
 from use_cases.request_generator.request_generator import RequestGenerator
 from formatters.ymd_formatter import ymd_format_date
 
@@ -27,21 +28,37 @@ class HistoricalRequestGenerator(RequestGenerator):
         start_key: Optional[str] = "from",
         end_key: Optional[str] = "to",
         date_formatter: Callable[[datetime], str] = ymd_format_date,
+        plan: WindowPlan | None = None,
     ):
+        """
+        [plan] the windows to generate, by default every window of the [HistoricalConfig] range,
+        a part of it (a shard) makes the generator cover only those windows
+        """
         self.config = config
         self.initial_request = initial_request
+        # Shared by every request, they only add their dates to it
+        self._payload_template = initial_request.get_payload()
         self.start_key = start_key
         self.end_key = end_key
         self.date_formatter: Callable[[datetime], str] = date_formatter
         self._requests_made: int = 0
-
-        if config.go_back_in_time:
-            self.current_start_date = config.end_date - config.interval
-            self.current_end_date = config.end_date
-
-        else:
-            self.current_start_date = config.start_date
-            self.current_end_date = config.start_date + config.interval
+        # Windows handed out that the scraper is not done with, in the order they were generated
+        # Only kept when the scraper reports the completed requests
+        self._track_outstanding = False
+        self._outstanding: Dict[Tuple[datetime, datetime], None] = {}
+        # Windows of a previous run to generate again before continuing
+        self._pending: List[Tuple[datetime, datetime]] = []
+
+        # Every window of the range, the generator is a cursor over it
+        if plan is None:
+            plan = WindowPlan(
+                config.start_date,
+                config.end_date,
+                config.interval,
+                config.go_back_in_time,
+            )
+        self.plan = plan
+        self.position = 0
 
     @baseclass
     def working(self) -> bool:
@@ -50,7 +67,7 @@ class HistoricalRequestGenerator(RequestGenerator):
         To gather all the info from [HistoricalConfig] [start_date] and [end_date]
         or not
         """
-        return self._continue_generating() or self.has_remainder()
+        return bool(self._pending) or self._continue_generating() or self.has_remainder()
 
     @baseclass
     def next(self) -> Optional[DatedRequest]:
@@ -60,6 +77,11 @@ class HistoricalRequestGenerator(RequestGenerator):
         if not self.working():
             return None
 
+        if self._pending:
+            self._requests_made += 1
+            start_date, end_date = self._pending.pop(0)
+            return self._create_request(start_date, end_date)
+
         if self._continue_generating():
             self._requests_made += 1
             return self._generate_interval_request()
@@ -72,87 +94,107 @@ class HistoricalRequestGenerator(RequestGenerator):
     def total_requests(self):
         return self._requests_made
 
+    @baseclass
+    def track_completion(self) -> None:
+        self._track_outstanding = True
+
+    @baseclass
+    def completed(self, request: DatedRequest) -> None:
+        self._outstanding.pop((request.start_date, request.end_date), None)
+
+    @baseclass
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Position of the generator, and the windows generated before it that are not done yet
+        Every other window before the position is done, so the state stays small however long the run is
+        """
+        return {
+            "position": self.position,
+            "requests_made": self._requests_made,
+            "outstanding": [
+                [start.isoformat(), end.isoformat()]
+                for start, end in list(self._outstanding) + self._pending
+            ],
+        }
+
+    @baseclass
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        """
+        Jumps to the position of the state, the windows that were not done are generated first
+        """
+        if not state:
+            return
+        self.position = state["position"]
+        self._pending = [
+            (datetime.fromisoformat(start), datetime.fromisoformat(end))
+            for start, end in state.get("outstanding", [])
+        ]
+        self._requests_made = state.get("requests_made", 0) - len(self._pending)
+        self._outstanding = {}
+
+    @property
+    def remaining_windows(self) -> int:
+        """
+        Windows of the plan that were not generated yet
+        """
+        return len(self.plan) - self.position
+
+    @property
+    @baseclass
+    def remaining_requests(self) -> int:
+        """
+        Windows not generated yet, and the ones generated that are not done
+        """
+        return self.remaining_windows + len(self._outstanding) + len(self._pending)
+
+    @property
+    def completed_windows(self) -> int:
+        """
+        Windows of the plan the scraper is done with, only counted when the completion is tracked
+        """
+        return self.position - len(self._outstanding) - len(self._pending)
+
     @baseclass
     def _continue_generating(self) -> bool:
         """
         Whether the generator has generated all the requests with the specified time interval
         """
-        if self.config.go_back_in_time:
-            return self.current_start_date >= self.config.start_date
-        else:
-            return self.current_end_date <= self.config.end_date
+        return self.position < self.plan.full_windows
 
     def has_remainder(self) -> bool:
         """
         Checks if there is a remainder interval left.
         """
-        if self.config.go_back_in_time:
-            remainder = (
-                self.current_start_date - self.config.start_date
-            ) % self.config.interval
-        else:
-            remainder = (
-                self.config.end_date - self.current_end_date
-            ) % self.config.interval
-
-        return remainder > timedelta(0)
+        return self.plan.has_remainder and self.position < len(self.plan)
 
     def _generate_interval_request(self) -> DatedRequest:
         """
         Generates the next request according to the time start, end and time interval config.
         """
-        dated_request = DatedRequest(
-            self.initial_request.url,
-            self.initial_request.get_payload(),
-            self.current_start_date,
-            self.current_end_date,
-            self.start_key,
-            self.end_key,
-            self.date_formatter,
-        )
-
-        # Update state for the next request by adding the interval
-        # If the date  is out of the time range we are requesting
-        # Then _continue_generating() will eval to false and working will terminate
-        # Unless has_remainder() is true in which case one more request will be made
-        if self.config.go_back_in_time:
-            self.current_start_date -= self.config.interval
-            self.current_end_date -= self.config.interval
-        else:
-            self.current_start_date += self.config.interval
-            self.current_end_date += self.config.interval
-
-        return dated_request
+        start_date, end_date = self.plan[self.position]
+        self.position += 1
+        return self._create_request(start_date, end_date)
 
     def _generate_remainder_request(self) -> DatedRequest:
         """
         Generates a request for the remaining time interval.
+        The remainder is the last window of the plan
         """
-        if self.config.go_back_in_time:
-            remainder_start = self.config.start_date
-            remainder_end = (
-                self.current_end_date
-            )  # current_end_date is the start_date of the previous request
-        else:
-            remainder_start = (
-                self.current_start_date
-            )  # current_start_date is the end_date of the previous request
-            remainder_end = self.config.end_date
-
-        # Update the state to values out of the time range the gnerator is making requests,
-        # in order to terminate execution, because remainder request should be the last request
-        if self.config.go_back_in_time:
-            self.current_start_date = self.config.start_date - self.config.interval
-            self.current_end_date = self.current_start_date
-        else:
-            self.current_end_date = self.config.end_date + self.config.interval
-            self.current_start_date = self.current_end_date
+        start_date, end_date = self.plan[-1]
+        self.position = len(self.plan)
+        return self._create_request(start_date, end_date)
 
+    def _create_request(self, start_date: datetime, end_date: datetime) -> DatedRequest:
+        """
+        Creates the request of the window, it's outstanding until the scraper completes it
+        """
+        if self._track_outstanding:
+            self._outstanding[(start_date, end_date)] = None
         return DatedRequest(
             self.initial_request.url,
-            self.initial_request.get_payload(),
-            remainder_start,
-            remainder_end,
+            self._payload_template,
+            start_date,
+            end_date,
             self.start_key,
             self.end_key,
             self.date_formatter,
@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta
+from typing import Iterator, List, Tuple, overload
+
+Window = Tuple[datetime, datetime]
+
+
+class WindowPlan:
+    """
+    Every (start, end) window between [start_date] and [end_date], in the order they are requested
+    Windows are computed from their index, so any window, the amount of windows or a part of the plan
+    are O(1) and nothing is kept in memory, however many windows there are.
+
+    Full windows last [interval], and when the range is not a multiple of it
+    the last window is the remainder, the time left up to the edge of the range.
+    A plan can be sliced, the slice is a plan over part of the same windows.
+    """
+
+    def __init__(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        interval: timedelta,
+        go_back_in_time: bool = True,
+        indexes: range | None = None,
+    ):
+        if interval <= timedelta(0):
+            raise ValueError("WindowPlan needs a positive interval")
+        self.start_date = start_date
+        self.end_date = end_date
+        self.interval = interval
+        self.go_back_in_time = go_back_in_time
+
+        span = end_date - start_date
+        # Windows of the whole plan, a slice only has some of them
+        self._full_windows = max(0, span // interval)
+        remainder = span % interval > timedelta(0)
+        total = self._full_windows + (1 if remainder else 0)
+        self._indexes = range(total) if indexes is None else indexes
+
+        self.has_remainder = remainder and self._full_windows in self._indexes
+        self.full_windows = len(self._indexes) - (1 if self.has_remainder else 0)
+
+    def __len__(self) -> int:
+        return len(self._indexes)
+
+    @overload
+    def __getitem__(self, index: int) -> Window: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "WindowPlan": ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return WindowPlan(
+                self.start_date,
+                self.end_date,
+                self.interval,
+                self.go_back_in_time,
+                self._indexes[index],
+            )
+        return self._window(self._indexes[index])
+
+    def __iter__(self) -> Iterator[Window]:
+        for index in self._indexes:
+            yield self._window(index)
+
+    def bounds(self) -> Window:
+        """
+        Start of the earliest window and end of the latest one
+        """
+        first, last = self[0], self[-1]
+        return min(first[0], last[0]), max(first[1], last[1])
+
+    def is_remainder(self, index: int) -> bool:
+        """
+        Whether the window at the index is the remainder window
+        """
+        return self.has_remainder and self._indexes[index] == self._full_windows
+
+    def shards(self, count: int) -> List["WindowPlan"]:
+        """
+        The plan split in [count] contiguous plans of (almost) the same size
+        """
+        if count < 1:
+            raise ValueError("WindowPlan needs at least one shard")
+        size = len(self)
+        return [
+            self[size * shard // count : size * (shard + 1) // count]
+            for shard in range(count)
+        ]
+
+    def arrays(self):
+        """
+        Starts and ends of every window as numpy datetime64 arrays, computed in bulk
+        For plans with millions of windows, where creating a tuple per window is too slow
+        """
+        try:
+            import numpy
+        except ImportError as error:
+            raise ImportError("WindowPlan.arrays needs the numpy package") from error
+
+        indexes = numpy.arange(
+            self._indexes.start, self._indexes.stop, self._indexes.step, dtype="int64"
+        )
+        interval = numpy.timedelta64(self.interval // timedelta(microseconds=1), "us")
+        start_date = numpy.datetime64(self.start_date, "us")
+        end_date = numpy.datetime64(self.end_date, "us")
+
+        if self.go_back_in_time:
+            ends = end_date - indexes * interval
+            starts = numpy.maximum(ends - interval, start_date)
+        else:
+            starts = start_date + indexes * interval
+            ends = numpy.minimum(starts + interval, end_date)
+        return starts, ends
+
+    def _window(self, index: int) -> Window:
+        """
+        Window at the index of the whole plan
+        """
+        if index < self._full_windows:
+            if self.go_back_in_time:
+                end_date = self.end_date - self.interval * index
+                return end_date - self.interval, end_date
+            start_date = self.start_date + self.interval * index
+            return start_date, start_date + self.interval
+
+        # Remainder window
+        if self.go_back_in_time:
+            remainder_end = self.end_date - self.interval * self._full_windows
+            return self.start_date, remainder_end
+        remainder_start = self.start_date + self.interval * self._full_windows
+        return remainder_start, self.end_date
@@ -0,0 +1,161 @@
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Optional, Set
+from urllib.parse import urljoin
+
+from decorators.base_class import baseclass
+from entities.scrape_request.request_key import normalized_request
+from entities.scrape_request.scrape_request import ScrapeRequest
+from use_cases.request_generator.request_generator import RequestGenerator
+
+
+class LinkFollowingRequestGenerator(RequestGenerator):
+    """
+    Generates the requests of a paginated API by following the links in its responses
+    It starts with [initial_request], and every response it's given through [feedback]
+    adds the requests of the links found in the [link_paths] (NEO feed: "links.next").
+
+    The links are requested as soon as the response is fetched, before its data is saved,
+    so with more than one worker the next page is being fetched while the current one is stored.
+    Every request is only made once, links already visited are ignored (pages linking each other).
+    """
+
+    def __init__(
+        self,
+        initial_request: ScrapeRequest,
+        link_paths: List[str] | None = None,
+        keep_payload: bool = False,
+        max_requests: int | None = None,
+    ):
+        """
+        [link_paths] dotted paths in the response to the links to follow, a link can be a url or a list of urls
+        [keep_payload] sends the payload of [initial_request] with the links too,
+        by default the links are requested as they are (they usually carry their own query)
+        [max_requests] stops following links after that many requests
+        """
+        self.initial_request = initial_request
+        self.link_paths = [path.split(".") for path in (link_paths or ["links.next"])]
+        self.keep_payload = keep_payload
+        self.max_requests = max_requests
+        self._requests_made = 0
+        self._queue: Deque[ScrapeRequest] = deque()
+        self._visited: Set[str] = set()
+        # Requests handed out that the scraper is not done with, only kept when it reports them
+        self._track_outstanding = False
+        self._outstanding: Dict[str, ScrapeRequest] = {}
+        self._enqueue(initial_request)
+
+    @baseclass
+    def working(self) -> bool:
+        """
+        Whether there are links waiting to be requested
+        The responses of requests in flight can still bring new links
+        """
+        if self.max_requests is not None and self._requests_made >= self.max_requests:
+            return False
+        return bool(self._queue)
+
+    @baseclass
+    def next(self) -> Optional[ScrapeRequest]:
+        if not self.working():
+            return None
+        request = self._queue.popleft()
+        self._requests_made += 1
+        if self._track_outstanding:
+            self._outstanding[self._key(request)] = request
+        return request
+
+    @property
+    @baseclass
+    def total_requests(self) -> int:
+        return self._requests_made
+
+    @property
+    @baseclass
+    def needs_responses(self) -> bool:
+        """
+        The next requests are the links found in the responses
+        """
+        return True
+
+    @property
+    @baseclass
+    def remaining_requests(self) -> int:
+        """
+        Only the links found so far, the responses usually bring more
+        """
+        return len(self._queue) + len(self._outstanding)
+
+    @baseclass
+    def track_completion(self) -> None:
+        self._track_outstanding = True
+
+    @baseclass
+    def completed(self, request: ScrapeRequest) -> None:
+        self._outstanding.pop(self._key(request), None)
+
+    @baseclass
+    def feedback(
+        self,
+        request: ScrapeRequest,
+        response: Dict[str, Any] | None,
+        error: Exception | None = None,
+    ) -> bool:
+        """
+        Queues the links of the response, the response is always kept
+        """
+        if response is not None:
+            for link in self._links(response):
+                self._enqueue(self._create_request(urljoin(request.url, link)))
+        return True
+
+    @baseclass
+    def get_state(self) -> Dict[str, Any]:
+        """
+        The requests left to do (the ones in flight first) and every request already made
+        """
+        waiting = list(self._outstanding.values()) + list(self._queue)
+        return {
+            "requests_made": self._requests_made - len(self._outstanding),
+            "queue": [
+                {"url": request.url, "payload": request.get_payload()}
+                for request in waiting
+            ],
+            "visited": sorted(self._visited),
+        }
+
+    @baseclass
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        if not state:
+            return
+        self._requests_made = state.get("requests_made", 0)
+        self._visited = set(state.get("visited", []))
+        self._queue = deque(
+            ScrapeRequest(request["url"], request["payload"])
+            for request in state.get("queue", [])
+        )
+        self._outstanding = {}
+
+    def _enqueue(self, request: ScrapeRequest) -> None:
+        key = self._key(request)
+        if key in self._visited:
+            return
+        self._visited.add(key)
+        self._queue.append(request)
+
+    def _create_request(self, url: str) -> ScrapeRequest:
+        payload = self.initial_request.get_payload() if self.keep_payload else {}
+        return ScrapeRequest(url, payload)
+
+    def _links(self, response: Dict[str, Any]) -> Iterator[str]:
+        for path in self.link_paths:
+            node: Any = response
+            for segment in path:
+                node = node.get(segment) if isinstance(node, dict) else None
+            links = node if isinstance(node, list) else [node]
+            for link in links:
+                if isinstance(link, str) and link:
+                    yield link
+
+    @staticmethod
+    def _key(request: ScrapeRequest) -> str:
+        return normalized_request(request.url, request.get_payload())
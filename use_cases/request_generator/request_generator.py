@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional, TypeVar
+from typing import Any, Dict, Optional, TypeVar
 
 from entities.scrape_request.scrape_request import ScrapeRequest
 
@@ -33,3 +33,56 @@ class RequestGenerator(ABC):
         The amount of requests that have been generated.
         """
         pass
+
+    @property
+    def remaining_requests(self) -> int | None:
+        """
+        Estimate of the requests left to complete, in flight ones included, None when it's unknown
+        It's used for the progress and ETA of the run
+        """
+        return None
+
+    @property
+    def needs_responses(self) -> bool:
+        """
+        Whether the next requests depend on the decoded responses given to [feedback],
+        the streaming modes of the [Scraper] don't decode them
+        """
+        return False
+
+    def track_completion(self) -> None:
+        """
+        Called by the [Scraper] before it starts, it will report every request it's done with to [completed]
+        """
+        pass
+
+    def completed(self, request: T) -> None:
+        """
+        Called by the [Scraper] once it's done with a request (saved or given up)
+        """
+        pass
+
+    def feedback(
+        self,
+        request: T,
+        response: Dict[str, Any] | None,
+        error: Exception | None = None,
+    ) -> bool:
+        """
+        Called by the [Scraper] with the response of every request it fetched, or the error it got
+        Returns False when the generator replaced the request (e.g. with smaller ones),
+        then the response is dropped and the request is done, the error is not retried
+        """
+        return True
+
+    def get_state(self) -> Dict[str, Any]:
+        """
+        JSON serializable state, to resume generating from the same point in another run
+        """
+        return {}
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        """
+        Continues from a state returned by [get_state]
+        """
+        pass
@@ -0,0 +1,179 @@
+import gzip
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Tuple
+from urllib.parse import urlsplit
+
+from data.checkpoint.atomic_write import atomic_write
+from entities.scrape_request.dated_request import DatedRequest
+from entities.scrape_request.scrape_request import ScrapeRequest
+
+
+class ResponseCache:
+    """
+    Responses kept on disk, so requests that were already scraped don't hit the network again
+
+    Every entry is a gzipped JSON file named after the [request_key] of the request (url + payload).
+    When the cache goes over [max_bytes] the least recently used entries are removed,
+    the use of an entry is kept in its file modification time, so it survives between runs.
+
+    Entries expire after the TTL of their endpoint, but a [DatedRequest] whose window
+    ended before now - [closed_window_margin] never expires, data of the past doesn't change.
+    """
+
+    EXTENSION = ".json.gz"
+
+    def __init__(
+        self,
+        folder: str,
+        max_bytes: int = 512 * 1024 * 1024,
+        ttl: float | None = 3600,
+        endpoint_ttls: Dict[str, float | None] | None = None,
+        closed_window_margin: timedelta = timedelta(days=1),
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        [ttl] seconds an entry is valid for, None never expires
+        [endpoint_ttls] TTLs for specific endpoints { "api.nasa.gov/neo/rest/v1/feed": 600 },
+        the longest "host/path" prefix matching the request wins
+        """
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.endpoint_ttls = endpoint_ttls or {}
+        self.closed_window_margin = closed_window_margin
+        self.clock = clock
+
+        self.hits = 0
+        self.misses = 0
+        self.total_bytes = 0
+        # { key: size } from least to most recently used
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        # Workers read and write from different threads
+        self._lock = threading.Lock()
+        self._load_index()
+
+    def get(self, request: ScrapeRequest) -> Dict[str, Any] | None:
+        """
+        The cached response of the request, None if there isn't a valid one
+        """
+        if not request.cacheable:
+            return None
+
+        key = request.key
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            entry = self._read(key)
+            if entry is None or self._expired(entry):
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._touch(key)
+            self.hits += 1
+        return entry["data"]
+
+    def put(self, request: ScrapeRequest, response: Dict[str, Any]) -> None:
+        """
+        Caches the response of the request, evicting old entries if the cache is full
+        """
+        if not request.cacheable:
+            return
+
+        key = request.key
+        ttl = self.ttl_for(request)
+        now = self.clock()
+        entry = {
+            "url": request.url,
+            "stored_at": now,
+            "expires_at": None if ttl is None else now + ttl,
+            "data": response,
+        }
+        body = gzip.compress(
+            json.dumps(entry, separators=(",", ":")).encode("utf-8"), compresslevel=5
+        )
+
+        with self._lock:
+            # A temp file of its own, shards can share the cache and write the same entry
+            atomic_write(self._path(key), lambda file: file.write(body), binary=True)
+
+            self.total_bytes += len(body) - self._entries.pop(key, 0)
+            self._entries[key] = len(body)
+            self._evict()
+
+    def ttl_for(self, request: ScrapeRequest) -> float | None:
+        """
+        Seconds the response of the request stays valid, None if it never expires
+        """
+        if isinstance(request, DatedRequest):
+            if request.end_date < datetime.now() - self.closed_window_margin:
+                return None
+
+        parts = urlsplit(request.url)
+        endpoint = f"{parts.netloc}{parts.path}"
+        matches = [prefix for prefix in self.endpoint_ttls if endpoint.startswith(prefix)]
+        if matches:
+            return self.endpoint_ttls[max(matches, key=len)]
+        return self.ttl
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load_index(self) -> None:
+        """
+        Finds the entries of previous runs, ordered by their last use
+        """
+        found: list[Tuple[float, str, int]] = []
+        if os.path.isdir(self.folder):
+            for root, _, files in os.walk(self.folder):
+                for filename in files:
+                    if not filename.endswith(self.EXTENSION):
+                        continue
+                    stat = os.stat(os.path.join(root, filename))
+                    key = filename[: -len(self.EXTENSION)]
+                    found.append((stat.st_mtime, key, stat.st_size))
+
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self.total_bytes += size
+        self._evict()
+
+    def _path(self, key: str) -> str:
+        # Entries are spread in sub folders, so no folder gets too many files
+        return os.path.join(self.folder, key[:2], f"{key}{self.EXTENSION}")
+
+    def _read(self, key: str) -> Dict[str, Any] | None:
+        try:
+            with open(self._path(key), "rb") as file:
+                return json.loads(gzip.decompress(file.read()))
+        except (OSError, ValueError, EOFError):
+            # Missing or corrupted entry
+            return None
+
+    def _expired(self, entry: Dict[str, Any]) -> bool:
+        expires_at = entry.get("expires_at")
+        return expires_at is not None and expires_at <= self.clock()
+
+    def _touch(self, key: str) -> None:
+        self._entries.move_to_end(key)
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+
+    def _remove(self, key: str) -> None:
+        self.total_bytes -= self._entries.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        while self.total_bytes > self.max_bytes and self._entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
@@ -0,0 +1,72 @@
+import json
+import os
+from typing import Dict, Mapping
+
+from data.checkpoint.atomic_write import atomic_write
+from entities.scrape_request.scrape_request import ScrapeRequest
+
+
+class ValidatorStore:
+    """
+    The ETag and Last-Modified validators of the responses, by [request_key]
+    They are sent back as If-None-Match / If-Modified-Since, so the server can answer
+    304 Not Modified instead of the whole body when the data didn't change.
+
+    Validators are only kept once the data of the response was saved ([confirm]),
+    otherwise a crash could leave a 304 pointing to data that was never stored.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._validators: Dict[str, Dict[str, str]] = {}
+        self._staged: Dict[str, Dict[str, str]] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file:
+                self._validators = json.load(file)
+
+    def headers_for(self, request: ScrapeRequest) -> Dict[str, str]:
+        """
+        Conditional headers for the request, empty if its response was never seen
+        """
+        if not request.cacheable:
+            return {}
+        validators = self._validators.get(request.key, {})
+        headers = {}
+        if "etag" in validators:
+            headers["If-None-Match"] = validators["etag"]
+        if "last_modified" in validators:
+            headers["If-Modified-Since"] = validators["last_modified"]
+        return headers
+
+    def stage(self, request: ScrapeRequest, headers: Mapping[str, str]) -> None:
+        """
+        Takes the validators from the headers of a successful response
+        """
+        validators = {}
+        if headers.get("ETag"):
+            validators["etag"] = headers["ETag"]
+        if headers.get("Last-Modified"):
+            validators["last_modified"] = headers["Last-Modified"]
+        if validators:
+            self._staged[request.key] = validators
+
+    def confirm(self, request: ScrapeRequest) -> None:
+        """
+        The data of the request was saved, its validators can be used from now on
+        """
+        validators = self._staged.pop(request.key, None)
+        if validators is not None:
+            self._validators[request.key] = validators
+
+    def save(self) -> None:
+        """
+        Replaces the validators file atomically
+        Validators saved to the file by other processes (shards of the same run) are kept
+        """
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as file:
+                self._validators = {**json.load(file), **self._validators}
+        atomic_write(self.path, lambda file: json.dump(self._validators, file))
+
+    def __len__(self) -> int:
+        return len(self._validators)
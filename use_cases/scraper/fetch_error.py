@@ -0,0 +1,72 @@
+import asyncio
+import json
+from typing import Mapping
+import aiohttp
+
+from use_cases.scraper.rate_limit.retry_after import parse_retry_after
+
+
+class FetchError(Exception):
+    """
+    Raised by [Scraper.fetch] when a request fails, classified by [kind]
+    so the [Scraper] can decide whether it's worth trying the request again
+    """
+
+    TIMEOUT = "timeout"  # The server took too long to answer
+    CONNECTION = "connection"  # Connection refused, reset, proxy failures...
+    THROTTLED = "throttled"  # 429, the server asks to slow down
+    SERVER = "server"  # 5xx
+    CLIENT = "client"  # 4xx, the request itself is wrong
+    INVALID = "invalid"  # The body could not be read or decoded
+    EMPTY = "empty"  # The fetch gave no data, without saying why
+    NOT_MODIFIED = "not_modified"  # 304, the data didn't change since it was saved
+
+    def __init__(
+        self,
+        kind: str,
+        status: int | None = None,
+        message: str = "",
+        retry_after: float | None = None,
+    ):
+        super().__init__(message or kind)
+        self.kind = kind
+        self.status = status
+        self.message = message
+        self.retry_after = retry_after
+
+    @classmethod
+    def from_status(
+        cls, status: int, headers: Mapping[str, str] | None = None
+    ) -> "FetchError":
+        """
+        Error for a response with a status that is not 2xx
+        """
+        retry_after = parse_retry_after((headers or {}).get("Retry-After"))
+
+        if status == 304:
+            kind = cls.NOT_MODIFIED
+        elif status == 429:
+            kind = cls.THROTTLED
+        elif status >= 500:
+            kind = cls.SERVER
+        else:
+            kind = cls.CLIENT
+        return cls(kind, status, f"Unexpected response: {status}", retry_after)
+
+    @classmethod
+    def from_exception(cls, error: Exception) -> "FetchError":
+        """
+        Error for an exception raised while making the request or reading the response
+        """
+        if isinstance(error, (asyncio.TimeoutError, aiohttp.ServerTimeoutError)):
+            kind = cls.TIMEOUT
+        elif isinstance(error, (aiohttp.ContentTypeError, json.JSONDecodeError)):
+            kind = cls.INVALID
+        elif isinstance(error, aiohttp.ClientPayloadError):
+            kind = cls.INVALID
+        else:
+            kind = cls.CONNECTION
+        return cls(kind, message=repr(error))
+
+    def __repr__(self) -> str:
+        return f"FetchError({self.kind}, status={self.status}, message={self.message!r})"
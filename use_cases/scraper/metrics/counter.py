@@ -0,0 +1,34 @@
+from typing import Dict, Iterator
+
+from decorators.base_class import baseclass
+from use_cases.scraper.metrics.metric import Labels, Metric, Sample
+
+
+class Counter(Metric):
+    """
+    A total that only goes up (responses, bytes, retries...)
+    """
+
+    TYPE = "counter"
+
+    def __init__(self, name: str, description: str, label_names: Labels = ()):
+        super().__init__(name, description, label_names)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def total(self) -> float:
+        """
+        The sum over every combination of labels
+        """
+        return sum(self._values.values())
+
+    @baseclass
+    def samples(self) -> Iterator[Sample]:
+        for key, value in self._values.items():
+            yield "", self._labels(key), value
@@ -0,0 +1,27 @@
+from typing import Dict, Iterator
+
+from decorators.base_class import baseclass
+from use_cases.scraper.metrics.metric import Labels, Metric, Sample
+
+
+class Gauge(Metric):
+    """
+    A value that goes up and down (requests in flight, queue depths, ETA...)
+    """
+
+    TYPE = "gauge"
+
+    def __init__(self, name: str, description: str, label_names: Labels = ()):
+        super().__init__(name, description, label_names)
+        self._values: Dict[Labels, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def value(self, **labels: str) -> float | None:
+        return self._values.get(self._key(labels))
+
+    @baseclass
+    def samples(self) -> Iterator[Sample]:
+        for key, value in self._values.items():
+            yield "", self._labels(key), value
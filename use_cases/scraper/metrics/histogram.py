@@ -0,0 +1,65 @@
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Sequence
+
+from decorators.base_class import baseclass
+from use_cases.scraper.metrics.metric import Labels, Metric, Sample
+
+
+class _Series:
+    __slots__ = ("buckets", "sum", "count")
+
+    def __init__(self, size: int):
+        self.buckets: List[int] = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(Metric):
+    """
+    How the observed values are distributed (latencies, write times...)
+    Every value is counted in the first bucket it's less than or equal to,
+    the export adds them up into the cumulative buckets Prometheus expects
+    """
+
+    TYPE = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        label_names: Labels = (),
+        buckets: Sequence[float] = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+    ):
+        super().__init__(name, description, label_names)
+        self.buckets = sorted(buckets)
+        self._series: Dict[Labels, _Series] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            # The last bucket is +Inf
+            series = self._series[key] = _Series(len(self.buckets) + 1)
+        series.buckets[bisect_left(self.buckets, value)] += 1
+        series.sum += value
+        series.count += 1
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(self._key(labels))
+        return 0 if series is None else series.count
+
+    def sum(self, **labels: str) -> float:
+        series = self._series.get(self._key(labels))
+        return 0.0 if series is None else series.sum
+
+    @baseclass
+    def samples(self) -> Iterator[Sample]:
+        for key, series in self._series.items():
+            labels = self._labels(key)
+            cumulative = 0
+            bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+            for bound, count in zip(bounds, series.buckets):
+                cumulative += count
+                yield "_bucket", {**labels, "le": bound}, cumulative
+            yield "_sum", labels, series.sum
+            yield "_count", labels, series.count
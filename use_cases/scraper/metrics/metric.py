@@ -0,0 +1,35 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, Tuple
+
+Labels = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]  # name suffix, labels, value
+
+
+class Metric(ABC):
+    """
+    A named value, or a value per combination of [label_names],
+    exported in the Prometheus text format by [ScrapeMetrics]
+    """
+
+    TYPE = "untyped"
+
+    def __init__(self, name: str, description: str, label_names: Labels = ()):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+
+    def _key(self, labels: Dict[str, str]) -> Labels:
+        """
+        The values of the labels in the order of [label_names], missing labels are empty
+        """
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def _labels(self, key: Labels) -> Dict[str, str]:
+        return dict(zip(self.label_names, key))
+
+    @abstractmethod
+    def samples(self) -> Iterator[Sample]:
+        """
+        Every value of the metric, with its labels
+        """
+        pass
@@ -0,0 +1,192 @@
+import time
+from typing import Callable, Dict, List
+from urllib.parse import urlsplit
+
+from data.checkpoint.atomic_write import atomic_write
+from use_cases.scraper.metrics.counter import Counter
+from use_cases.scraper.metrics.gauge import Gauge
+from use_cases.scraper.metrics.histogram import Histogram
+from use_cases.scraper.metrics.metric import Metric
+
+
+class ScrapeMetrics:
+    """
+    Counters and histograms of a scraping run, labelled by host and proxy (empty for direct requests)
+    The [Scraper] updates them as it goes and reports them every [interval] seconds:
+    the Prometheus text file at [path] is rewritten (atomically) and [on_report] is called with the metrics
+
+    Progress is the requests completed in this run, the ETA assumes the rest go at the same pace
+    """
+
+    LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+    WRITE_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1)
+
+    def __init__(
+        self,
+        path: str | None = None,
+        interval: float = 10.0,
+        on_report: Callable[["ScrapeMetrics"], None] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        [path] of the Prometheus text file, e.g. for the textfile collector of the node exporter
+        [on_report] in process callback, e.g. to print the progress or push the metrics elsewhere
+        """
+        self.path = path
+        self.interval = interval
+        self.on_report = on_report
+        self.clock = clock
+        self.started_at = clock()
+
+        self.responses = Counter(
+            "scraps_responses_total",
+            "Responses received by status, 'error' when no response came back",
+            ("host", "proxy", "status"),
+        )
+        self.latency = Histogram(
+            "scraps_request_seconds",
+            "Seconds until the response headers arrived",
+            ("host", "proxy"),
+            self.LATENCY_BUCKETS,
+        )
+        self.bytes_sent = Counter(
+            "scraps_sent_bytes_total",
+            "Bytes of the request lines and headers sent",
+            ("host", "proxy"),
+        )
+        self.bytes_received = Counter(
+            "scraps_received_bytes_total",
+            "Bytes of the response bodies received",
+            ("host", "proxy"),
+        )
+        self.cache_hits = Counter(
+            "scraps_cache_hits_total",
+            "Requests answered by the response cache",
+            ("host",),
+        )
+        self.retries = Counter(
+            "scraps_retries_total", "Failed requests scheduled again", ("host", "kind")
+        )
+        self.given_up = Counter(
+            "scraps_given_up_total",
+            "Requests that failed and were not retried",
+            ("host", "kind"),
+        )
+        self.store_writes = Histogram(
+            "scraps_store_write_seconds",
+            "Seconds the data store took to save a record",
+            ("store",),
+            self.WRITE_BUCKETS,
+        )
+        self.store_queue = Gauge(
+            "scraps_store_queue_depth",
+            "Records waiting to be written by the data store",
+        )
+        self.completed = Counter(
+            "scraps_requests_completed_total", "Requests done in this run"
+        )
+        self.in_flight = Gauge("scraps_requests_in_flight", "Requests being handled")
+        self.retry_queue = Gauge(
+            "scraps_retry_queue_depth", "Failed requests waiting for their retry"
+        )
+        self.remaining = Gauge(
+            "scraps_requests_remaining", "Estimate of the requests left to complete"
+        )
+        self.eta = Gauge(
+            "scraps_eta_seconds", "Estimate of the seconds until the run completes"
+        )
+
+    @property
+    def metrics(self) -> List[Metric]:
+        return [value for value in vars(self).values() if isinstance(value, Metric)]
+
+    def observe_response(
+        self,
+        url: str,
+        status: int | None,
+        latency: float | None = None,
+        proxy: str | None = None,
+    ) -> None:
+        host = self.host(url)
+        status_label = "error" if status is None else str(status)
+        self.responses.inc(host=host, proxy=proxy or "", status=status_label)
+        if latency is not None:
+            self.latency.observe(latency, host=host, proxy=proxy or "")
+
+    def observe_transfer(
+        self, url: str, sent: int, received: int, proxy: str | None = None
+    ) -> None:
+        host = self.host(url)
+        self.bytes_sent.inc(sent, host=host, proxy=proxy or "")
+        self.bytes_received.inc(received, host=host, proxy=proxy or "")
+
+    def progress(self, remaining: int | None) -> None:
+        """
+        Updates the estimate of what's left, [remaining] None when the generator can't tell
+        """
+        if remaining is None:
+            return
+        self.remaining.set(remaining)
+        eta = self.eta_seconds(remaining)
+        if eta is not None:
+            self.eta.set(eta)
+
+    def eta_seconds(self, remaining: int) -> float | None:
+        """
+        Seconds left at the pace of the requests completed so far, None before the first one
+        """
+        completed = self.completed.total()
+        if completed == 0:
+            return None
+        elapsed = self.clock() - self.started_at
+        return remaining * elapsed / completed
+
+    def report(self) -> None:
+        if self.path is not None:
+            self._write(self.render())
+        if self.on_report is not None:
+            self.on_report(self)
+
+    def render(self) -> str:
+        """
+        Every metric in the Prometheus text exposition format
+        """
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.TYPE}")
+            for suffix, labels, value in metric.samples():
+                labels_text = self._format_labels(labels)
+                lines.append(
+                    f"{metric.name}{suffix}{labels_text} {self._format_value(value)}"
+                )
+        return "\n".join(lines) + "\n"
+
+    def _write(self, text: str) -> None:
+        """
+        Replaces the file atomically, a collector never reads half of it
+        """
+        atomic_write(self.path, lambda file: file.write(text))
+
+    @staticmethod
+    def host(url: str) -> str:
+        return urlsplit(url).netloc
+
+    @staticmethod
+    def _format_labels(labels: Dict[str, str]) -> str:
+        if not labels:
+            return ""
+        escaped = (
+            name
+            + '="'
+            + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            + '"'
+            for name, value in labels.items()
+        )
+        return "{" + ",".join(escaped) + "}"
+
+    @staticmethod
+    def _format_value(value: float) -> str:
+        if float(value).is_integer():
+            return str(int(value))
+        return repr(float(value))
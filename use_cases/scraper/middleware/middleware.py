@@ -0,0 +1,53 @@
+from typing import Any, Dict
+
+from entities.scrape_request.scrape_request import ScrapeRequest
+from entities.scraped_data.scraped_data import ScrapedData
+from use_cases.scraper.middleware.request_context import RequestContext
+
+
+class Middleware:
+    """
+    Hooks the [Scraper] calls around every request, registered with [ScraperConfig] [middlewares]
+    Every hook does nothing by default, a middleware only overrides the ones it needs.
+
+    request -> on_request -> fetch -> on_response -> create -> on_record (every record) -> save -> on_saved
+    Streamed responses have no decoded response, on_response is skipped for them
+    """
+
+    def on_request(
+        self, request: ScrapeRequest, context: RequestContext
+    ) -> Dict[str, Any] | None:
+        """
+        Before the request is fetched, [context] [headers] are added to it
+        Returning a response skips the fetch, the response is used as if it was cached
+        """
+        return None
+
+    def on_response(
+        self, request: ScrapeRequest, response: Dict[str, Any], context: RequestContext
+    ) -> Dict[str, Any] | None:
+        """
+        The response the records are created from, changed or as it is
+        Returning None drops it, the request is done without saving anything
+        """
+        return response
+
+    def on_record(
+        self, request: ScrapeRequest, data: ScrapedData, context: RequestContext
+    ) -> ScrapedData | None:
+        """
+        The record to save, changed or as it is, None skips it
+        """
+        return data
+
+    def on_saved(self, request: ScrapeRequest, context: RequestContext) -> None:
+        """
+        The records of the request were saved, [context] [spans] has the time of every stage
+        """
+        pass
+
+    def on_close(self) -> None:
+        """
+        The scraper is done, called once at the end of the run
+        """
+        pass
@@ -0,0 +1,75 @@
+from typing import Any, Dict, Iterable, List
+
+from entities.scrape_request.scrape_request import ScrapeRequest
+from entities.scraped_data.scraped_data import ScrapedData
+from use_cases.scraper.middleware.middleware import Middleware
+from use_cases.scraper.middleware.request_context import RequestContext
+
+
+class MiddlewareChain:
+    """
+    Calls a hook of the [middlewares] in the order they were given, timing it as a stage of the request
+    Only the middlewares that override a hook are called for it, a hook nobody overrides costs nothing
+    """
+
+    def __init__(self, middlewares: Iterable[Middleware]):
+        self.middlewares = list(middlewares)
+        self._on_request = self._overriding("on_request")
+        self._on_response = self._overriding("on_response")
+        self._on_record = self._overriding("on_record")
+        self._on_saved = self._overriding("on_saved")
+
+    def _overriding(self, hook: str) -> List[Middleware]:
+        default = getattr(Middleware, hook)
+        return [
+            middleware
+            for middleware in self.middlewares
+            if getattr(type(middleware), hook) is not default
+        ]
+
+    def on_request(
+        self, request: ScrapeRequest, context: RequestContext
+    ) -> Dict[str, Any] | None:
+        """
+        The response of the first middleware that answers the request, if any
+        """
+        if not self._on_request:
+            return None
+        with context.span("on_request"):
+            for middleware in self._on_request:
+                response = middleware.on_request(request, context)
+                if response is not None:
+                    return response
+        return None
+
+    def on_response(
+        self, request: ScrapeRequest, response: Dict[str, Any], context: RequestContext
+    ) -> Dict[str, Any] | None:
+        if not self._on_response:
+            return response
+        with context.span("on_response"):
+            for middleware in self._on_response:
+                response = middleware.on_response(request, response, context)
+                if response is None:
+                    break
+        return response
+
+    def on_record(
+        self, request: ScrapeRequest, data: ScrapedData, context: RequestContext
+    ) -> ScrapedData | None:
+        if not self._on_record:
+            return data
+        with context.span("on_record"):
+            for middleware in self._on_record:
+                data = middleware.on_record(request, data, context)
+                if data is None:
+                    break
+        return data
+
+    def on_saved(self, request: ScrapeRequest, context: RequestContext) -> None:
+        for middleware in self._on_saved:
+            middleware.on_saved(request, context)
+
+    def on_close(self) -> None:
+        for middleware in self.middlewares:
+            middleware.on_close()
@@ -0,0 +1,70 @@
+import json
+import logging
+from typing import Any, Dict
+
+from decorators.base_class import baseclass
+from entities.scrape_request.scrape_request import ScrapeRequest
+from use_cases.scraper.middleware.middleware import Middleware
+from use_cases.scraper.middleware.request_context import RequestContext, Span
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilingMiddleware(Middleware):
+    """
+    Adds up the wall and CPU time of every stage of the requests saved,
+    and dumps them at the end of the run: logged, and written as JSON to [path] when it's set
+    Requests that failed or were dropped are not counted
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self.requests = 0
+        self.stages: Dict[str, Span] = {}
+
+    @baseclass
+    def on_saved(self, request: ScrapeRequest, context: RequestContext) -> None:
+        self.requests += 1
+        for stage, span in context.spans.items():
+            total = self.stages.get(stage)
+            if total is None:
+                total = self.stages[stage] = Span(stage)
+            total.count += span.count
+            total.wall += span.wall
+            total.cpu += span.cpu
+
+    @baseclass
+    def on_close(self) -> None:
+        summary = self.summary()
+        logger.info("Profile of %d requests", self.requests)
+        for stage, times in summary["stages"].items():
+            logger.info(
+                "%-12s %8d calls %10.3fs wall %10.3fs cpu %8.3fms wall/request",
+                stage,
+                times["count"],
+                times["wall"],
+                times["cpu"],
+                times["wall_per_request"] * 1000,
+            )
+        if self.path is not None:
+            with open(self.path, "w", encoding="utf-8") as file:
+                json.dump(summary, file, indent=2)
+                file.write("\n")
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        The totals of every stage, slowest first
+        """
+        stages = sorted(self.stages.values(), key=lambda span: span.wall, reverse=True)
+        return {
+            "requests": self.requests,
+            "stages": {
+                span.stage: {
+                    "count": span.count,
+                    "wall": span.wall,
+                    "cpu": span.cpu,
+                    "wall_per_request": span.wall / self.requests,
+                }
+                for span in stages
+            },
+        }
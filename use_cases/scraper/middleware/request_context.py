@@ -0,0 +1,51 @@
+from contextlib import contextmanager
+import time
+from typing import Any, Dict, Iterator
+
+
+class Span:
+    """
+    Time spent in a stage of a request, added up over every time the stage ran (once per record...)
+    """
+
+    __slots__ = ("stage", "count", "wall", "cpu")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.count = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+
+
+class RequestContext:
+    """
+    What the middlewares share about the request being scraped:
+    [headers] added to the request, [spans] of its stages, and [attributes] for their own use
+
+    The CPU time of a stage that awaits (fetch, save) includes what other workers ran meanwhile,
+    it's only exact for the stages that don't (create, the hooks)
+    """
+
+    __slots__ = ("headers", "spans", "attributes")
+
+    FETCH = "fetch"
+    CREATE = "create"
+    SAVE = "save"
+
+    def __init__(self):
+        self.headers: Dict[str, str] = {}
+        self.spans: Dict[str, Span] = {}
+        self.attributes: Dict[str, Any] = {}
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            span = self.spans.get(stage)
+            if span is None:
+                span = self.spans[stage] = Span(stage)
+            span.count += 1
+            span.wall += time.perf_counter() - wall
+            span.cpu += time.process_time() - cpu
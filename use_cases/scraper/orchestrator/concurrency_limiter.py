@@ -0,0 +1,143 @@
+import asyncio
+from collections import deque
+from typing import Deque, Dict, Tuple
+from urllib.parse import urlsplit
+
+
+class ConcurrencyLimiter:
+    """
+    Caps the requests in flight of many jobs running in the same event loop:
+    [max_in_flight] in total and [max_per_host] to the same host, [host_limits] overrides it for some hosts
+    None means no cap
+
+    The jobs wait for a slot through their [JobSlots]. A slot that frees up goes to the waiting job
+    with the fewest requests in flight for its weight (the one served longest ago on a tie),
+    so a job with many workers doesn't starve the others.
+    A job waiting on a full host doesn't hold back the jobs waiting on other hosts.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int | None = None,
+        max_per_host: int | None = None,
+        host_limits: Dict[str, int] | None = None,
+    ):
+        if max_in_flight is not None and max_in_flight < 1:
+            raise ValueError("ConcurrencyLimiter needs at least one request in flight")
+        self.max_in_flight = max_in_flight
+        self.max_per_host = max_per_host
+        self.host_limits = host_limits or {}
+        self.in_flight = 0
+        self.host_in_flight: Dict[str, int] = {}
+        self.job_in_flight: Dict[str, int] = {}
+        self._weights: Dict[str, float] = {}
+        self._served: Dict[str, int] = {}  # When every job got its last slot
+        self._grants = 0
+        self._waiters: Dict[str, Deque[Tuple[str, asyncio.Future]]] = {}
+
+    def job(self, name: str, weight: float = 1) -> "JobSlots":
+        """
+        The slots of a job, a job with twice the [weight] gets twice the slots when they are scarce
+        """
+        if weight <= 0:
+            raise ValueError("The weight of a job must be positive")
+        self._weights[name] = weight
+        self.job_in_flight.setdefault(name, 0)
+        self._served.setdefault(name, 0)
+        self._waiters.setdefault(name, deque())
+        return JobSlots(self, name)
+
+    async def acquire(self, job: str, url: str) -> None:
+        """
+        Waits until the job can send a request to the host of the url
+        """
+        host = urlsplit(url).netloc
+        future = asyncio.get_running_loop().create_future()
+        waiter = (host, future)
+        self._waiters[job].append(waiter)
+        self._grant()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was granted as the task was cancelled, it's not used
+                self.release(job, url)
+            elif waiter in self._waiters[job]:
+                self._waiters[job].remove(waiter)
+            raise
+
+    def release(self, job: str, url: str) -> None:
+        """
+        The request of the job is done, its slot goes to the next waiting job
+        """
+        host = urlsplit(url).netloc
+        self.in_flight -= 1
+        self.job_in_flight[job] -= 1
+        self.host_in_flight[host] -= 1
+        if self.host_in_flight[host] == 0:
+            del self.host_in_flight[host]
+        self._grant()
+
+    def waiting(self, job: str) -> int:
+        return len(self._waiters[job])
+
+    def _grant(self) -> None:
+        """
+        Hands out the free slots, fairest job first
+        """
+        while self.max_in_flight is None or self.in_flight < self.max_in_flight:
+            chosen = None
+            for job, waiters in self._waiters.items():
+                waiter = self._first_ready(waiters)
+                if waiter is None:
+                    continue
+                share = (self.job_in_flight[job] / self._weights[job], self._served[job])
+                if chosen is None or share < chosen[0]:
+                    chosen = (share, job, waiter)
+            if chosen is None:
+                return
+
+            _, job, waiter = chosen
+            host, future = waiter
+            self._waiters[job].remove(waiter)
+            self.in_flight += 1
+            self.job_in_flight[job] += 1
+            self.host_in_flight[host] = self.host_in_flight.get(host, 0) + 1
+            self._grants += 1
+            self._served[job] = self._grants
+            future.set_result(None)
+
+    def _first_ready(
+        self, waiters: Deque[Tuple[str, asyncio.Future]]
+    ) -> Tuple[str, asyncio.Future] | None:
+        """
+        The oldest waiter of a job whose host has room
+        """
+        for waiter in waiters:
+            host, future = waiter
+            if future.done():
+                continue
+            limit = self.host_limits.get(host, self.max_per_host)
+            if limit is None or self.host_in_flight.get(host, 0) < limit:
+                return waiter
+        return None
+
+
+class JobSlots:
+    """
+    The concurrency slots of a job in a [ConcurrencyLimiter], what its [Scraper] holds while sending a request
+    """
+
+    def __init__(self, limiter: ConcurrencyLimiter, job: str):
+        self.limiter = limiter
+        self.job = job
+
+    async def acquire(self, url: str) -> None:
+        await self.limiter.acquire(self.job, url)
+
+    def release(self, url: str) -> None:
+        self.limiter.release(self.job, url)
+
+    @property
+    def in_flight(self) -> int:
+        return self.limiter.job_in_flight[self.job]
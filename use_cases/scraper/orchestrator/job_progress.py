@@ -0,0 +1,31 @@
+class JobProgress:
+    """
+    Progress of a job reported by the [Orchestrator], windows [completed] out of [total]
+    """
+
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    def __init__(
+        self,
+        name: str,
+        completed: int,
+        total: int,
+        status: str = RUNNING,
+        error: str | None = None,
+    ):
+        """
+        [error] why a failed job stopped
+        """
+        self.name = name
+        self.completed = completed
+        self.total = total
+        self.status = status
+        self.error = error
+
+    def __repr__(self) -> str:
+        text = f"Job {self.name}: {self.completed}/{self.total} {self.status}"
+        if self.error is not None:
+            text += f" ({self.error})"
+        return text
@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict
+
+from data.data_store import DataStore
+from entities.scraped_data.factory.scrape_data_factory import ScrapeDataFactory
+from formatters.ymd_formatter import ymd_format_date
+
+
+class JobSpec:
+    """
+    An endpoint and date range scraped by an [Orchestrator]:
+    requests to [url] with the [payload], one for every [interval] between [start] and [end],
+    their dates formatted with [formatter] under [start_key] and [end_key], saved to [data_store]
+    """
+
+    def __init__(
+        self,
+        name: str,
+        url: str,
+        payload: Dict[str, Any],
+        start: datetime,
+        end: datetime,
+        interval: timedelta,
+        data_store: DataStore,
+        start_key: str = "from",
+        end_key: str = "to",
+        formatter: Callable[[datetime], str] = ymd_format_date,
+        data_factory: ScrapeDataFactory | None = None,
+        back_in_time: bool = False,
+        workers: int = 1,
+        weight: float = 1,
+        checkpoint_path: str | None = None,
+    ):
+        """
+        [name] identifies the job in the progress, it must be unique in the run
+        [data_factory] by default every response is saved as a single record
+        [workers] requests of the job kept in flight, as the caps of the [Orchestrator] allow
+        [weight] share of the slots the job gets when they are scarce, relative to the other jobs
+        [checkpoint_path] saves the progress of the job, and resumes from it when it's run again
+        """
+        self.name = name
+        self.url = url
+        self.payload = payload
+        self.start = start
+        self.end = end
+        self.interval = interval
+        self.data_store = data_store
+        self.start_key = start_key
+        self.end_key = end_key
+        self.formatter = formatter
+        self.data_factory = data_factory
+        self.back_in_time = back_in_time
+        self.workers = workers
+        self.weight = weight
+        self.checkpoint_path = checkpoint_path
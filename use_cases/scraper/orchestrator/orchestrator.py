@@ -0,0 +1,194 @@
+import asyncio
+import logging
+from typing import Callable, Dict, List
+import aiohttp
+
+from data.checkpoint.checkpoint import Checkpoint
+from entities.scrape_request.scrape_request import ScrapeRequest
+from entities.scraped_data.factory.basic_data_factory import BasicDataFactory
+from entities.scraped_data.factory.scrape_data_factory import ScrapeDataFactory
+from entities.scraped_data.scraped_data import ScrapedData
+from use_cases.request_generator.historical.historical_config import HistoricalConfig
+from use_cases.request_generator.historical.historical_request_generator import (
+    HistoricalRequestGenerator,
+)
+from use_cases.scraper.orchestrator.concurrency_limiter import ConcurrencyLimiter
+from use_cases.scraper.orchestrator.job_progress import JobProgress
+from use_cases.scraper.orchestrator.job_spec import JobSpec
+from use_cases.scraper.rate_limit.rate_limiter import RateLimiter
+from use_cases.scraper.regular.regular_scraper import RegularScraper
+from use_cases.scraper.retry.retry_policy import RetryPolicy
+from use_cases.scraper.scraper_config import ScraperConfig
+from use_cases.scraper.session_pool import SessionPool
+
+logger = logging.getLogger(__name__)
+
+
+class Orchestrator:
+    """
+    Scrapes many [JobSpec] at the same time in one event loop, each one with its own [RegularScraper]
+    The jobs share everything that is per host rather than per job:
+    one pool of keep-alive sessions, one [RateLimiter] budget of [rate] requests per second per host,
+    and one [ConcurrencyLimiter] that caps the requests in flight and hands the slots out fairly
+
+    A job that fails doesn't stop the others, its progress is reported as failed with the error
+    """
+
+    def __init__(
+        self,
+        jobs: List[JobSpec],
+        max_in_flight: int | None = None,
+        max_per_host: int | None = None,
+        host_limits: Dict[str, int] | None = None,
+        rate: float | None = None,
+        burst: int = 1,
+        adaptive_rate: bool = False,
+        interval_start: float = 0,
+        interval_end: float = 0,
+        max_attempts: int = 5,
+        connection_limit: int = 100,
+        keepalive_timeout: float = 30,
+        dns_cache_ttl: int = 300,
+        request_timeout: float = 60,
+        on_progress: Callable[[JobProgress], None] | None = None,
+        progress_interval: float = 1.0,
+    ):
+        """
+        [max_in_flight] requests of every job together, [max_per_host] to the same host,
+        [host_limits] overrides it for some hosts ({"api.nasa.gov": 4}), None means no cap
+        [interval_start] and [interval_end] bound the random pause after every request when there's no [rate]
+        [on_progress] is called with the progress of every job every [progress_interval] seconds,
+        and once more when the job is done. By default it's logged
+        """
+        names = [job.name for job in jobs]
+        if len(set(names)) != len(names):
+            raise ValueError("Every job of the Orchestrator needs a different name")
+        self.jobs = jobs
+        self.limiter = ConcurrencyLimiter(max_in_flight, max_per_host, host_limits)
+        self.rate_limiter = (
+            RateLimiter(rate, burst=burst, adaptive=adaptive_rate)
+            if rate is not None
+            else None
+        )
+        self.interval_start = interval_start
+        self.interval_end = interval_end
+        self.max_attempts = max_attempts
+        self.connection_limit = connection_limit
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.request_timeout = request_timeout
+        self.on_progress = on_progress or self._log_progress
+        self.progress_interval = progress_interval
+        self.scrapers: Dict[str, RegularScraper] = {}
+        self.progress: Dict[str, JobProgress] = {}
+        self.failed: List[str] = []
+
+    async def run(self) -> bool:
+        """
+        Scrapes every job until they are all done or failed
+        Returns whether every job completed
+        """
+        sessions = SessionPool(
+            self._create_connector,
+            timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+        )
+        self.scrapers = {
+            job.name: self._create_scraper(job, sessions) for job in self.jobs
+        }
+        self.failed = []
+
+        reporter = asyncio.create_task(self._report_periodically())
+        try:
+            await asyncio.gather(*(self._run_job(job) for job in self.jobs))
+        finally:
+            reporter.cancel()
+            await sessions.close()
+
+        if self.failed:
+            logger.error("Jobs %s failed, run them again to resume", self.failed)
+        return not self.failed
+
+    def stop(self) -> None:
+        """
+        Every job finishes the requests it's sending and stops
+        """
+        for scraper in self.scrapers.values():
+            scraper.stop = True
+
+    async def _run_job(self, job: JobSpec) -> None:
+        scraper = self.scrapers[job.name]
+        try:
+            await scraper.scrape()
+        except Exception as error:
+            logger.exception("Job %s failed", job.name)
+            self.failed.append(job.name)
+            self._report(self._job_progress(job, JobProgress.FAILED, repr(error)))
+            return
+        self._report(self._job_progress(job, JobProgress.DONE))
+
+    def _create_scraper(self, job: JobSpec, sessions: SessionPool) -> RegularScraper:
+        generator = HistoricalRequestGenerator(
+            config=HistoricalConfig(
+                start_date=job.start,
+                end_date=job.end,
+                interval=job.interval,
+                go_back_in_time=job.back_in_time,
+            ),
+            initial_request=ScrapeRequest(job.url, job.payload),
+            start_key=job.start_key,
+            end_key=job.end_key,
+            date_formatter=job.formatter,
+        )
+        data_factory = job.data_factory or BasicDataFactory(
+            {ScrapeDataFactory, ScrapedData}
+        )
+        config = ScraperConfig(
+            self.interval_start,
+            self.interval_end,
+            workers=job.workers,
+            request_timeout=self.request_timeout,
+            rate_limiter=self.rate_limiter,
+            retry_policy=RetryPolicy(max_attempts=self.max_attempts),
+            checkpoint=Checkpoint(job.checkpoint_path) if job.checkpoint_path else None,
+            concurrency=self.limiter.job(job.name, job.weight),
+        )
+        return RegularScraper(
+            request_generator=generator,
+            data_factory=data_factory,
+            data_store=job.data_store,
+            config=config,
+            sessions=sessions,
+        )
+
+    def _job_progress(
+        self, job: JobSpec, status: str = JobProgress.RUNNING, error: str | None = None
+    ) -> JobProgress:
+        generator = self.scrapers[job.name].request_generator
+        return JobProgress(
+            job.name, generator.completed_windows, len(generator.plan), status, error
+        )
+
+    async def _report_periodically(self) -> None:
+        while True:
+            for job in self.jobs:
+                last = self.progress.get(job.name)
+                if last is None or last.status == JobProgress.RUNNING:
+                    self._report(self._job_progress(job))
+            await asyncio.sleep(self.progress_interval)
+
+    def _report(self, progress: JobProgress) -> None:
+        self.progress[progress.name] = progress
+        self.on_progress(progress)
+
+    @staticmethod
+    def _log_progress(progress: JobProgress) -> None:
+        logger.info("%s", progress)
+
+    def _create_connector(self, key: str) -> aiohttp.TCPConnector:
+        return aiohttp.TCPConnector(
+            limit=self.connection_limit,
+            # The limiter caps the hosts, some may be allowed more than [max_per_host]
+            limit_per_host=0,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+        )
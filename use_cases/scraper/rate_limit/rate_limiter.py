@@ -0,0 +1,116 @@
+import time
+from typing import Callable, Dict, Mapping
+from urllib.parse import urlparse
+
+from use_cases.scraper.rate_limit.retry_after import parse_retry_after
+from use_cases.scraper.rate_limit.token_bucket import TokenBucket
+
+
+class RateLimiter:
+    """
+    Limits the requests made to every host with its own [TokenBucket]
+    The [Scraper] waits on [acquire] before every request, and reports every response to [observe]
+
+    The server is always listened to:
+    - Retry-After pauses the host for the time requested
+    - X-RateLimit-Remaining caps the requests that can be made right away, and pauses the host when it's 0
+
+    If adaptive=True the rate of a host is adjusted with AIMD (additive increase, multiplicative decrease)
+    Each successful response raises the rate by [increase], up to [max_rate]
+    A 429/503, or a response slower than [target_latency], multiplies the rate by [decrease], down to [min_rate]
+    """
+
+    THROTTLED_STATUSES = (429, 503)
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        adaptive: bool = False,
+        min_rate: float | None = None,
+        max_rate: float | None = None,
+        increase: float | None = None,
+        decrease: float = 0.5,
+        target_latency: float | None = None,
+        exhausted_pause: float = 60,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        [rate] requests per second allowed for every host, [burst] requests that can be made at once
+        [min_rate], [max_rate], [increase], [decrease] and [target_latency] configure the adaptive mode,
+        by default the rate moves between a tenth and ten times the initial rate, by a tenth of it at a time
+        [exhausted_pause] seconds a host is paused when X-RateLimit-Remaining is 0 and there's no Retry-After
+        """
+        self.rate = rate
+        self.burst = burst
+        self.adaptive = adaptive
+        self.min_rate = min_rate if min_rate is not None else rate / 10
+        self.max_rate = max_rate if max_rate is not None else rate * 10
+        self.increase = increase if increase is not None else rate / 10
+        self.decrease = decrease
+        self.target_latency = target_latency
+        self.exhausted_pause = exhausted_pause
+        self.clock = clock
+        self.buckets: Dict[str, TokenBucket] = {}
+
+    def bucket(self, url: str) -> TokenBucket:
+        """
+        The bucket of the host of the url
+        """
+        host = urlparse(url).netloc
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.burst, self.clock)
+            self.buckets[host] = bucket
+        return bucket
+
+    async def acquire(self, url: str) -> None:
+        """
+        Waits until a request to the host of the url can be made
+        """
+        await self.bucket(url).acquire()
+
+    def observe(
+        self,
+        url: str,
+        status: int | None,
+        headers: Mapping[str, str] | None = None,
+        latency: float | None = None,
+    ) -> None:
+        """
+        Adjusts the limits of the host to the response (status None if the request failed before getting one)
+        """
+        bucket = self.bucket(url)
+        headers = headers or {}
+
+        retry_after = parse_retry_after(headers.get("Retry-After"))
+        if retry_after is not None:
+            bucket.pause(retry_after)
+
+        remaining = self._to_float(headers.get("X-RateLimit-Remaining"))
+        if remaining is not None:
+            bucket.limit_tokens(remaining)
+            if remaining <= 0 and retry_after is None:
+                bucket.pause(self.exhausted_pause)
+
+        if not self.adaptive or status is None:
+            return
+
+        too_slow = (
+            self.target_latency is not None
+            and latency is not None
+            and latency > self.target_latency
+        )
+        if status in self.THROTTLED_STATUSES or too_slow:
+            bucket.set_rate(max(self.min_rate, bucket.rate * self.decrease))
+        elif 200 <= status < 300:
+            bucket.set_rate(min(self.max_rate, bucket.rate + self.increase))
+
+    @staticmethod
+    def _to_float(value: str | None) -> float | None:
+        if value is None:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return None
@@ -0,0 +1,34 @@
+import time
+from typing import Callable
+
+from decorators.base_class import baseclass
+from use_cases.scraper.rate_limit.rate_limiter import RateLimiter
+from use_cases.scraper.rate_limit.shared_token_bucket import SharedTokenBucket
+from use_cases.scraper.rate_limit.token_bucket import TokenBucket
+
+
+class SharedRateLimiter(RateLimiter):
+    """
+    [RateLimiter] with a single budget for every host, shared by all the processes of a run
+    Retry-After and X-RateLimit-Remaining from any process slow down all of them
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        adaptive: bool = False,
+        clock: Callable[[], float] = time.monotonic,
+        context=None,
+        **kwargs,
+    ):
+        """
+        [context] the multiprocessing context the processes are started with
+        The other arguments are the ones of [RateLimiter]
+        """
+        super().__init__(rate, burst, adaptive, clock=clock, **kwargs)
+        self.shared_bucket = SharedTokenBucket(rate, burst, clock, context)
+
+    @baseclass
+    def bucket(self, url: str) -> TokenBucket:
+        return self.shared_bucket
@@ -0,0 +1,78 @@
+import multiprocessing
+import time
+from typing import Callable
+
+from use_cases.scraper.rate_limit.token_bucket import TokenBucket
+
+
+class SharedTokenBucket(TokenBucket):
+    """
+    [TokenBucket] kept in shared memory, the processes it's handed to take from the same tokens
+    so together they stay within [rate]. It must be created before the processes are started.
+    """
+
+    TOKENS, PAUSED_UNTIL, UPDATED_AT, RATE = range(4)
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        context=None,
+    ):
+        """
+        [clock] must be the same in every process, time.monotonic is shared by the whole system
+        [context] the multiprocessing context the processes are started with
+        """
+        context = context or multiprocessing.get_context()
+        self._lock = context.Lock()
+        self._values = context.RawArray("d", 4)
+        super().__init__(rate, burst, clock)
+
+    def reserve(self) -> float:
+        with self._lock:
+            return super().reserve()
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            super().pause(seconds)
+
+    def limit_tokens(self, tokens: float) -> None:
+        with self._lock:
+            super().limit_tokens(tokens)
+
+    def set_rate(self, rate: float) -> None:
+        with self._lock:
+            super().set_rate(rate)
+
+    @property
+    def tokens(self) -> float:
+        return self._values[self.TOKENS]
+
+    @tokens.setter
+    def tokens(self, value: float) -> None:
+        self._values[self.TOKENS] = value
+
+    @property
+    def paused_until(self) -> float:
+        return self._values[self.PAUSED_UNTIL]
+
+    @paused_until.setter
+    def paused_until(self, value: float) -> None:
+        self._values[self.PAUSED_UNTIL] = value
+
+    @property
+    def _updated_at(self) -> float:
+        return self._values[self.UPDATED_AT]
+
+    @_updated_at.setter
+    def _updated_at(self, value: float) -> None:
+        self._values[self.UPDATED_AT] = value
+
+    @property
+    def rate(self) -> float:
+        return self._values[self.RATE]
+
+    @rate.setter
+    def rate(self, value: float) -> None:
+        self._values[self.RATE] = value
@@ -0,0 +1,72 @@
+import asyncio
+import time
+from typing import Callable
+
+
+class TokenBucket:
+    """
+    Allows [rate] requests per second on average, and bursts of up to [burst] requests
+
+    Every request takes a token, tokens are refilled continuously at [rate] per second.
+    When there are no tokens left, the request reserves the next one and waits for it,
+    so concurrent requests are spaced out instead of all waking up at once.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if rate <= 0:
+            raise ValueError("TokenBucket rate must be positive")
+        if burst < 1:
+            raise ValueError("TokenBucket burst must be at least 1")
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.paused_until = 0.0
+        self._updated_at = clock()
+
+    def reserve(self) -> float:
+        """
+        Takes a token and returns the seconds to wait before using it
+        """
+        now = self._refill()
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(wait, self.paused_until - now)
+
+    async def acquire(self) -> None:
+        """
+        Waits until a request can be made
+        """
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """
+        No request is allowed for the next [seconds] (a Retry-After from the server)
+        """
+        now = self._refill()
+        self.paused_until = max(self.paused_until, now + seconds)
+
+    def limit_tokens(self, tokens: float) -> None:
+        """
+        Caps the tokens available right now, when the server says fewer requests are left
+        """
+        self._refill()
+        self.tokens = min(self.tokens, tokens)
+
+    def set_rate(self, rate: float) -> None:
+        self._refill()
+        self.rate = rate
+
+    def _refill(self) -> float:
+        now = self.clock()
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+        return now
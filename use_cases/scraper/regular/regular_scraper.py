@@ -1,27 +1,119 @@
-import requests
-from typing import Any, Dict
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict
+import aiohttp
 
 from data.data_store import DataStore
 from decorators.base_class import baseclass
 from entities.scrape_request.scrape_request import ScrapeRequest
 from entities.scraped_data.factory.scrape_data_factory import D, ScrapeDataFactory
 from use_cases.request_generator.request_generator import RequestGenerator
+from use_cases.scraper.fetch_error import FetchError
 from use_cases.scraper.scraper import Scraper
 from use_cases.scraper.scraper_config import ScraperConfig
+from use_cases.scraper.session_pool import SessionPool
 
 
 class RegularScraper(Scraper):
+    """
+    Scraper that makes the requests directly, through a single pooled keep-alive session
+    """
+
+    SESSION_KEY = "direct"
+
     def __init__(
         self,
         request_generator: RequestGenerator,
         data_factory: ScrapeDataFactory[D],
         data_store: DataStore,
         config: ScraperConfig,
+        sessions: SessionPool | None = None,
     ):
+        """
+        [sessions] shared with other scrapers, they are left open when this one is closed
+        """
         super().__init__(request_generator, data_factory, data_store, config)
+        self._owns_sessions = sessions is None
+        if sessions is None:
+            sessions = SessionPool(
+                self.__create_connector,
+                timeout=aiohttp.ClientTimeout(total=config.request_timeout),
+            )
+        self.sessions = sessions
+
+    @baseclass
+    async def fetch(self, request: ScrapeRequest) -> Dict[str, Any] | None:
+        session = self.sessions.get(self.SESSION_KEY)
+        started_at = time.perf_counter()
+        try:
+            async with session.get(
+                request.url,
+                params=request.get_payload(),
+                headers=self._request_headers(request),
+            ) as response:
+                self._observe_response(
+                    request,
+                    response.status,
+                    response.headers,
+                    time.perf_counter() - started_at,
+                )
+                try:
+                    if response.status >= 200 and response.status < 300:  # Got Data
+                        self._observe_validators(request, response.headers)
+                        return await response.json(content_type=None)
+                    raise FetchError.from_status(response.status, response.headers)
+                finally:
+                    self.__observe_transfer(request, response)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as error:
+            self._observe_response(request, None)
+            raise FetchError.from_exception(error) from error
 
     @baseclass
-    async def fetch(self, request: ScrapeRequest) -> Dict[str, Any]:
-        response = requests.get(request.url, request.get_payload())
-        print(response.content)
-        return response.json()
+    async def fetch_stream(self, request: ScrapeRequest) -> AsyncIterator[bytes]:
+        session = self.sessions.get(self.SESSION_KEY)
+        started_at = time.perf_counter()
+        try:
+            async with session.get(
+                request.url,
+                params=request.get_payload(),
+                headers=self._request_headers(request),
+            ) as response:
+                self._observe_response(
+                    request,
+                    response.status,
+                    response.headers,
+                    time.perf_counter() - started_at,
+                )
+                try:
+                    if response.status < 200 or response.status >= 300:
+                        raise FetchError.from_status(response.status, response.headers)
+                    self._observe_validators(request, response.headers)
+                    async for chunk in response.content.iter_chunked(
+                        self.config.chunk_size
+                    ):
+                        yield chunk
+                finally:
+                    self.__observe_transfer(request, response)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+            self._observe_response(request, None)
+            raise FetchError.from_exception(error) from error
+
+    @baseclass
+    async def close(self) -> None:
+        if self._owns_sessions:
+            await self.sessions.close()
+
+    def __observe_transfer(
+        self, request: ScrapeRequest, response: aiohttp.ClientResponse
+    ) -> None:
+        self._observe_transfer(
+            request, self.sessions.sent_bytes(response), response.content.total_bytes
+        )
+
+    def __create_connector(self, key: str) -> aiohttp.TCPConnector:
+        return aiohttp.TCPConnector(
+            limit=self.config.connection_limit,
+            limit_per_host=self.config.connection_limit_per_host,
+            ttl_dns_cache=self.config.dns_cache_ttl,
+            keepalive_timeout=self.config.keepalive_timeout,
+        )
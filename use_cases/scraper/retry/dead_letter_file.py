@@ -0,0 +1,41 @@
+from datetime import datetime
+import json
+import os
+
+from entities.scrape_request.dated_request import DatedRequest
+from entities.scrape_request.scrape_request import ScrapeRequest
+from use_cases.scraper.fetch_error import FetchError
+
+
+class DeadLetterFile:
+    """
+    JSON Lines file where the requests that could not be scraped are written,
+    one line per request with its window (for dated requests), the attempts made and the last error
+
+    The file is meant to be read back to re-run only those requests
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.written = 0
+
+    def write(self, request: ScrapeRequest, error: FetchError, attempts: int) -> None:
+        record = {
+            "url": request.url,
+            "payload": request.get_payload(),
+            "attempts": attempts,
+            "error": error.kind,
+            "status": error.status,
+            "message": error.message,
+            "failed_at": datetime.now().isoformat(),
+        }
+        if isinstance(request, DatedRequest):
+            record["start_date"] = request.start_date.isoformat()
+            record["end_date"] = request.end_date.isoformat()
+
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(record, default=str) + "\n")
+        self.written += 1
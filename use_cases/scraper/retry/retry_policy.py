@@ -0,0 +1,62 @@
+import random
+from typing import Callable, Iterable
+
+from use_cases.scraper.fetch_error import FetchError
+
+
+class RetryPolicy:
+    """
+    Decides which failed requests are tried again, and how long to wait before doing it
+
+    The wait grows exponentially with every attempt: base_delay, 2 * base_delay, 4 * base_delay...
+    up to [max_delay], and a random part of it ([jitter]) is removed so retries don't line up.
+    When the server asked for a Retry-After, the wait is at least that long.
+    """
+
+    DEFAULT_RETRY_ON = (
+        FetchError.TIMEOUT,
+        FetchError.CONNECTION,
+        FetchError.THROTTLED,
+        FetchError.SERVER,
+        FetchError.INVALID,
+        FetchError.EMPTY,
+    )
+
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 300.0,
+        jitter: float = 0.5,
+        retry_on: Iterable[str] = DEFAULT_RETRY_ON,
+        random_source: Callable[[], float] = random.random,
+    ):
+        """
+        [max_attempts] times a request is tried in total, the first attempt included
+        [jitter] fraction of the wait that is random, 0 waits exactly the exponential delay
+        [retry_on] the [FetchError] kinds worth trying again, client errors are not retried by default
+        """
+        if max_attempts < 1:
+            raise ValueError("RetryPolicy needs at least one attempt")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.retry_on = set(retry_on)
+        self.random_source = random_source
+
+    def should_retry(self, error: FetchError, attempt: int) -> bool:
+        """
+        Whether a request that failed on its [attempt] (1 for the first one) should be tried again
+        """
+        return error.kind in self.retry_on and attempt < self.max_attempts
+
+    def delay(self, error: FetchError, attempt: int) -> float:
+        """
+        Seconds to wait before trying again a request that failed on its [attempt]
+        """
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        delay *= 1 - self.jitter * self.random_source()
+        if error.retry_after is not None:
+            delay = max(delay, error.retry_after)
+        return delay
@@ -0,0 +1,58 @@
+import heapq
+import itertools
+import time
+from typing import Callable, List, Tuple
+
+from entities.scrape_request.scrape_request import ScrapeRequest
+from use_cases.scraper.fetch_error import FetchError
+
+
+class RetryQueue:
+    """
+    Failed requests waiting to be tried again, each one is ready once its delay is over
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        # (ready_at, insertion order, request, attempt, last error)
+        self._heap: List[Tuple[float, int, ScrapeRequest, int, FetchError]] = []
+        self._order = itertools.count()
+
+    def push(
+        self, request: ScrapeRequest, attempt: int, delay: float, error: FetchError
+    ) -> None:
+        """
+        Schedules the [attempt] of the request in [delay] seconds
+        """
+        ready_at = self.clock() + delay
+        heapq.heappush(
+            self._heap, (ready_at, next(self._order), request, attempt, error)
+        )
+
+    def pop_ready(self) -> Tuple[ScrapeRequest, int] | None:
+        """
+        The next request whose delay is over and the attempt it's on, if any
+        """
+        if not self._heap or self._heap[0][0] > self.clock():
+            return None
+        _, _, request, attempt, _ = heapq.heappop(self._heap)
+        return request, attempt
+
+    def ready_in(self) -> float | None:
+        """
+        Seconds until the next request is ready, None if the queue is empty
+        """
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - self.clock())
+
+    def drain(self) -> List[Tuple[ScrapeRequest, int, FetchError]]:
+        """
+        Empties the queue, returning every request waiting with its attempt and last error
+        """
+        pending = [(request, attempt, error) for _, _, request, attempt, error in sorted(self._heap)]
+        self._heap.clear()
+        return pending
+
+    def __len__(self) -> int:
+        return len(self._heap)
@@ -1,16 +1,31 @@
 from abc import ABC, abstractmethod
 import asyncio
+from contextlib import asynccontextmanager
+import json
+import logging
 import random
-from typing import Any, Dict
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Mapping, Tuple
 
 from data.data_store import DataStore
 from entities.scrape_request.scrape_request import ScrapeRequest
 from entities.scraped_data.factory.scrape_data_factory import D, ScrapeDataFactory
 from use_cases.request_generator.request_generator import RequestGenerator
+from use_cases.scraper.fetch_error import FetchError
+from use_cases.scraper.metrics.scrape_metrics import ScrapeMetrics
+from use_cases.scraper.middleware.middleware_chain import MiddlewareChain
+from use_cases.scraper.middleware.request_context import RequestContext
+from use_cases.scraper.retry.retry_queue import RetryQueue
 from use_cases.scraper.scraper_config import ScraperConfig
+from use_cases.scraper.streaming.json_item_parser import Item, JSONItemParser
+
+logger = logging.getLogger(__name__)
 
 
 class Scraper(ABC):
+    IDLE_WAIT = 0.05  # Seconds
+    BODY_LOG_CHARS = 2000  # Longer bodies are cut when they are logged
+
     def __init__(
         self,
         request_generator: RequestGenerator,
@@ -18,23 +33,519 @@ class Scraper(ABC):
         data_store: DataStore,
         config: ScraperConfig,
     ):
+        if config.stream_mode is not None and request_generator.needs_responses:
+            # Streamed responses are never decoded, the run would stop after the first requests
+            raise ValueError(
+                f"{type(request_generator).__name__} needs the responses, "
+                "it can't be used with a stream mode"
+            )
+        if config.stream_mode is not None and not self.can_stream:
+            raise ValueError(f"{type(self).__name__} can't stream responses")
         self.request_generator = request_generator
         self.data_factory = data_factory
         self.data_store = data_store
         self.config = config
         self.stop = False
+        self.retry_queue = RetryQueue()
+        self._in_flight = 0
+        self._checkpointing = False
+        # Without middlewares there's no chain, every hook is skipped with a single check
+        self.middleware = (
+            MiddlewareChain(config.middlewares) if config.middlewares else None
+        )
+        # The context of every request in flight, only kept when there are middlewares
+        self._contexts: Dict[ScrapeRequest, RequestContext] = {}
 
     @abstractmethod
     async def fetch(self, request: ScrapeRequest) -> Dict[str, Any] | None:
+        """
+        The data of the request
+        When the request fails it raises a [FetchError] describing why, so it can be retried
+        """
         pass
 
+    @property
+    def can_stream(self) -> bool:
+        """
+        Whether the scraper overrides [fetch_stream]
+        """
+        return type(self).fetch_stream is not Scraper.fetch_stream
+
+    def fetch_stream(self, request: ScrapeRequest) -> AsyncIterator[bytes]:
+        """
+        The body of the request in chunks of [ScraperConfig] [chunk_size], for the streaming modes
+        It raises a [FetchError] like [fetch], before the first chunk or halfway through the body
+        Scrapers that can stream override it with an async generator, the others can't use a stream mode
+        """
+        raise NotImplementedError(f"{type(self).__name__} can't stream responses")
+
     async def scrape(self) -> None:
-        while self.request_generator.working() and not self.stop:
+        """
+        Runs [ScraperConfig] [workers] tasks that pull requests from the same generator,
+        so up to that many requests are in flight at any time.
+        Every worker finishes the request it is handling once [stop] is set.
+        """
+        self.request_generator.track_completion()
+        self._resume()
+
+        workers = [
+            asyncio.create_task(self._work()) for _ in range(self.config.workers)
+        ]
+        reporter = (
+            asyncio.create_task(self._report_metrics_periodically())
+            if self.config.metrics is not None
+            else None
+        )
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            # If a worker failed, the others should not keep scraping in the background
+            for worker in workers:
+                worker.cancel()
+            if reporter is not None:
+                reporter.cancel()
+            self._dead_letter_pending_retries()
+            # A close that fails doesn't skip the others or the last checkpoint,
+            # without it a resumed run would number its files from an older state
+            try:
+                await self.close()
+            finally:
+                try:
+                    await self.data_store.aclose()
+                finally:
+                    self._save_final_state()
+
+    def _save_final_state(self) -> None:
+        """
+        Saves the validators and the checkpoint, reports the metrics and closes the middleware
+        """
+        try:
+            if self.config.validators is not None:
+                self.config.validators.save()
+            if self.config.checkpoint is not None:
+                self.config.checkpoint.save(
+                    self.request_generator.get_state(), self.data_store.get_state()
+                )
+            if self.config.metrics is not None:
+                self._report_metrics()
+        finally:
+            if self.middleware is not None:
+                self.middleware.on_close()
+
+    async def close(self) -> None:
+        """
+        Releases the resources held while scraping (sessions, connections...)
+        It's called once [scrape] is done
+        """
+        pass
+
+    async def _work(self) -> None:
+        """
+        Keeps taking the next request until there's nothing left or the scraper is stopped
+        Requests due for a retry go first, then the ones from the generator.
+        The generator is only accessed between awaits, so workers never get the same request
+        """
+        while not self.stop:
+            request, attempt = self._next_request()
+            if request is None:
+                # Requests in flight can still fail and come back to be retried
+                if self._in_flight == 0 and not self.retry_queue:
+                    break
+                await asyncio.sleep(self._idle_wait())
+                continue
+
+            self._in_flight += 1
+            try:
+                await self._scrape_request(request, attempt)
+            finally:
+                self._in_flight -= 1
+
+    def _next_request(self) -> Tuple[ScrapeRequest | None, int]:
+        """
+        The next request to scrape and the attempt it's on
+        """
+        retry = self.retry_queue.pop_ready()
+        if retry is not None:
+            return retry
+
+        if self.request_generator.working():
             request = self.request_generator.next()
-            response = await self.fetch(request)
+            if request is not None:
+                return request, 1
+        return None, 0
+
+    def _idle_wait(self) -> float:
+        """
+        How long a worker with nothing to do waits before looking for a request again
+        """
+        ready_in = self.retry_queue.ready_in()
+        if ready_in is None:
+            return self.IDLE_WAIT
+        if self._in_flight > 0:
+            # A request in flight can hand new work to the generator before the retry is due
+            return min(ready_in, self.IDLE_WAIT)
+        return ready_in
+
+    async def _scrape_request(self, request: ScrapeRequest, attempt: int = 1) -> None:
+        """
+        Fetches a single request, and stores the data if the fetch was successful
+        The middlewares see the request first, they can answer it without fetching it
+        """
+        if self.middleware is None:
+            await self._fetch_request(request, attempt)
+            return
+
+        context = self._contexts[request] = RequestContext()
+        try:
+            response = self.middleware.on_request(request, context)
             if response is not None:
-                data = self.data_factory.create(response)
-                self.data_store.save(data, request)
-                await asyncio.sleep(
-                    random.uniform(self.config.interval_start, self.config.interval_end)
-                )
+                await self._accept_response(request, response, cached=True)
+                return
+            await self._fetch_request(request, attempt)
+        finally:
+            del self._contexts[request]
+
+    async def _fetch_request(self, request: ScrapeRequest, attempt: int) -> None:
+        """
+        The response cache first, then the scraper
+        """
+        cache = self.config.response_cache
+        if cache is not None:
+            response = await asyncio.to_thread(cache.get, request)
+            if response is not None:
+                if self.config.metrics is not None:
+                    self.config.metrics.cache_hits.inc(
+                        host=ScrapeMetrics.host(request.url)
+                    )
+                # Nothing was sent, so there's no need to pace the next request
+                await self._accept_response(request, response, cached=True)
+                return
+
+        response = None
+        try:
+            async with self._sending(request):
+                if self.config.stream_mode is not None:
+                    await self._stream_request(request)
+                else:
+                    response = await self._fetch(request)
+                    if response is None:
+                        raise FetchError(FetchError.EMPTY)
+        except FetchError as error:
+            if error.kind == FetchError.NOT_MODIFIED:
+                # The data is already stored, there's nothing to create or save
+                await self._complete(request)
+            elif not self.request_generator.feedback(request, None, error):
+                # The generator replaced the request, there's nothing to retry
+                await self._complete(request)
+            else:
+                await self._handle_failure(request, attempt, error)
+                return
+        else:
+            if response is not None:
+                await self._accept_response(request, response)
+            else:
+                await self._finish(request)
+        if self.config.rate_limiter is None:
+            await asyncio.sleep(
+                random.uniform(self.config.interval_start, self.config.interval_end)
+            )
+
+    @asynccontextmanager
+    async def _sending(self, request: ScrapeRequest) -> AsyncIterator[None]:
+        """
+        Holds a slot of the [ScraperConfig] [concurrency] while the request is sent, and paces it
+        The slot comes first, so no token of the rate limiter is spent waiting for it
+        """
+        concurrency = self.config.concurrency
+        if concurrency is not None:
+            await concurrency.acquire(request.url)
+        try:
+            if self.config.rate_limiter is not None:
+                await self.config.rate_limiter.acquire(request.url)
+            yield
+        finally:
+            if concurrency is not None:
+                concurrency.release(request.url)
+
+    async def _fetch(self, request: ScrapeRequest) -> Dict[str, Any] | None:
+        context = self._context(request)
+        if context is None:
+            return await self.fetch(request)
+        with context.span(RequestContext.FETCH):
+            return await self.fetch(request)
+
+    async def _accept_response(
+        self, request: ScrapeRequest, response: Dict[str, Any], cached: bool = False
+    ) -> None:
+        """
+        Gives the response to the generator first, so the requests it brings can start right away,
+        then saves it unless the generator replaced the request
+        The cache keeps the response as it came, before the middlewares change it
+        """
+        if not self.request_generator.feedback(request, response):
+            # The data comes with the requests that replaced it
+            await self._complete(request)
+            return
+
+        if not cached:
+            self._log_body(request, response)
+        cache = self.config.response_cache
+        if cache is not None and not cached:
+            await asyncio.to_thread(cache.put, request, response)
+
+        context = self._context(request)
+        if context is not None:
+            response = self.middleware.on_response(request, response, context)
+            if response is None:
+                # Dropped, nothing is saved so the validators are not confirmed
+                await self._complete(request)
+                return
+        await self._save_response(request, response)
+
+    async def _save_response(
+        self, request: ScrapeRequest, response: Dict[str, Any]
+    ) -> None:
+        """
+        Stores the records of the response and marks the request as completed
+        """
+        # A factory can split a single response into many records
+        records = self.data_factory.create_many(response)
+        context = self._context(request)
+        if context is not None:
+            with context.span(RequestContext.CREATE):
+                records = list(records)
+        for data in records:
+            await self._store(data, request)
+        await self._finish(request)
+
+    async def _stream_request(self, request: ScrapeRequest) -> None:
+        """
+        Saves the body of the request as it arrives, without holding it whole in memory
+        A body cut halfway can leave some of its items saved, they are saved again when it's retried
+        """
+        chunks = self.fetch_stream(request)
+        try:
+            if self.config.stream_mode == ScraperConfig.STREAM_RAW:
+                await self.data_store.save_stream(chunks, request)
+                return
+
+            parser = JSONItemParser(self.config.stream_items_path)
+            async for chunk in chunks:
+                for keys, item in self._parse(parser.feed, chunk):
+                    data = self.data_factory.create_item(item, keys)
+                    await self._store(data, request)
+            for keys, item in self._parse(parser.close):
+                await self._store(self.data_factory.create_item(item, keys), request)
+        finally:
+            await chunks.aclose()
+
+    @staticmethod
+    def _parse(parse: Callable[..., List[Item]], *chunk: bytes) -> List[Item]:
+        """
+        The items the parser completed, a body that is not valid JSON can be fetched again
+        Only the errors of the parser are retried, the ones of the factory and the store are not
+        """
+        try:
+            return parse(*chunk)
+        except ValueError as error:
+            raise FetchError(FetchError.INVALID, message=repr(error)) from error
+
+    async def _store(self, data, request: ScrapeRequest) -> None:
+        """
+        Saves a record once the middlewares are done with it
+        """
+        context = self._context(request)
+        if context is None:
+            await self._save(data, request)
+            return
+        data = self.middleware.on_record(request, data, context)
+        if data is None:
+            return
+        with context.span(RequestContext.SAVE):
+            await self._save(data, request)
+
+    async def _save(self, data, request: ScrapeRequest) -> None:
+        """
+        Saves a record, timing how long the store takes
+        """
+        if self.config.metrics is None:
+            await self.data_store.asave(data, request)
+            return
+        started_at = time.perf_counter()
+        await self.data_store.asave(data, request)
+        self.config.metrics.store_writes.observe(
+            time.perf_counter() - started_at, store=type(self.data_store).__name__
+        )
+
+    async def _finish(self, request: ScrapeRequest) -> None:
+        """
+        The data of the request is saved
+        """
+        if self.config.validators is not None:
+            self.config.validators.confirm(request)
+        context = self._context(request)
+        if context is not None:
+            self.middleware.on_saved(request, context)
+        await self._complete(request)
+
+    async def _handle_failure(
+        self, request: ScrapeRequest, attempt: int, error: FetchError
+    ) -> None:
+        """
+        Schedules the request to be retried if the [RetryPolicy] allows it,
+        otherwise it's given up and written to the dead letter file
+        """
+        metrics = self.config.metrics
+        host = ScrapeMetrics.host(request.url)
+        policy = self.config.retry_policy
+        if policy is not None and policy.should_retry(error, attempt):
+            delay = policy.delay(error, attempt)
+            self.retry_queue.push(request, attempt + 1, delay, error)
+            if metrics is not None:
+                metrics.retries.inc(host=host, kind=error.kind)
+            return
+
+        logger.warning(
+            "Giving up on %s after %d attempts: %r", request.url, attempt, error
+        )
+        if metrics is not None:
+            metrics.given_up.inc(host=host, kind=error.kind)
+        if self.config.dead_letter is not None:
+            self.config.dead_letter.write(request, error, attempt)
+        await self._complete(request)
+
+    async def _complete(self, request: ScrapeRequest) -> None:
+        """
+        The scraper is done with the request, the checkpoint is saved when it's due
+        The store is flushed first, so the checkpoint never counts data that is only in memory
+        """
+        self.request_generator.completed(request)
+        if self.config.metrics is not None:
+            self.config.metrics.completed.inc()
+
+        checkpoint = self.config.checkpoint
+        if checkpoint is None:
+            return
+        checkpoint.record_completed()
+        if self._checkpointing or not checkpoint.due():
+            return
+
+        self._checkpointing = True
+        try:
+            # The generator state is taken first, requests completed while the store is flushed
+            # may have rows that are not written yet. The store state is taken once everything
+            # queued before it is written, so its counters never trail the generator
+            generator_state = self.request_generator.get_state()
+            await self.data_store.aflush()
+            store_state = self.data_store.get_state()
+            if self.config.validators is not None:
+                self.config.validators.save()
+            checkpoint.save(generator_state, store_state)
+        finally:
+            self._checkpointing = False
+
+    def _resume(self) -> None:
+        """
+        Continues from the checkpoint of a previous run, if there is one
+        """
+        if self.config.checkpoint is None:
+            return
+        state = self.config.checkpoint.load()
+        if state is not None:
+            self.request_generator.restore_state(state["generator"])
+            self.data_store.restore_state(state["store"])
+
+    def _dead_letter_pending_retries(self) -> None:
+        """
+        When the scraper is stopped, requests still waiting for a retry are not lost
+        """
+        for request, attempt, error in self.retry_queue.drain():
+            if self.config.dead_letter is not None:
+                self.config.dead_letter.write(request, error, attempt - 1)
+
+    def _observe_response(
+        self,
+        request: ScrapeRequest,
+        status: int | None,
+        headers: Mapping[str, str] | None = None,
+        latency: float | None = None,
+        proxy: str | None = None,
+    ) -> None:
+        """
+        Called by the scrapers with every response they get (status None when the request failed),
+        so the limits and stats of the host can be adjusted
+        [proxy] the url of the proxy the request went through, if any
+        """
+        if self.config.rate_limiter is not None:
+            self.config.rate_limiter.observe(request.url, status, headers, latency)
+        if self.config.metrics is not None:
+            self.config.metrics.observe_response(request.url, status, latency, proxy)
+
+    def _observe_transfer(
+        self, request: ScrapeRequest, sent: int, received: int, proxy: str | None = None
+    ) -> None:
+        """
+        Called by the scrapers with the bytes of every request sent and response body read
+        """
+        if self.config.metrics is not None:
+            self.config.metrics.observe_transfer(request.url, sent, received, proxy)
+
+    async def _report_metrics_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.config.metrics.interval)
+            self._report_metrics()
+
+    def _report_metrics(self) -> None:
+        """
+        Updates the queue depths and progress, then reports the metrics
+        """
+        metrics = self.config.metrics
+        metrics.in_flight.set(self._in_flight)
+        metrics.retry_queue.set(len(self.retry_queue))
+        metrics.store_queue.set(self.data_store.queue_depth)
+        metrics.progress(self.request_generator.remaining_requests)
+        try:
+            metrics.report()
+        except OSError as error:
+            # Losing a report is better than stopping the run
+            logger.warning("Could not report the metrics: %r", error)
+
+    def _log_body(self, request: ScrapeRequest, response: Dict[str, Any]) -> None:
+        """
+        Logs the body of a sample of the responses, [ScraperConfig] [body_log_rate] of them
+        """
+        rate = self.config.body_log_rate
+        if rate <= 0 or random.random() >= rate:
+            return
+        body = json.dumps(response, default=str)
+        if len(body) > self.BODY_LOG_CHARS:
+            body = body[: self.BODY_LOG_CHARS] + "..."
+        logger.info("Body of %s %s: %s", request.url, request.get_payload(), body)
+
+    def _context(self, request: ScrapeRequest) -> RequestContext | None:
+        """
+        The context of the request in flight, None when there are no middlewares
+        """
+        return self._contexts.get(request) if self._contexts else None
+
+    def _request_headers(self, request: ScrapeRequest) -> Dict[str, str]:
+        """
+        Headers the scrapers add to the request,
+        the validators of its last response and the ones the middlewares added
+        """
+        headers = {}
+        if self.config.validators is not None:
+            headers = self.config.validators.headers_for(request)
+        context = self._context(request)
+        if context is not None and context.headers:
+            headers = {**headers, **context.headers}
+        return headers
+
+    def _observe_validators(
+        self, request: ScrapeRequest, headers: Mapping[str, str]
+    ) -> None:
+        """
+        Called by the scrapers with the headers of every successful response
+        """
+        if self.config.validators is not None:
+            self.config.validators.stage(request, headers)
@@ -1,4 +1,92 @@
+from typing import List
+
+from data.checkpoint.checkpoint import Checkpoint
+from use_cases.scraper.cache.response_cache import ResponseCache
+from use_cases.scraper.cache.validator_store import ValidatorStore
+from use_cases.scraper.metrics.scrape_metrics import ScrapeMetrics
+from use_cases.scraper.middleware.middleware import Middleware
+from use_cases.scraper.orchestrator.concurrency_limiter import JobSlots
+from use_cases.scraper.rate_limit.rate_limiter import RateLimiter
+from use_cases.scraper.retry.dead_letter_file import DeadLetterFile
+from use_cases.scraper.retry.retry_policy import RetryPolicy
+
+
 class ScraperConfig:
-    def __init__(self, interval_start: float, interval_end: float):
+    STREAM_ITEMS = "items"  # Items are parsed from the body as it arrives
+    STREAM_RAW = "raw"  # The body goes to the store as it is
+
+    def __init__(
+        self,
+        interval_start: float,
+        interval_end: float,
+        workers: int = 1,
+        keepalive_timeout: float = 30,
+        connection_limit: int = 100,
+        connection_limit_per_host: int = 0,
+        dns_cache_ttl: int = 300,
+        request_timeout: float = 60,
+        rate_limiter: RateLimiter | None = None,
+        retry_policy: RetryPolicy | None = None,
+        dead_letter: DeadLetterFile | None = None,
+        checkpoint: Checkpoint | None = None,
+        response_cache: ResponseCache | None = None,
+        validators: ValidatorStore | None = None,
+        stream_mode: str | None = None,
+        stream_items_path: str = "",
+        chunk_size: int = 64 * 1024,
+        metrics: ScrapeMetrics | None = None,
+        body_log_rate: float = 0.0,
+        middlewares: List[Middleware] | None = None,
+        concurrency: JobSlots | None = None,
+    ):
+        """
+        [interval_start] and [interval_end] bound the random pause a worker takes after saving
+        [rate_limiter] paces the requests per host instead, when it's set there are no random pauses
+        [retry_policy] decides which failed requests are tried again, without it they are given up
+        [dead_letter] file where the requests that were given up are written
+        [checkpoint] saves the progress of the run, and resumes from it when the scraper starts again
+        [response_cache] responses already on disk are used instead of fetching them again
+        [validators] makes the requests conditional, data that didn't change is not downloaded again
+        [stream_mode] reads the bodies in chunks of [chunk_size] bytes instead of decoding them whole:
+        STREAM_ITEMS saves the items at [stream_items_path] one by one, as soon as each one is read
+        STREAM_RAW saves the body without decoding it ([DataStore.save_stream])
+        Streamed responses are not given to the generator [feedback] nor cached
+        [metrics] counts the requests, bytes, retries and store writes, and reports the progress
+        [body_log_rate] fraction of the response bodies that are logged (cut short), 0 logs none
+        [middlewares] hooks around every request (headers, filters, profiling...), in that order
+        [concurrency] slots shared with other scrapers, a request is only sent while holding one
+        [workers] is the number of requests the [Scraper] keeps in flight at the same time,
+        workers=1 scrapes the requests sequentially one after the other
+
+        Connection pool settings:
+        [keepalive_timeout] seconds an idle pooled connection is kept open to be reused
+        [connection_limit] max connections open at the same time, 0 means no limit
+        [connection_limit_per_host] max connections open to the same host, 0 means no limit
+        [dns_cache_ttl] seconds a resolved host is cached
+        [request_timeout] seconds a request can take before it's considered failed
+        """
+        if workers < 1:
+            raise ValueError("ScraperConfig needs at least one worker")
+        if stream_mode not in (None, self.STREAM_ITEMS, self.STREAM_RAW):
+            raise ValueError(f"Unknown stream mode: {stream_mode}")
         self.interval_start = interval_start
         self.interval_end = interval_end
+        self.workers = workers
+        self.keepalive_timeout = keepalive_timeout
+        self.connection_limit = connection_limit
+        self.connection_limit_per_host = connection_limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.request_timeout = request_timeout
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.dead_letter = dead_letter
+        self.checkpoint = checkpoint
+        self.response_cache = response_cache
+        self.validators = validators
+        self.stream_mode = stream_mode
+        self.stream_items_path = stream_items_path
+        self.chunk_size = chunk_size
+        self.metrics = metrics
+        self.body_log_rate = body_log_rate
+        self.middlewares = middlewares or []
+        self.concurrency = concurrency
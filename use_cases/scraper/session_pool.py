@@ -0,0 +1,101 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, Set
+import aiohttp
+
+
+class SessionPool:
+    """
+    Keeps a long lived [aiohttp.ClientSession] per key (a proxy url, a host...)
+    So the connections of every session are kept alive and reused between requests,
+    instead of paying the TCP, TLS (and SOCKS) handshakes for every request.
+
+    Sessions are created lazily the first time a key is used,
+    and rebuilt the next time it's used after being discarded.
+    A session discarded while requests are [using] it is closed once the last of them is done
+    """
+
+    def __init__(
+        self,
+        connector_factory: Callable[[str], aiohttp.BaseConnector],
+        timeout: aiohttp.ClientTimeout | None = None,
+    ):
+        """
+        [connector_factory] builds the connector that pools the connections of the session for a key
+        """
+        self.connector_factory = connector_factory
+        self.timeout = timeout
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+        # Requests in flight on every session, and the discarded ones waiting for them
+        self._in_use: Dict[aiohttp.ClientSession, int] = {}
+        self._retired: Set[aiohttp.ClientSession] = set()
+
+    def get(self, key: str) -> aiohttp.ClientSession:
+        """
+        The session for the key, it's created if there isn't an open one already
+        """
+        session = self._sessions.get(key)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector=self.connector_factory(key),
+                timeout=self.timeout,
+            )
+            self._sessions[key] = session
+        return session
+
+    @asynccontextmanager
+    async def using(self, key: str) -> AsyncIterator[aiohttp.ClientSession]:
+        """
+        The session for the key, held while a request is made with it
+        """
+        session = self.get(key)
+        self._in_use[session] = self._in_use.get(session, 0) + 1
+        try:
+            yield session
+        finally:
+            self._in_use[session] -= 1
+            if self._in_use[session] == 0:
+                del self._in_use[session]
+                if session in self._retired:
+                    self._retired.discard(session)
+                    await session.close()
+
+    async def discard(self, key: str) -> None:
+        """
+        The next request for the key will open a new session, the current one is closed
+        as soon as no request is using it. Used when a proxy is rotated or its connections failed
+        """
+        session = self._sessions.pop(key, None)
+        if session is None:
+            return
+        if session in self._in_use:
+            self._retired.add(session)
+        else:
+            await session.close()
+
+    async def close(self) -> None:
+        """
+        Closes every session in the pool, the discarded ones still in use too
+        """
+        sessions = list(self._sessions.values()) + list(self._retired)
+        self._sessions.clear()
+        self._retired.clear()
+        for session in sessions:
+            await session.close()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._sessions
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    @staticmethod
+    def sent_bytes(response: aiohttp.ClientResponse) -> int:
+        """
+        Bytes of the request line and headers sent for the response, the requests have no body
+        """
+        info = response.request_info
+        request_line = f"{info.method} {info.url.raw_path_qs} HTTP/1.1\r\n"
+        headers = sum(
+            len(name) + len(value) + 4 for name, value in info.headers.items()
+        )
+        return len(request_line) + headers + 2
@@ -0,0 +1,43 @@
+from use_cases.request_generator.historical.window_plan import WindowPlan
+from use_cases.scraper.rate_limit.shared_rate_limiter import SharedRateLimiter
+
+
+class Shard:
+    """
+    The part of a sharded run a worker process scrapes, with everything it must use to do it:
+    the windows of its [plan], the [root] folder its store writes to,
+    the [checkpoint_path] it resumes from and the [rate_limiter] shared by all the shards
+    """
+
+    def __init__(
+        self,
+        index: int,
+        plan: WindowPlan,
+        root: str,
+        checkpoint_path: str,
+        rate_limiter: SharedRateLimiter | None = None,
+    ):
+        self.index = index
+        self.plan = plan
+        self.root = root
+        self.checkpoint_path = checkpoint_path
+        self.rate_limiter = rate_limiter
+
+
+class ShardProgress:
+    """
+    Progress of a shard reported to the [ShardedRunner]
+    """
+
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    def __init__(self, index: int, completed: int, total: int, status: str = RUNNING):
+        self.index = index
+        self.completed = completed
+        self.total = total
+        self.status = status
+
+    def __repr__(self) -> str:
+        return f"Shard {self.index}: {self.completed}/{self.total} {self.status}"
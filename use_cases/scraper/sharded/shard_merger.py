@@ -0,0 +1,208 @@
+import csv
+import gzip
+import io
+import json
+import os
+import re
+import shutil
+from typing import Any, BinaryIO, Callable, Dict, List, Tuple
+
+from data.checkpoint.atomic_write import atomic_write
+from data.csv.csv_store import read_header, widen_header
+from data.dedup.dedup_store import record_key
+from data.dedup.record_index import RecordIndex
+from data.dedup.set_index import SetIndex
+
+# Files numbered by the stores: CSV multiple_files and JSONL parts, "<number>_<name>"
+NUMBERED_FILE = re.compile(r"^(\d+)_(.+)$")
+JSONL_FILE = re.compile(r"\.jsonl(\.gz|\.zst)?$")
+# Written in the staging folder once every merged file is in it
+STAGED_FILE = ".staged"
+
+RecordFilter = Callable[[Any], bool]
+
+
+def merge_shards(
+    shard_roots: List[str],
+    root: str,
+    staging: str,
+    id_fields: str | List[str] | None = None,
+    index: RecordIndex | None = None,
+) -> int:
+    """
+    Merges the files written by the shards into [root], shard after shard, so they follow the window order
+    Numbered files are renumbered after the files of the previous shards,
+    files shared by every request of a url are appended (CSV headers are widened to every column).
+
+    The merged files are put together in [staging] (a folder in the filesystem of [root]) and then moved to [root],
+    the files of the shards are never changed. A merge that stops halfway can be run again:
+    it starts over until every file is staged, and then only moves the files that are left.
+    [staging] keeps a marker of the merge, remove it together with the shards once the merge is done
+
+    With [id_fields] the records of a shard with the same id as one merged before are dropped,
+    shards that share a boundary date both get its records. The ids are kept in [index], by default a [SetIndex]
+    Returns the amount of files merged
+    """
+    marker = os.path.join(staging, STAGED_FILE)
+    if os.path.exists(marker):
+        with open(marker, "r", encoding="utf-8") as file:
+            merged = int(file.read())
+    else:
+        if os.path.isdir(staging):
+            shutil.rmtree(staging)
+        if isinstance(id_fields, str):
+            id_fields = [id_fields]
+        if id_fields and index is None:
+            index = SetIndex()
+        is_new = _record_filter(id_fields, index) if id_fields else None
+        merged = _stage(shard_roots, root, staging, is_new)
+        atomic_write(marker, lambda file: file.write(str(merged)))
+        if index is not None:
+            index.flush()
+
+    for folder, _, filenames in os.walk(staging):
+        relative_folder = os.path.relpath(folder, staging)
+        for filename in filenames:
+            if folder == staging and filename == STAGED_FILE:
+                continue
+            target_folder = os.path.join(root, relative_folder)
+            os.makedirs(target_folder, exist_ok=True)
+            os.replace(
+                os.path.join(folder, filename), os.path.join(target_folder, filename)
+            )
+    return merged
+
+
+def _stage(
+    shard_roots: List[str], root: str, staging: str, is_new: RecordFilter | None
+) -> int:
+    """
+    Writes the merged files into [staging], the files shared by a url start as a copy of the one in [root]
+    """
+    os.makedirs(staging, exist_ok=True)
+    merged = 0
+    for shard_root in shard_roots:
+        numbered: Dict[Tuple[str, str], List[Tuple[int, str]]] = {}
+        for folder, _, filenames in os.walk(shard_root):
+            relative_folder = os.path.relpath(folder, shard_root)
+            for filename in filenames:
+                path = os.path.join(folder, filename)
+                match = NUMBERED_FILE.match(filename)
+                if match:
+                    key = (relative_folder, match.group(2))
+                    numbered.setdefault(key, []).append((int(match.group(1)), path))
+                else:
+                    staged = os.path.join(staging, relative_folder, filename)
+                    if not os.path.exists(staged):
+                        target = os.path.join(root, relative_folder, filename)
+                        os.makedirs(os.path.dirname(staged), exist_ok=True)
+                        if os.path.exists(target):
+                            shutil.copyfile(target, staged)
+                    _append(path, staged, is_new)
+                merged += 1
+
+        for (relative_folder, name), files in numbered.items():
+            staged_folder = os.path.join(staging, relative_folder)
+            os.makedirs(staged_folder, exist_ok=True)
+            number = max(
+                _next_number(os.path.join(root, relative_folder), name),
+                _next_number(staged_folder, name),
+            )
+            for _, path in sorted(files):
+                _append(path, os.path.join(staged_folder, f"{number}_{name}"), is_new)
+                number += 1
+    return merged
+
+
+def _record_filter(id_fields: List[str], index: RecordIndex) -> RecordFilter:
+    """
+    Whether a record is not a duplicate, the ids of the new ones are added to the index
+    Records without every id field are kept
+    """
+
+    def is_new(record: Any) -> bool:
+        key = record_key(record, id_fields) if isinstance(record, dict) else None
+        return key is None or index.add(key)
+
+    return is_new
+
+
+def _append(path: str, target: str, is_new: RecordFilter | None) -> None:
+    """
+    Appends the records of the shard file to the target, [is_new] drops the duplicates
+    """
+    if path.endswith(".csv"):
+        _append_csv(path, target, is_new)
+    elif is_new is not None and JSONL_FILE.search(path):
+        with _open_jsonl(path, "rb") as source, _open_jsonl(
+            target, "ab"
+        ) as destination:
+            for line in source:
+                if line.strip() and is_new(json.loads(line).get("data")):
+                    destination.write(line)
+    else:
+        # Compressed files can be concatenated, gzip members and zstd frames follow each other
+        with open(path, "rb") as source, open(target, "ab") as destination:
+            shutil.copyfileobj(source, destination)
+
+
+def _append_csv(path: str, target: str, is_new: RecordFilter | None) -> None:
+    """
+    Appends the rows under the columns of the target, it's widened with the columns it doesn't have
+    """
+    with open(path, "r", newline="", encoding="utf-8") as source:
+        reader = csv.reader(source)
+        header = next(reader, None)
+        if header is None:
+            return
+        columns = read_header(target)
+        new_columns = [column for column in header if column not in columns]
+        if columns and new_columns:
+            widen_header(target, columns + new_columns)
+        with open(target, "a", newline="", encoding="utf-8") as destination:
+            writer = csv.writer(destination)
+            if not columns:
+                writer.writerow(header)
+            columns = columns + new_columns
+            for row in reader:
+                record = dict(zip(header, row))
+                if is_new is None or is_new(record):
+                    writer.writerow([record.get(column, "") for column in columns])
+
+
+def _open_jsonl(path: str, mode: str) -> BinaryIO:
+    """
+    The file through the compression of its extension, like the [JSONLStore] wrote it
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, mode)
+    if path.endswith(".zst"):
+        try:
+            import zstandard
+        except ImportError as error:
+            raise ImportError(
+                "Merging zstd files needs the zstandard package"
+            ) from error
+        file = open(path, mode)
+        if "r" in mode:
+            # The store appends a new frame every time it reopens the file
+            reader = zstandard.ZstdDecompressor().stream_reader(
+                file, read_across_frames=True
+            )
+            return io.BufferedReader(reader)
+        return zstandard.ZstdCompressor().stream_writer(file)
+    return open(path, mode)
+
+
+def _next_number(folder: str, name: str) -> int:
+    """
+    The number after the last numbered file with the name in the folder
+    """
+    if not os.path.isdir(folder):
+        return 0
+    numbers = [
+        int(match.group(1))
+        for match in map(NUMBERED_FILE.match, os.listdir(folder))
+        if match and match.group(2) == name
+    ]
+    return max(numbers, default=-1) + 1
@@ -0,0 +1,239 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import queue
+import shutil
+from typing import Callable, Dict, List
+
+from data.dedup.record_index import RecordIndex
+from use_cases.request_generator.historical.historical_request_generator import (
+    HistoricalRequestGenerator,
+)
+from use_cases.request_generator.historical.window_plan import WindowPlan
+from use_cases.scraper.rate_limit.shared_rate_limiter import SharedRateLimiter
+from use_cases.scraper.scraper import Scraper
+from use_cases.scraper.sharded.shard import Shard, ShardProgress
+from use_cases.scraper.sharded.shard_merger import merge_shards
+
+ScraperBuilder = Callable[[Shard], Scraper]
+
+logger = logging.getLogger(__name__)
+
+
+class ShardedRunner:
+    """
+    Scrapes a [WindowPlan] with [shards] worker processes, each one with its own contiguous part of the plan,
+    its own scraper (created by [build_scraper] in the worker process) and its own store folder.
+    All of them share one [SharedRateLimiter] budget of [rate] requests per second.
+
+    Once every shard is done their files are merged into [root] in window order.
+    A shard that crashes doesn't stop the others: the run ends without merging,
+    and running it again only scrapes the shards that were not done, from their checkpoints.
+    A merge that stops halfway is finished by the next run.
+    """
+
+    SHARDS_FOLDER = ".shards"
+    DONE_FILE = "done"
+    MERGE_FOLDER = "merge"
+    MERGED_SUFFIX = ".merged"
+
+    def __init__(
+        self,
+        plan: WindowPlan,
+        build_scraper: ScraperBuilder,
+        shards: int,
+        root: str | None = None,
+        rate: float | None = None,
+        burst: int = 1,
+        dedup_fields: str | List[str] | None = None,
+        dedup_index: RecordIndex | None = None,
+        on_progress: Callable[[ShardProgress], None] | None = None,
+        progress_interval: float = 1.0,
+        context=None,
+    ):
+        """
+        [build_scraper] creates the scraper of a [Shard], its generator must cover [Shard.plan],
+        its store must write into [Shard.root] and it should use [Shard.rate_limiter] and [Shard.checkpoint_path]
+        It must be picklable (a module level function) with the spawn start method
+        [dedup_fields] drops the records of a shard with the same ids as the ones of the shards before it,
+        the ids merged are kept in [dedup_index]
+        [on_progress] is called with the progress of the shards, by default it's logged
+        """
+        if shards < 1:
+            raise ValueError("ShardedRunner needs at least one shard")
+        self.plan = plan
+        self.build_scraper = build_scraper
+        self.root = root or os.getcwd()
+        self.dedup_fields = dedup_fields
+        self.dedup_index = dedup_index
+        self.on_progress = on_progress or self._log_progress
+        self.progress_interval = progress_interval
+        self.context = context or multiprocessing.get_context()
+        self.rate_limiter = (
+            SharedRateLimiter(rate, burst, context=self.context)
+            if rate is not None
+            else None
+        )
+        self.shards = [
+            self._create_shard(index, shard_plan)
+            for index, shard_plan in enumerate(plan.shards(shards))
+        ]
+        self.progress: Dict[int, ShardProgress] = {}
+        self.failed: List[int] = []
+
+    def run(self) -> bool:
+        """
+        Scrapes the shards that are not done, and merges the files once every shard is done
+        Returns whether the run is complete
+        """
+        progress_queue = self.context.Queue()
+        processes = {}
+        for shard in self.shards:
+            if self._is_done(shard):
+                total = len(shard.plan)
+                self._report(
+                    ShardProgress(shard.index, total, total, ShardProgress.DONE)
+                )
+                continue
+            process = self.context.Process(
+                target=_run_shard,
+                args=(
+                    self.build_scraper,
+                    shard,
+                    progress_queue,
+                    self.progress_interval,
+                ),
+                name=f"shard-{shard.index}",
+            )
+            process.start()
+            processes[shard.index] = process
+
+        while any(process.is_alive() for process in processes.values()):
+            self._drain(progress_queue, timeout=self.progress_interval)
+        self._drain(progress_queue, timeout=0)
+
+        self.failed = []
+        for index, process in processes.items():
+            process.join()
+            shard = self.shards[index]
+            if process.exitcode != 0 or not self._is_done(shard):
+                self.failed.append(index)
+                last = self.progress.get(index)
+                completed = last.completed if last is not None else 0
+                self._report(
+                    ShardProgress(
+                        index, completed, len(shard.plan), ShardProgress.FAILED
+                    )
+                )
+
+        if self.failed:
+            logger.error("Shards %s failed, run again to resume them", self.failed)
+            return False
+
+        shards_folder = os.path.join(self.root, self.SHARDS_FOLDER)
+        merge_shards(
+            [shard.root for shard in self.shards],
+            self.root,
+            os.path.join(shards_folder, self.MERGE_FOLDER),
+            self.dedup_fields,
+            self.dedup_index,
+        )
+        # Renamed first, a run stopped while it's deleted never merges the shards again
+        merged_folder = f"{shards_folder}{self.MERGED_SUFFIX}"
+        shutil.rmtree(merged_folder, ignore_errors=True)
+        os.replace(shards_folder, merged_folder)
+        shutil.rmtree(merged_folder)
+        return True
+
+    def _create_shard(self, index: int, plan: WindowPlan) -> Shard:
+        folder = os.path.join(self.root, self.SHARDS_FOLDER, f"shard-{index}")
+        return Shard(
+            index,
+            plan,
+            root=os.path.join(folder, "output"),
+            checkpoint_path=os.path.join(folder, "checkpoint.json"),
+            rate_limiter=self.rate_limiter,
+        )
+
+    def _is_done(self, shard: Shard) -> bool:
+        return os.path.exists(_done_path(shard))
+
+    def _drain(self, progress_queue, timeout: float) -> None:
+        """
+        Reports the progress sent by the shards
+        """
+        try:
+            if timeout:
+                progress = progress_queue.get(timeout=timeout)
+            else:
+                progress = progress_queue.get_nowait()
+            while True:
+                self._report(progress)
+                progress = progress_queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _report(self, progress: ShardProgress) -> None:
+        self.progress[progress.index] = progress
+        self.on_progress(progress)
+
+    @staticmethod
+    def _log_progress(progress: ShardProgress) -> None:
+        logger.info("%s", progress)
+
+
+def _done_path(shard: Shard) -> str:
+    return os.path.join(os.path.dirname(shard.root), ShardedRunner.DONE_FILE)
+
+
+def _run_shard(
+    build_scraper: ScraperBuilder, shard: Shard, progress_queue, progress_interval: float
+) -> None:
+    """
+    Runs in the worker process, scrapes the shard and marks it as done if the scraper got through it
+    """
+    os.makedirs(shard.root, exist_ok=True)
+    scraper = build_scraper(shard)
+    asyncio.run(_scrape(scraper, shard, progress_queue, progress_interval))
+    if _finished(scraper):
+        with open(_done_path(shard), "w", encoding="utf-8"):
+            pass
+
+
+def _finished(scraper: Scraper) -> bool:
+    """
+    Whether the scraper went through every window of its shard,
+    a scraper can stop early (a [TorScraper] that's blocked) with windows left
+    """
+    if scraper.stop:
+        return False
+    generator = scraper.request_generator
+    return not generator.working() and not generator.remaining_requests
+
+
+async def _scrape(
+    scraper: Scraper, shard: Shard, progress_queue, progress_interval: float
+) -> None:
+    generator = scraper.request_generator
+    total = len(shard.plan)
+
+    def completed() -> int:
+        if isinstance(generator, HistoricalRequestGenerator):
+            return generator.completed_windows
+        return generator.total_requests
+
+    async def report() -> None:
+        while True:
+            progress_queue.put(ShardProgress(shard.index, completed(), total))
+            await asyncio.sleep(progress_interval)
+
+    reporter = asyncio.create_task(report())
+    try:
+        await scraper.scrape()
+    finally:
+        reporter.cancel()
+    if _finished(scraper):
+        progress_queue.put(
+            ShardProgress(shard.index, completed(), total, ShardProgress.DONE)
+        )
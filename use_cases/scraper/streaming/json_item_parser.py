@@ -0,0 +1,187 @@
+import json
+import re
+from typing import Any, List, Tuple
+
+Item = Tuple[Tuple[Any, ...], Any]
+
+
+class _Container:
+    """
+    An object or array the parser is inside of
+    """
+
+    __slots__ = ("is_object", "key", "matched", "expects_key")
+
+    def __init__(self, is_object: bool, matched: bool):
+        self.is_object = is_object
+        # Key of the value being read, the index for arrays
+        self.key: Any = None if is_object else 0
+        # Whether the path to the container follows the items path
+        self.matched = matched
+        self.expects_key = is_object
+
+
+class JSONItemParser:
+    """
+    Reads a JSON document in chunks, and returns the items at [items_path] as soon as each one is complete
+    Only the bytes of the item being read are kept, so memory doesn't grow with the size of the document.
+
+    [items_path] has the syntax of the [FlatteningDataFactory] one: dotted keys, "*" goes through
+    every key of an object or element of an array. Every item comes with the keys matched by the "*"
+
+    Example: NEO feed with items_path="near_earth_objects.*.*"
+    feed(chunk) -> [(("2024-01-01", 0), {asteroid}), (("2024-01-01", 1), {asteroid})...]
+    """
+
+    WILDCARD = "*"
+    STRUCTURAL = re.compile(rb'["{}\[\],:]')
+    STRING_END = re.compile(rb'(?:[^"\\]|\\.)*"', re.DOTALL)
+
+    def __init__(self, items_path: str):
+        self.path = items_path.split(".") if items_path else []
+        self.items = 0
+        self._buffer = bytearray()
+        self._position = 0
+        self._stack: List[_Container] = []
+        # Start of a number, true, false or null that may be the next value
+        self._scalar_start: int | None = 0
+        # Start and depth of the item being read
+        self._item_start: int | None = None
+        self._item_depth = 0
+        self._item_keys: Tuple[Any, ...] = ()
+        self._done = False
+
+    def feed(self, chunk: bytes) -> List[Item]:
+        """
+        Reads the chunk, returns the items completed with it
+        """
+        self._buffer += chunk
+        items: List[Item] = []
+        self._scan(items)
+        self._discard_read()
+        return items
+
+    def close(self) -> List[Item]:
+        """
+        The document is complete, returns the last item (a document that is a single number)
+        Raises ValueError if the document was cut
+        """
+        items: List[Item] = []
+        if not self._stack and self._scalar_start is not None and not self._done:
+            self._end_scalar(len(self._buffer), items)
+            self._position = len(self._buffer)
+        if self._stack or self._buffer[self._position :].strip():
+            raise ValueError("JSON document ended before it was complete")
+        return items
+
+    def _scan(self, items: List[Item]) -> None:
+        buffer = self._buffer
+        while True:
+            match = self.STRUCTURAL.search(buffer, self._position)
+            if match is None:
+                return
+            index = match.start()
+            char = buffer[index]
+
+            if char == 0x22:  # "
+                end = self.STRING_END.match(buffer, index + 1)
+                if end is None:
+                    return  # The string continues in the next chunk
+                top = self._stack[-1] if self._stack else None
+                if top is not None and top.expects_key:
+                    top.key = json.loads(buffer[index : end.end()])
+                else:
+                    self._start_value(index)
+                    self._end_value(end.end(), items)
+                self._position = end.end()
+                continue
+
+            if char in b"{[":
+                self._start_value(index)
+                self._stack.append(_Container(char == 0x7B, self._matches()))
+                self._scalar_start = None if char == 0x7B else index + 1
+            elif char in b"}]":
+                self._end_scalar(index, items)
+                if not self._stack:
+                    raise ValueError(f"Unexpected {chr(char)} in JSON document")
+                self._stack.pop()
+                self._end_value(index + 1, items)
+            elif char == 0x3A:  # :
+                top = self._stack[-1] if self._stack else None
+                if top is None or not top.expects_key:
+                    raise ValueError("Unexpected : in JSON document")
+                top.expects_key = False
+                self._scalar_start = index + 1
+            else:  # ,
+                self._end_scalar(index, items)
+                top = self._stack[-1] if self._stack else None
+                if top is None:
+                    raise ValueError("Unexpected , in JSON document")
+                if top.is_object:
+                    top.expects_key = True
+                else:
+                    top.key += 1
+                    self._scalar_start = index + 1
+            self._position = index + 1
+
+    def _matches(self) -> bool:
+        """
+        Whether the value being read is on the items path (or on the way to it)
+        """
+        if not self._stack:
+            return True
+        top = self._stack[-1]
+        depth = len(self._stack) - 1
+        if not top.matched or depth >= len(self.path):
+            return False
+        segment = self.path[depth]
+        return segment == self.WILDCARD or segment == str(top.key)
+
+    def _start_value(self, index: int) -> None:
+        self._scalar_start = None
+        if self._item_start is None and len(self._stack) == len(self.path):
+            if self._matches():
+                self._item_start = index
+                self._item_depth = len(self._stack)
+                self._item_keys = tuple(
+                    container.key
+                    for container, segment in zip(self._stack, self.path)
+                    if segment == self.WILDCARD
+                )
+
+    def _end_value(self, end: int, items: List[Item]) -> None:
+        if not self._stack:
+            self._done = True
+        if self._item_start is not None and len(self._stack) == self._item_depth:
+            item = json.loads(self._buffer[self._item_start : end])
+            items.append((self._item_keys, item))
+            self.items += 1
+            self._item_start = None
+
+    def _end_scalar(self, end: int, items: List[Item]) -> None:
+        """
+        A number, true, false or null ends with the next , ] or }
+        """
+        start = self._scalar_start
+        if start is None or not self._buffer[start:end].strip():
+            return
+        self._start_value(start)
+        self._end_value(end, items)
+
+    def _discard_read(self) -> None:
+        """
+        Drops the bytes already read, except the ones of the item or value still being read
+        """
+        keep = self._position
+        if self._item_start is not None:
+            keep = min(keep, self._item_start)
+        if self._scalar_start is not None:
+            keep = min(keep, self._scalar_start)
+        if keep == 0:
+            return
+        del self._buffer[:keep]
+        self._position -= keep
+        if self._item_start is not None:
+            self._item_start -= keep
+        if self._scalar_start is not None:
+            self._scalar_start -= keep
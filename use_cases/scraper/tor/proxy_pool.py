@@ -0,0 +1,206 @@
+import asyncio
+import logging
+import random
+import secrets
+import time
+from typing import Callable, Dict, List
+
+from use_cases.scraper.tor.tor_controller import TorControlError, TorController
+
+logger = logging.getLogger(__name__)
+
+
+class TorProxy:
+    """
+    A SOCKS endpoint of a Tor instance, with the control port of that instance if it has one
+    """
+
+    def __init__(self, url: str, controller: TorController | None = None):
+        self.url = url
+        self.controller = controller
+
+
+class ProxyStats:
+    """
+    Health of a proxy: smoothed latency and error rate of its recent requests
+    """
+
+    def __init__(self, smoothing: float = 0.3):
+        self.smoothing = smoothing
+        self.latency: float | None = None
+        self.error_rate = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.in_flight = 0
+
+    def record(self, latency: float | None, ok: bool) -> None:
+        self.requests += 1
+        if not ok:
+            self.failures += 1
+        self.error_rate += self.smoothing * ((0.0 if ok else 1.0) - self.error_rate)
+        if latency is not None:
+            if self.latency is None:
+                self.latency = latency
+            else:
+                self.latency += self.smoothing * (latency - self.latency)
+
+    def reset(self) -> None:
+        self.latency = None
+        self.error_rate = 0.0
+        self.requests = 0
+        self.failures = 0
+
+
+class ProxyLease:
+    """
+    A proxy chosen for a request, with the SOCKS credentials of its isolation slot
+    Tor routes streams with different credentials through different circuits (IsolateSOCKSAuth)
+    """
+
+    def __init__(self, proxy: TorProxy, slot: int, password: str):
+        self.proxy = proxy
+        self.slot = slot
+        self.username = f"scraps-{slot}"
+        self.password = password
+
+    @property
+    def key(self) -> str:
+        """
+        Identifies the proxy and slot, requests with the same key can share connections
+        """
+        return f"{self.proxy.url}#{self.slot}"
+
+
+class ProxyPool:
+    """
+    Routes the requests through many Tor proxies, preferring the healthy and fast ones
+
+    Every proxy is scored by its smoothed latency, its error rate and the requests it's handling.
+    A proxy whose error rate goes over [max_error_rate] is degraded:
+    if it has a control port it gets new circuits (NEWNYM), otherwise it's benched for [cooldown] seconds.
+
+    Each proxy has [isolation_slots] SOCKS credentials used in turns,
+    so concurrent requests through the same proxy ride different circuits.
+    """
+
+    def __init__(
+        self,
+        proxies: List[TorProxy],
+        isolation_slots: int = 1,
+        max_error_rate: float = 0.5,
+        min_requests: int = 3,
+        cooldown: float = 30,
+        newnym_interval: float = 10,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        [min_requests] requests a proxy needs before it can be considered degraded
+        [newnym_interval] minimum seconds between NEWNYM signals to the same instance (Tor rate limits them)
+        """
+        if not proxies:
+            raise ValueError("ProxyPool needs at least one proxy")
+        if isolation_slots < 1:
+            raise ValueError("ProxyPool needs at least one isolation slot")
+        self.proxies = proxies
+        self.isolation_slots = isolation_slots
+        self.max_error_rate = max_error_rate
+        self.min_requests = min_requests
+        self.cooldown = cooldown
+        self.newnym_interval = newnym_interval
+        self.clock = clock
+
+        self.stats: Dict[str, ProxyStats] = {proxy.url: ProxyStats() for proxy in proxies}
+        self.renewals = 0
+        self._benched_until: Dict[str, float] = {}
+        self._last_newnym: Dict[str, float] = {}
+        self._next_slot: Dict[str, int] = {proxy.url: 0 for proxy in proxies}
+        # A random password, so credentials from a previous run don't reuse its circuits
+        password = secrets.token_hex(8)
+        self._leases: Dict[str, ProxyLease] = {}
+        for proxy in proxies:
+            for slot in range(isolation_slots):
+                lease = ProxyLease(proxy, slot, password)
+                self._leases[lease.key] = lease
+
+    @classmethod
+    def from_urls(cls, urls: List[str], **kwargs) -> "ProxyPool":
+        return cls([TorProxy(url) for url in urls], **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.proxies)
+
+    def lease(self, key: str) -> ProxyLease:
+        return self._leases[key]
+
+    def leases_of(self, proxy_url: str) -> List[ProxyLease]:
+        return [lease for lease in self._leases.values() if lease.proxy.url == proxy_url]
+
+    def acquire(self) -> ProxyLease:
+        """
+        Chooses the proxy for the next request, and the next isolation slot of that proxy
+        """
+        proxy = self._best_proxy()
+        self.stats[proxy.url].in_flight += 1
+
+        slot = self._next_slot[proxy.url]
+        self._next_slot[proxy.url] = (slot + 1) % self.isolation_slots
+        return self._leases[f"{proxy.url}#{slot}"]
+
+    async def release(self, lease: ProxyLease, latency: float | None, ok: bool) -> bool:
+        """
+        Records how the request through the lease went
+        Returns True when the proxy got new circuits, its open connections should then be closed
+        """
+        stats = self.stats[lease.proxy.url]
+        stats.in_flight = max(0, stats.in_flight - 1)
+        stats.record(latency, ok)
+
+        if not self._degraded(stats):
+            return False
+        return await self._renew(lease.proxy)
+
+    def score(self, proxy: TorProxy) -> float:
+        """
+        Lower is better, proxies without a latency yet are tried early
+        """
+        stats = self.stats[proxy.url]
+        latency = stats.latency if stats.latency is not None else 0.0
+        return (latency + 0.1) * (1 + 4 * stats.error_rate) * (1 + stats.in_flight)
+
+    def _best_proxy(self) -> TorProxy:
+        now = self.clock()
+        available = [
+            proxy
+            for proxy in self.proxies
+            if self._benched_until.get(proxy.url, 0.0) <= now
+        ]
+        candidates = available or self.proxies
+        best = min(self.score(proxy) for proxy in candidates)
+        return random.choice(
+            [proxy for proxy in candidates if self.score(proxy) == best]
+        )
+
+    def _degraded(self, stats: ProxyStats) -> bool:
+        return stats.requests >= self.min_requests and stats.error_rate > self.max_error_rate
+
+    async def _renew(self, proxy: TorProxy) -> bool:
+        now = self.clock()
+        if proxy.controller is None:
+            self._benched_until[proxy.url] = now + self.cooldown
+            self.stats[proxy.url].reset()
+            return False
+
+        if now - self._last_newnym.get(proxy.url, float("-inf")) < self.newnym_interval:
+            return False
+        self._last_newnym[proxy.url] = now
+
+        try:
+            await proxy.controller.new_identity()
+        except (OSError, asyncio.TimeoutError, TorControlError) as error:
+            logger.warning("NEWNYM failed for %s: %r", proxy.url, error)
+            self._benched_until[proxy.url] = now + self.cooldown
+            return False
+
+        self.renewals += 1
+        self.stats[proxy.url].reset()
+        return True
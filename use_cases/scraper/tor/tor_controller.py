@@ -0,0 +1,94 @@
+import asyncio
+from typing import List
+
+
+class TorControlError(Exception):
+    """
+    The Tor control port refused a command
+    """
+
+
+class TorController:
+    """
+    Client for the control port of a Tor instance (ControlPort in the torrc)
+    Used to ask Tor for new circuits (NEWNYM) when the exit nodes of a proxy are slow or blocked
+
+    Every call opens its own short connection, authenticates, sends the command and quits
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 9051,
+        password: str | None = None,
+        cookie_path: str | None = None,
+        timeout: float = 10,
+    ):
+        """
+        Authenticates with [password] (HashedControlPassword) or the cookie file at [cookie_path]
+        (CookieAuthentication), without any of them Tor must allow unauthenticated access
+        """
+        self.host = host
+        self.port = port
+        self.password = password
+        self.cookie_path = cookie_path
+        self.timeout = timeout
+
+    async def new_identity(self) -> None:
+        """
+        Asks Tor to use new circuits for the next connections
+        Connections that are already open keep their circuits, so they should be closed too
+        """
+        await self.send("SIGNAL NEWNYM")
+
+    async def send(self, command: str) -> List[str]:
+        """
+        Sends an authenticated command and returns the reply lines
+        """
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+        try:
+            await self._command(reader, writer, self._authenticate_command())
+            reply = await self._command(reader, writer, command)
+            writer.write(b"QUIT\r\n")
+            await writer.drain()
+            return reply
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    def _authenticate_command(self) -> str:
+        if self.password is not None:
+            escaped = self.password.replace("\\", "\\\\").replace('"', '\\"')
+            return f'AUTHENTICATE "{escaped}"'
+        if self.cookie_path is not None:
+            with open(self.cookie_path, "rb") as cookie:
+                return f"AUTHENTICATE {cookie.read().hex()}"
+        return "AUTHENTICATE"
+
+    async def _command(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, command: str
+    ) -> List[str]:
+        """
+        Sends the command and reads its reply, the last line of a reply is "<code> <text>"
+        """
+        writer.write(command.encode("utf-8") + b"\r\n")
+        await writer.drain()
+
+        lines = []
+        while True:
+            line = await asyncio.wait_for(reader.readline(), self.timeout)
+            if not line:
+                raise TorControlError(f"Connection closed while waiting for: {command}")
+            line = line.decode("utf-8").rstrip("\r\n")
+            lines.append(line)
+            if len(line) >= 4 and line[3] == " ":
+                break
+
+        if not lines[-1].startswith("250"):
+            raise TorControlError(f"{command.split()[0]} failed: {lines[-1]}")
+        return lines
@@ -1,16 +1,25 @@
 import asyncio
-from typing import Any, Dict
+from contextlib import asynccontextmanager
+import logging
+from typing import Any, AsyncIterator, Dict
 import aiohttp
 from aiohttp_socks import ProxyType, ProxyConnector
 import random
+import time
+from urllib.parse import urlparse
 
 from data.data_store import DataStore
 from decorators.base_class import baseclass
 from entities.scrape_request.scrape_request import ScrapeRequest
 from entities.scraped_data.factory.scrape_data_factory import D, ScrapeDataFactory
 from use_cases.request_generator.request_generator import RequestGenerator
+from use_cases.scraper.fetch_error import FetchError
 from use_cases.scraper.scraper import Scraper
 from use_cases.scraper.scraper_config import ScraperConfig
+from use_cases.scraper.session_pool import SessionPool
+from use_cases.scraper.tor.proxy_pool import ProxyPool
+
+logger = logging.getLogger(__name__)
 
 
 class TorScraper(Scraper):
@@ -20,53 +29,164 @@ class TorScraper(Scraper):
         data_factory: ScrapeDataFactory[D],
         data_store: DataStore,
         config: ScraperConfig,
+        proxy_pool: ProxyPool | None = None,
     ):
+        """
+        [proxy_pool] the Tor proxies to route the requests through, by default the local Tor proxy
+        """
         super().__init__(request_generator, data_factory, data_store, config)
         self.tor_proxies = [
             "socks5://127.0.0.1:9050",  # Default Tor proxy
             # "socks5://127.0.0.1:9150",  # Tor Browser default proxy
             # "socks5://127.0.0.1:9250",  # Custom proxy if available
         ]
+        self.proxy_pool = proxy_pool or ProxyPool.from_urls(self.tor_proxies)
+        # One keep-alive session per proxy isolation slot, reused by every request routed through it
+        self.sessions = SessionPool(
+            self.__create_connector,
+            timeout=aiohttp.ClientTimeout(total=config.request_timeout),
+        )
 
     @baseclass
     async def fetch(self, request: ScrapeRequest) -> Dict[str, Any]:
 
         # Implement logic to route the request via the Tor network
-        response = None
-        proxies = len(self.tor_proxies)
-        for _ in range(proxies):
-            response = await self.__fetch_with_proxy(request)
-            if response:
-                break
-            await asyncio.sleep(2)  # Wait between Tor network reroutes
-        return response
+        error = None
+        proxies = len(self.proxy_pool)
+        for attempt in range(proxies):
+            if attempt > 0:
+                await asyncio.sleep(2)  # Wait between Tor network reroutes
+            try:
+                return await self.__fetch_with_proxy(request)
+            except FetchError as failure:
+                error = failure
+                # The data didn't change, another proxy would get the same answer
+                if self.stop or failure.kind == FetchError.NOT_MODIFIED:
+                    break
+        raise error
 
-    async def __fetch_with_proxy(self, request: ScrapeRequest) -> Dict[str, Any] | None:
-        proxy_url = random.choice(self.tor_proxies)
-        proxy = ProxyConnector.from_url(proxy_url)
-        headers = self.__generate_headers()
-        async with aiohttp.ClientSession(connector=proxy, headers=headers) as session:
-            async with session.get(
-                request.url, params=request.get_payload()
-            ) as response:
-                print("RESPONSE")
-                print(f"URL: {request.url}")
-                print(f"PAYLOAD: {request.get_payload()}")
-                print(f"TYPE: {response.content_type}")
-                content = await response.text()
-                print(f"CONTENT: {content}")
-                return await self.__handle_response_status(response)
+    @baseclass
+    async def fetch_stream(self, request: ScrapeRequest) -> AsyncIterator[bytes]:
+        async with self.__proxied_get(request) as response:
+            self.__check_status(request, response)
+            async for chunk in response.content.iter_chunked(self.config.chunk_size):
+                yield chunk
 
-    async def __handle_response_status(self, response) -> Dict[str, Any] | None:
-        if response.status >= 200 and response.status < 300:  # Got Data
+    @baseclass
+    async def close(self) -> None:
+        await self.sessions.close()
+
+    async def rotate(self, proxy_url: str) -> None:
+        """
+        Drops the pooled connections of the proxy, the next request through it opens new ones
+        Requests still in flight through them finish first
+        """
+        for lease in self.proxy_pool.leases_of(proxy_url):
+            await self.sessions.discard(lease.key)
+
+    async def __fetch_with_proxy(self, request: ScrapeRequest) -> Dict[str, Any]:
+        async with self.__proxied_get(request) as response:
+            self.__check_status(request, response)
             return await response.json()
+
+    @asynccontextmanager
+    async def __proxied_get(
+        self, request: ScrapeRequest
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """
+        The response of the request through the next proxy of the pool,
+        the health of the proxy is updated with how the request went
+        The session is held until the response is done, discarding it meanwhile doesn't cut the request
+        """
+        lease = self.proxy_pool.acquire()
+        async with self.sessions.using(lease.key) as session:
+            headers = {
+                **self.__generate_headers(),
+                **self._request_headers(request),
+            }
+            latency = None
+            healthy = False
+            started_at = time.perf_counter()
+            try:
+                async with session.get(
+                    request.url, params=request.get_payload(), headers=headers
+                ) as response:
+                    latency = time.perf_counter() - started_at
+                    self._observe_response(
+                        request,
+                        response.status,
+                        response.headers,
+                        latency,
+                        lease.proxy.url,
+                    )
+                    logger.debug(
+                        "%s %s via %s: %s bytes",
+                        response.status,
+                        request.url,
+                        lease.proxy.url,
+                        response.content_length,
+                    )
+                    # A 403 usually means the exit node is blocked, it needs other circuits
+                    healthy = response.status != 403
+                    try:
+                        yield response
+                    finally:
+                        self._observe_transfer(
+                            request,
+                            self.sessions.sent_bytes(response),
+                            response.content.total_bytes,
+                            lease.proxy.url,
+                        )
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as error:
+                self._observe_response(request, None, proxy=lease.proxy.url)
+                failure = FetchError.from_exception(error)
+                healthy = failure.kind not in (
+                    FetchError.CONNECTION,
+                    FetchError.TIMEOUT,
+                )
+                if not healthy:
+                    # The proxy connections are broken, rebuild them on the next request
+                    logger.warning("Proxy %s failed: %r", lease.proxy.url, error)
+                    await self.sessions.discard(lease.key)
+                raise failure from error
+            finally:
+                renewed = await self.proxy_pool.release(lease, latency, healthy)
+                if renewed:
+                    # Open connections keep their old circuits
+                    await self.rotate(lease.proxy.url)
+
+    def __create_connector(self, key: str) -> ProxyConnector:
+        lease = self.proxy_pool.lease(key)
+        proxy_url = urlparse(lease.proxy.url)
+        return ProxyConnector(
+            proxy_type=ProxyType.SOCKS5,
+            host=proxy_url.hostname,
+            port=proxy_url.port,
+            # Different credentials ride different circuits (stream isolation)
+            username=lease.username,
+            password=lease.password,
+            # Let Tor resolve the hosts, DNS lookups should not leave the circuit
+            rdns=True,
+            limit=self.config.connection_limit,
+            limit_per_host=self.config.connection_limit_per_host,
+            keepalive_timeout=self.config.keepalive_timeout,
+        )
+
+    def __check_status(self, request: ScrapeRequest, response) -> None:
+        """
+        Raises a [FetchError] unless the response has data
+        """
+        if response.status >= 200 and response.status < 300:  # Got Data
+            self._observe_validators(request, response.headers)
+            return
+        elif response.status == 304:  # NOT MODIFIED
+            logger.debug("Not modified: %s", request.url)
         elif response.status == 403:  # FORBIDDEN
-            print("We've been made! RETREAT")
+            logger.error("We've been made! RETREAT")
             self.stop = True
-            return None
         else:
-            print(f"Unexpected response: {response.status}")
-            return None
+            logger.warning("Unexpected response %s: %s", response.status, request.url)
+        raise FetchError.from_status(response.status, response.headers)
 
     def __generate_headers(self) -> Dict[str, str]:
         user_agent = self.__generate_user_agent()